@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+图形界面冷启动耗时基准测试
+
+在独立进程中分别测量导入ui模块、构造LoginWidget、首次显示（第一次绘制完成）、完整界面可用以及配置加载完成的耗时，
+输出各项中位数，并与保存的基线比较，出现回退时以非零状态码退出。
+
+用法:
+    python benchmarks/startup.py [-n 轮数] [--save-baseline]
+    python benchmarks/startup.py --baseline benchmarks/baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+UI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# 在子进程中执行的测量脚本，时间均从解释器开始执行脚本时算起
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import ui
+from PySide6.QtCore import QEvent, QObject, QTimer
+from PySide6.QtWidgets import QApplication
+imported = time.perf_counter()
+app = QApplication(sys.argv[:1])
+widget = ui.LoginWidget()
+constructed = time.perf_counter()
+timings = {}
+
+def finish():
+    timings.setdefault("config_loaded", time.perf_counter())
+    app.quit()
+
+class PaintFilter(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and "first_paint" not in timings:
+            timings["first_paint"] = time.perf_counter()
+        return False
+
+def ui_ready():
+    return getattr(widget, "studentIdLineEdit", None) is not None
+
+paint_filter = PaintFilter()
+widget.installEventFilter(paint_filter)
+
+def wait_for_config():
+    # 完整界面在首次绘制之后创建，配置文件在后台线程中读取，学号输入框填入内容即视为加载完成
+    if ui_ready():
+        timings.setdefault("ui_ready", time.perf_counter())
+    if "first_paint" in timings and ui_ready() and widget.studentIdLineEdit.text():
+        finish()
+    else:
+        QTimer.singleShot(1, wait_for_config)
+
+widget.show()
+QTimer.singleShot(0, wait_for_config)
+QTimer.singleShot(10000, finish)
+app.exec()
+ms = lambda t: round((t - start) * 1000, 3)
+print(json.dumps({
+    "import_ms": ms(imported),
+    "construct_ms": round((constructed - imported) * 1000, 3),
+    "first_paint_ms": ms(timings.get("first_paint", time.perf_counter())),
+    "ui_ready_ms": ms(timings.get("ui_ready", time.perf_counter())),
+    "config_loaded_ms": ms(timings["config_loaded"]),
+}))
+"""
+
+
+def measure(python, work_dir):
+    """
+    在新进程中测量一次冷启动
+
+    Returns:
+        dict: 各阶段耗时（毫秒）
+    """
+    env = dict(os.environ)
+    # 没有图形环境时使用offscreen平台
+    if sys.platform.startswith("linux") and not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run([python, "-c", PROBE, UI_DIR], cwd=work_dir, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    与基线比较各项中位数
+
+    Returns:
+        list: 出现回退的指标说明
+    """
+    regressions = []
+    for key, value in results.items():
+        base = baseline.get(key)
+        if base and value > base * (1 + tolerance) and value - base > min_delta_ms:
+            regressions.append(f"{key}: {value:.1f}ms（基线{base:.1f}ms）")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图形界面冷启动耗时基准测试")
+    parser.add_argument("-n", "--rounds", type=int, default=10, help="测量轮数")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的回退比例")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0, help="超出基线的绝对值低于该值时不视为回退")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        with open(os.path.join(work_dir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"student_id": "S00000000", "password": "benchmark", "webhook_urls": []}, f)
+        samples = [measure(sys.executable, work_dir) for _ in range(args.rounds)]
+
+    results = {key: round(statistics.median(sample[key] for sample in samples), 3) for key in samples[0]}
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"已保存基线: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"未找到基线文件: {args.baseline}（可使用--save-baseline生成）")
+        sys.exit(1)
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print("检测到启动耗时回退:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("未检测到启动耗时回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,52 @@
 import sys
 import os
 import json
-import subprocess
 
-from PySide6.QtCore import Qt, QSize, QUrl
-from PySide6.QtGui import QDesktopServices
+from PySide6.QtCore import Qt, QSize, QObject, QRunnable, QThreadPool, QProcess, QTimer, Signal
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit
-from qfluentwidgets import LineEdit, PushButton, PrimaryPushButton, ToolButton, FluentIcon as FIF, InfoBar, InfoBarPosition, MessageBox
+# qfluentwidgets导入耗时较长（导入时会加载全部组件），在窗口首次绘制之后再导入，见LoginWidget.setupUi
+
+class TaskSignals(QObject):
+    # 后台任务完成或失败时通过信号通知界面线程
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class Task(QRunnable):
+    """在线程池中执行的后台任务，避免文件读写和批处理阻塞界面"""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
 
 class LoginWidget(QWidget):
     def __init__(self):
         super().__init__()
-        self.setupUi()
+        # 计划任务注册、配置保存等操作在线程池中执行，单线程保证按提交顺序执行
+        self.threadPool = QThreadPool(self)
+        self.threadPool.setMaxThreadCount(1)
+        self.tasks = set()
+        self.loginProcess = None
+        self.uiReady = False
+        # 界面创建完成前读取到的配置，创建完成后再填入
+        self.pendingConfig = None
+        self.setupShell()
+        # 在后台线程中开始读取配置文件，与窗口显示及创建控件同时进行
         self.loadConfig()
-        self.bindEvents()
 
-    def setupUi(self):
-        # 设置窗口标题和大小
+    def setupShell(self):
+        # 启动时只创建窗口框架，尽快显示窗口；完整界面在首次绘制之后创建
         self.setWindowTitle('AHU校园网自动登录程序')
         self.resize(400, 300)
         
@@ -25,6 +55,41 @@ class LoginWidget(QWidget):
         self.mainLayout.setContentsMargins(30, 30, 30, 30)
         self.mainLayout.setSpacing(15)
         
+        self.loadingLabel = QLabel('正在加载...')
+        self.loadingLabel.setAlignment(Qt.AlignCenter)
+        self.mainLayout.addWidget(self.loadingLabel)
+        
+        # 设置样式
+        self.setStyleSheet("""
+            QWidget {
+                background-color: white;
+                font-family: 'Segoe UI', 'Microsoft YaHei';
+            }
+            QLabel {
+                font-size: 14px;
+            }
+        """)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.uiReady:
+            # 首次绘制完成后再创建完整界面，避免导入与创建控件推迟窗口显示
+            self.uiReady = True
+            QTimer.singleShot(0, self.initUi)
+
+    def initUi(self):
+        self.setupUi()
+        self.bindEvents()
+        if self.pendingConfig is not None:
+            self.applyConfig(self.pendingConfig)
+            self.pendingConfig = None
+
+    def setupUi(self):
+        from qfluentwidgets import LineEdit, PushButton, PrimaryPushButton, ToolButton, FluentIcon as FIF
+        
+        self.mainLayout.removeWidget(self.loadingLabel)
+        self.loadingLabel.deleteLater()
+        
         # 学号输入框
         self.studentIdLayout = QVBoxLayout()
         self.studentIdLabel = QLabel('学号')
@@ -69,8 +134,16 @@ class LoginWidget(QWidget):
         # 卸载计划按钮 - 使用普通PushButton
         self.uninstallButton = PushButton('卸载计划', self)
         
+        # 测试登录按钮 - 立即执行一次登录并显示各阶段耗时
+        self.testLoginButton = PushButton('测试登录', self)
+        
         self.buttonLayout.addWidget(self.registerButton)
         self.buttonLayout.addWidget(self.uninstallButton)
+        self.buttonLayout.addWidget(self.testLoginButton)
+        
+        # 测试登录的各阶段耗时
+        self.phaseLabel = QLabel('')
+        self.phaseLabel.setWordWrap(True)
         
         # 底部信息
         self.footerLayout = QHBoxLayout()
@@ -85,102 +158,159 @@ class LoginWidget(QWidget):
         self.mainLayout.addLayout(self.webhookInputLayout)
         self.mainLayout.addSpacing(10)
         self.mainLayout.addLayout(self.buttonLayout)
+        self.mainLayout.addWidget(self.phaseLabel)
         self.mainLayout.addStretch(1)
         self.mainLayout.addLayout(self.footerLayout)
-        
-        # 设置样式
-        self.setStyleSheet("""
-            QWidget {
-                background-color: white;
-                font-family: 'Segoe UI', 'Microsoft YaHei';
-            }
-            QLabel {
-                font-size: 14px;
-            }
-        """)
 
     def openWebhookHelp(self):
         # 打开企业微信webhook帮助文档URL
+        from PySide6.QtCore import QUrl
+        from PySide6.QtGui import QDesktopServices
         QDesktopServices.openUrl(QUrl("https://developer.work.weixin.qq.com/document/path/91770"))
     
     def loadConfig(self):
-        # 加载配置文件
+        # 在后台线程中读取配置文件，读取完成后填入界面
+        self.runInBackground(self.readConfig,
+                             onFinished=self.applyConfig,
+                             onFailed=lambda error: self.showErrorMessage('加载配置失败', error))
+    
+    @staticmethod
+    def readConfig():
+        """读取配置文件，在后台线程中执行"""
+        if not os.path.exists('config.json'):
+            return {}
+        with open('config.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def applyConfig(self, config):
+        if getattr(self, 'studentIdLineEdit', None) is None:
+            # 界面尚未创建完成，创建完成后再填入
+            self.pendingConfig = config
+            return
+        # 用户在加载完成前已开始输入时，不覆盖已填写的内容
+        if not self.studentIdLineEdit.text():
+            self.studentIdLineEdit.setText(config.get('student_id', ''))
+        if not self.passwordLineEdit.text():
+            self.passwordLineEdit.setText(config.get('password', ''))
+        
+        # 如果webhook_urls非空，则使用第一个URL
+        webhook_urls = config.get('webhook_urls', [])
+        if webhook_urls and len(webhook_urls) > 0 and not self.webhookLineEdit.text():
+            self.webhookLineEdit.setText(webhook_urls[0])
+    
+    def collectConfig(self):
+        # 读取界面上填写的配置
+        webhook_url = self.webhookLineEdit.text().strip()
+        return {
+            'student_id': self.studentIdLineEdit.text().strip(),
+            'password': self.passwordLineEdit.text().strip(),
+            'webhook_url': webhook_url
+        }
+    
+    @staticmethod
+    def writeConfig(fields):
+        """保存配置文件，在后台线程中执行"""
+        # 保留配置文件中界面上未展示的配置项（如其余webhook、门户节点等）
+        config = {}
         try:
             if os.path.exists('config.json'):
                 with open('config.json', 'r', encoding='utf-8') as f:
                     config = json.load(f)
-                    self.studentIdLineEdit.setText(config.get('student_id', ''))
-                    self.passwordLineEdit.setText(config.get('password', ''))
-                    
-                    # 如果webhook_urls非空，则使用第一个URL
-                    webhook_urls = config.get('webhook_urls', [])
-                    if webhook_urls and len(webhook_urls) > 0:
-                        self.webhookLineEdit.setText(webhook_urls[0])
-        except Exception as e:
-            self.showErrorMessage('加载配置失败', str(e))
-    
-    def saveConfig(self):
-        # 保存配置文件
-        student_id = self.studentIdLineEdit.text().strip()
-        password = self.passwordLineEdit.text().strip()
-        webhook_url = self.webhookLineEdit.text().strip()
+        except Exception:
+            config = {}
         
-        webhook_urls = []
-        if webhook_url:
-            webhook_urls.append(webhook_url)
+        # 界面上只编辑第一个webhook URL
+        webhook_urls = list(config.get('webhook_urls', []))[1:]
+        if fields['webhook_url']:
+            webhook_urls.insert(0, fields['webhook_url'])
         
-        config = {
-            'student_id': student_id,
-            'password': password,
+        config.update({
+            'student_id': fields['student_id'],
+            'password': fields['password'],
             'webhook_urls': webhook_urls
-        }
+        })
         
         try:
-            with open('config.json', 'w', encoding='utf-8') as f:
+            # 先写临时文件再替换，常驻进程重新加载配置时不会读到写了一半的文件
+            with open('config.json.tmp', 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=4)
-            return True
+            os.replace('config.json.tmp', 'config.json')
         except Exception as e:
-            self.showErrorMessage('保存配置失败', str(e))
-            return False
-            
+            raise RuntimeError(f'保存配置失败: {e}')
+    
+    def runInBackground(self, fn, *args, onFinished=None, onFailed=None):
+        """在线程池中执行fn，完成后在界面线程中调用onFinished(结果)或onFailed(错误信息)"""
+        task = Task(fn, *args)
+        task.setAutoDelete(False)
+        # 保持对任务信号对象的引用，直到任务完成
+        self.tasks.add(task)
+        task.signals.finished.connect(lambda result: self.onTaskDone(task, onFinished, result))
+        task.signals.failed.connect(lambda error: self.onTaskDone(task, onFailed, error))
+        self.threadPool.start(task)
+        return task
+    
+    def onTaskDone(self, task, callback, value):
+        self.tasks.discard(task)
+        if callback is not None:
+            callback(value)
+        
     def bindEvents(self):
         # 绑定按钮事件
         self.registerButton.clicked.connect(self.registerTask)
         self.uninstallButton.clicked.connect(self.uninstallTask)
+        self.testLoginButton.clicked.connect(self.testLogin)
+    
+    def setBusy(self, busy):
+        # 后台操作进行期间禁用按钮，避免重复提交
+        self.registerButton.setEnabled(not busy)
+        self.uninstallButton.setEnabled(not busy)
     
     def registerTask(self):
         # 检查输入
         if not self.validateInput():
             return
         
-        # 保存配置
-        if not self.saveConfig():
+        fields = self.collectConfig()
+        # 确认是否注册
+        title = '注册定时任务'
+        content = '确定要注册自动登录定时任务吗？这将允许程序在连接网络时以及每3分钟自动登录校园网。'
+        from qfluentwidgets import MessageBox
+        dialog = MessageBox(title, content, self)
+        
+        if not dialog.exec():
+            # 取消注册时仍保存填写的配置
+            self.runInBackground(self.writeConfig, fields,
+                                 onFailed=lambda error: self.showErrorMessage('保存配置失败', error))
             return
-            
-        try:
-            # 确认是否注册
-            title = '注册定时任务'
-            content = '确定要注册自动登录定时任务吗？这将允许程序在连接网络时以及每3分钟自动登录校园网。'
-            dialog = MessageBox(title, content, self)
-            
-            if dialog.exec():
-                current_dir = os.path.abspath(os.path.dirname(__file__))
-                
-                # 直接生成XML，而不是调用外部脚本
-                self.createTaskXml(current_dir)
-                
-                # 运行批处理注册计划任务
-                bat_path = os.path.join(current_dir, 'register_task.bat')
-                
-                # 使用subprocess调用批处理文件
-                result = subprocess.run([bat_path], shell=True, capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    self.showSuccessMessage('注册成功', '自动登录计划任务已成功注册')
-                else:
-                    self.showErrorMessage('注册失败', result.stderr)
-        except Exception as e:
-            self.showErrorMessage('注册计划任务失败', str(e))
+        
+        self.setBusy(True)
+        current_dir = os.path.abspath(os.path.dirname(__file__))
+        self.runInBackground(self.doRegisterTask, fields, current_dir,
+                             onFinished=self.onRegisterFinished,
+                             onFailed=self.onRegisterFailed)
+    
+    def doRegisterTask(self, fields, current_dir):
+        """保存配置、生成任务XML并运行注册批处理，在后台线程中执行"""
+        self.writeConfig(fields)
+        
+        # 直接生成XML，而不是调用外部脚本
+        self.createTaskXml(current_dir)
+        
+        # 运行批处理注册计划任务
+        bat_path = os.path.join(current_dir, 'register_task.bat')
+        
+        return self.runBatch(bat_path)
+    
+    def onRegisterFinished(self, result):
+        self.setBusy(False)
+        if result.returncode == 0:
+            self.showSuccessMessage('注册成功', '自动登录计划任务已成功注册')
+        else:
+            self.showErrorMessage('注册失败', result.stderr)
+    
+    def onRegisterFailed(self, error):
+        self.setBusy(False)
+        self.showErrorMessage('注册计划任务失败', error)
     
     def createTaskXml(self, current_dir):
         """直接生成任务XML文件，不需要调用外部脚本"""
@@ -216,26 +346,120 @@ class LoginWidget(QWidget):
             file.write(xml_content)
     
     def uninstallTask(self):
-        try:
-            # 确认是否卸载
-            title = '卸载定时任务'
-            content = '确定要卸载自动登录定时任务吗？卸载后将不再自动登录校园网。'
-            dialog = MessageBox(title, content, self)
-            
-            if dialog.exec():
-                # 运行批处理卸载计划任务
-                current_dir = os.path.abspath(os.path.dirname(__file__))
-                bat_path = os.path.join(current_dir, 'unregister_task.bat')
-                
-                # 使用subprocess调用批处理文件
-                result = subprocess.run([bat_path], shell=True, capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    self.showSuccessMessage('卸载成功', '自动登录计划任务已成功卸载')
-                else:
-                    self.showErrorMessage('卸载失败', result.stderr)
-        except Exception as e:
-            self.showErrorMessage('卸载计划任务失败', str(e))
+        # 确认是否卸载
+        title = '卸载定时任务'
+        content = '确定要卸载自动登录定时任务吗？卸载后将不再自动登录校园网。'
+        from qfluentwidgets import MessageBox
+        dialog = MessageBox(title, content, self)
+        
+        if not dialog.exec():
+            return
+        
+        self.setBusy(True)
+        # 运行批处理卸载计划任务
+        current_dir = os.path.abspath(os.path.dirname(__file__))
+        bat_path = os.path.join(current_dir, 'unregister_task.bat')
+        self.runInBackground(self.runBatch, bat_path,
+                             onFinished=self.onUninstallFinished,
+                             onFailed=self.onUninstallFailed)
+    
+    @staticmethod
+    def runBatch(bat_path):
+        """使用subprocess调用批处理文件，在后台线程中执行"""
+        import subprocess
+        return subprocess.run([bat_path], shell=True, capture_output=True, text=True)
+    
+    def onUninstallFinished(self, result):
+        self.setBusy(False)
+        if result.returncode == 0:
+            self.showSuccessMessage('卸载成功', '自动登录计划任务已成功卸载')
+        else:
+            self.showErrorMessage('卸载失败', result.stderr)
+    
+    def onUninstallFailed(self, error):
+        self.setBusy(False)
+        self.showErrorMessage('卸载计划任务失败', error)
+    
+    def loginCommand(self):
+        """
+        返回执行单次登录的程序与参数：编译后使用同目录下的login.exe，源码运行时使用loginCore/main.py
+        """
+        current_dir = os.path.abspath(os.path.dirname(__file__))
+        login_exe = os.path.join(current_dir, 'login.exe')
+        if os.path.exists(login_exe):
+            return login_exe, []
+        main_py = os.path.join(os.path.dirname(current_dir), 'loginCore', 'main.py')
+        return sys.executable, [main_py]
+    
+    def testLogin(self):
+        # 保存配置后在子进程中执行一次登录，通过--trace输出的JSON行实时显示各阶段耗时
+        if not self.validateInput() or self.loginProcess is not None:
+            return
+        
+        self.testLoginButton.setEnabled(False)
+        self.phaseLabel.setText('正在保存配置...')
+        self.runInBackground(self.writeConfig, self.collectConfig(),
+                             onFinished=lambda _: self.startLoginProcess(),
+                             onFailed=self.onTestLoginFailed)
+    
+    def startLoginProcess(self):
+        program, args = self.loginCommand()
+        self.phases = []
+        self.loginOutput = []
+        self.phaseLabel.setText('正在登录...')
+        
+        process = QProcess(self)
+        process.setWorkingDirectory(os.getcwd())
+        process.readyReadStandardError.connect(self.onLoginTrace)
+        process.readyReadStandardOutput.connect(self.onLoginOutput)
+        process.finished.connect(self.onLoginProcessFinished)
+        process.errorOccurred.connect(self.onLoginProcessError)
+        self.loginProcess = process
+        process.start(program, args + ['-c', os.path.abspath('config.json'), '--trace'])
+    
+    def onLoginTrace(self):
+        # 每个阶段结束时登录程序输出一行JSON记录
+        data = bytes(self.loginProcess.readAllStandardError()).decode('utf-8', errors='replace')
+        for line in data.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'span' in record and 'duration_ms' in record:
+                self.phases.append(f"{record['span']} {record['duration_ms']:.1f}ms")
+        self.phaseLabel.setText('各阶段耗时: ' + '，'.join(self.phases))
+    
+    def onLoginOutput(self):
+        data = bytes(self.loginProcess.readAllStandardOutput()).decode('utf-8', errors='replace')
+        self.loginOutput.extend(line for line in data.splitlines() if line.strip())
+    
+    def onLoginProcessFinished(self, exitCode, exitStatus):
+        self.onLoginTrace()
+        self.onLoginOutput()
+        # 登录结果之后可能还有通知发送失败等输出，优先显示登录成功的结果
+        success = [line for line in self.loginOutput if line == '登录成功' or line.startswith('已处于登录状态')]
+        if success:
+            self.showSuccessMessage('测试登录', success[-1])
+        else:
+            message = self.loginOutput[-1] if self.loginOutput else '登录程序没有输出结果'
+            self.showWarningMessage('测试登录', message)
+        self.resetLoginProcess()
+    
+    def onLoginProcessError(self, error):
+        if error == QProcess.ProcessError.FailedToStart:
+            self.onTestLoginFailed(f'无法启动登录程序: {self.loginProcess.program()}')
+            self.resetLoginProcess()
+    
+    def onTestLoginFailed(self, error):
+        self.phaseLabel.setText('')
+        self.testLoginButton.setEnabled(True)
+        self.showErrorMessage('测试登录失败', error)
+    
+    def resetLoginProcess(self):
+        if self.loginProcess is not None:
+            self.loginProcess.deleteLater()
+            self.loginProcess = None
+        self.testLoginButton.setEnabled(True)
     
     def validateInput(self):
         # 验证输入
@@ -253,6 +477,7 @@ class LoginWidget(QWidget):
         return True
     
     def showSuccessMessage(self, title, content):
+        from qfluentwidgets import InfoBar, InfoBarPosition
         InfoBar.success(
             title=title,
             content=content,
@@ -264,6 +489,7 @@ class LoginWidget(QWidget):
         )
     
     def showWarningMessage(self, title, content):
+        from qfluentwidgets import InfoBar, InfoBarPosition
         InfoBar.warning(
             title=title,
             content=content,
@@ -275,6 +501,7 @@ class LoginWidget(QWidget):
         )
     
     def showErrorMessage(self, title, content):
+        from qfluentwidgets import InfoBar, InfoBarPosition
         InfoBar.error(
             title=title,
             content=content,
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+from functools import partial
+from urllib.parse import urlsplit
+from async_transport import AsyncSession
+from notify import build_text_message, interpret_webhook_response, backoff_delay
+from metrics import WEBHOOK_DELIVERIES
+
+
+class AsyncNotifier:
+    """Notifier的asyncio版本，发送方法为协程，多个webhook在同一个事件循环中并发发送"""
+
+    def __init__(self, webhook_urls, timeout=5, max_retries=2, backoff=0.5, session=None, proxies=None):
+        """
+        初始化通知器实例
+
+        AsyncSession不支持代理。与同步版本的stdlib实现相同读取系统代理（环境变量优先，包括NO_PROXY），
+        需要经代理访问的webhook改为在线程池中用StdlibSession发送，其余webhook仍在事件循环中直接连接
+
+        Args:
+            webhook_urls: webhook URL的列表或字符串
+            timeout: 单次请求的超时时间（秒）
+            max_retries: 单个webhook失败后的最大重试次数
+            backoff: 重试退避的基础时间（秒），实际等待时间带随机抖动
+            session: 共享的AsyncSession，不指定则创建自有的会话
+            proxies: 代理设置，格式与urllib.request.getproxies()的返回值相同，不指定则读取系统代理
+        """
+        if isinstance(webhook_urls, str):
+            self.webhook_urls = [webhook_urls]
+        else:
+            self.webhook_urls = webhook_urls
+
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = session or AsyncSession()
+        self.last_results = {}
+
+        if proxies is None:
+            from urllib.request import getproxies
+            proxies = getproxies()
+        self.proxies = proxies
+        self.proxy_session = None
+        if proxies:
+            from transport import StdlibSession
+            self.proxy_session = StdlibSession(proxies=proxies)
+
+    async def send_text(self, content, mentioned_list=None, mentioned_mobile_list=None):
+        """
+        发送文本消息
+
+        Args:
+            content: 消息内容
+            mentioned_list: 要@的成员ID列表
+            mentioned_mobile_list: 要@的成员手机号列表
+
+        Returns:
+            bool: 是否发送成功
+        """
+        return await self._send(build_text_message(content, mentioned_list, mentioned_mobile_list))
+
+    async def _send(self, data, webhook_url=None):
+        """
+        并发发送消息到指定的webhook URL，各URL的结果记录在last_results中
+
+        Args:
+            data: 要发送的消息数据
+            webhook_url: 要发送的webhook URL，如果不指定，则发送到所有webhook URLs
+
+        Returns:
+            bool: 是否全部发送成功
+        """
+        webhooks = self.webhook_urls if webhook_url is None else [webhook_url]
+        if not webhooks:
+            return True
+
+        body = json.dumps(data)
+        results = await asyncio.gather(*(self._post(webhook, body) for webhook in webhooks))
+        self.last_results = dict(zip(webhooks, results))
+        return all(result["success"] for result in results)
+
+    async def _post(self, webhook, body):
+        """
+        发送消息到单个webhook，可重试的失败按带抖动的指数退避重试
+
+        Args:
+            webhook: webhook URL
+            body: 已序列化的消息数据
+
+        Returns:
+            dict: 包含success、attempts和error的发送结果
+        """
+        headers = {"Content-Type": "application/json"}
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(backoff_delay(self.backoff, attempt))
+            try:
+                response = await self._request(webhook, body, headers)
+                success, error, retryable = interpret_webhook_response(response.status_code, response.text)
+                if success:
+                    WEBHOOK_DELIVERIES.inc("success")
+                    return {"success": True, "attempts": attempt + 1, "error": None}
+            except Exception as e:
+                error = str(e)
+                retryable = True
+
+            if not retryable:
+                break
+
+        WEBHOOK_DELIVERIES.inc("failure")
+        print(f"发送消息失败: {error}")
+        return {"success": False, "attempts": attempt + 1, "error": error}
+
+    async def _request(self, webhook, body, headers):
+        """
+        发送一次POST请求，需要经代理访问的webhook在线程池中用StdlibSession发送
+
+        Returns:
+            响应对象，包含status_code和text
+        """
+        parts = urlsplit(webhook)
+        if self.proxy_session is not None and self.proxy_session.get_proxy(parts.scheme, parts.netloc):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, partial(self.proxy_session.post, webhook, data=body,
+                                                            headers=headers, timeout=self.timeout))
+        return await self.session.post(webhook, data=body, headers=headers, timeout=self.timeout)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+from async_transport import AsyncSession
+from portal import ePortal, NOT_ON_CAMPUS_MESSAGE, extract_jsonp, interpret_login_result, interpret_status_result
+from tracing import Tracer, Deadline, DeadlineExceeded
+from metrics import PROBE_SECONDS, LOGIN_SECONDS
+
+
+class AsyncEPortal(ePortal):
+    """ePortal的asyncio版本，探测与登录方法为协程，大量账号的探测与登录可以在同一个事件循环中并发执行"""
+
+    def __init__(self, user_account, user_password, wlan_user_ip=None, session=None, resolver=None, base_url=None,
+                 site_url=None, wlan_user_mac=None, speculative=False):
+        """
+        初始化AsyncEPortal实例
+
+        Args:
+            user_account: 学号
+            user_password: 密码
+            wlan_user_ip: 需要认证的IP地址，不指定则自动获取本机IP
+            session: 共享的AsyncSession，不指定则创建自有的会话；多个实例共享同一会话时复用长连接
+            resolver: 本机地址发现实例，不指定则使用默认校园网地址段的共享实例
+            base_url: 登录接口地址，默认为http://172.16.253.3:801/eportal/
+            site_url: 门户站点地址，用于校园网探测与认证状态查询，默认为http://172.16.253.3/
+            wlan_user_mac: 需要认证的MAC地址，可包含:或-分隔符，不指定则为000000000000
+            speculative: 是否在探测校园网的同时发出登录请求，探测失败时取消登录请求；
+                只在近期已确认处于校园网的地址上生效，见ePortal.can_speculate
+        """
+        super().__init__(user_account, user_password, wlan_user_ip, session=session or AsyncSession(),
+                         resolver=resolver, base_url=base_url, site_url=site_url, wlan_user_mac=wlan_user_mac,
+                         speculative=speculative)
+
+    async def is_connected_to_campus_network(self, timeout=5):
+        """
+        检查是否已连接到校园网（但可能尚未认证）
+
+        Args:
+            timeout: 超时时间（秒）
+
+        Returns:
+            bool: 是否已连接到校园网
+        """
+        try:
+            response = await self.session.get(self.campus_check_url, timeout=timeout)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    async def is_authenticated(self, timeout=3, session=None):
+        """
+        通过认证状态接口检查当前IP是否已经完成认证，不发送登录请求
+
+        Args:
+            timeout: 超时时间（秒）
+            session: 查询使用的AsyncSession，默认为自身的会话
+
+        Returns:
+            bool: 是否已认证
+        """
+        try:
+            response = await (session or self.session).get(self.status_url, timeout=timeout)
+            if response.status_code != 200:
+                return False
+            return interpret_status_result(extract_jsonp("dr1002", response.text), self.wlan_user_ip)
+        except Exception:
+            return False
+
+    async def login(self, tracer=None, deadline=None):
+        """
+        执行登录操作
+
+        Args:
+            tracer: Tracer实例，用于记录各阶段耗时
+            deadline: Deadline实例，探测与登录请求按份额分配剩余时间
+
+        Returns:
+            bool: 登录是否成功
+            str: 登录结果信息
+        """
+        tracer = tracer or Tracer()
+        deadline = deadline or Deadline()
+        outcome = self.last_outcome = {"status": None, "result": None, "error": None}
+
+        try:
+            if self.speculative and self.can_speculate():
+                return await self.login_speculative(tracer, deadline, outcome)
+
+            if not await self.probe(tracer, deadline):
+                outcome["error"] = "not_on_campus"
+                return False, NOT_ON_CAMPUS_MESSAGE
+            return await self.send_login(tracer, deadline, outcome)
+
+        except DeadlineExceeded as e:
+            outcome["error"] = "deadline"
+            return False, f"登录超时: {str(e)}"
+        except Exception as e:
+            outcome["error"] = type(e).__name__
+            return False, f"登录过程中发生异常: {str(e)}"
+
+    async def probe(self, tracer, deadline):
+        """
+        探测是否已连接到校园网
+
+        Returns:
+            bool: 是否已连接到校园网
+        """
+        with tracer.span("probe", histogram=PROBE_SECONDS):
+            connected = await self.is_connected_to_campus_network(timeout=deadline.timeout(0.3, 5))
+        self.mark_on_campus(connected)
+        return connected
+
+    async def send_login(self, tracer, deadline, outcome):
+        """
+        发送登录请求并解析结果
+
+        Args:
+            tracer: Tracer实例
+            deadline: Deadline实例
+            outcome: 记录HTTP状态码与解析结果的字典
+
+        Returns:
+            bool: 登录是否成功
+            str: 登录结果信息
+        """
+        params = self.build_login_params()
+        with tracer.span("login", histogram=LOGIN_SECONDS):
+            response = await self.session.get(
+                self.login_url,
+                params=params,
+                timeout=deadline.timeout(0.9, self.login_timeout)
+            )
+
+        outcome["status"] = response.status_code
+        if response.status_code != 200:
+            return False, f"登录失败，HTTP状态码: {response.status_code}"
+        with tracer.span("parse"):
+            outcome["result"] = extract_jsonp("dr1003", response.text)
+            return interpret_login_result(outcome["result"])
+
+    async def login_speculative(self, tracer, deadline, outcome):
+        """
+        将登录请求作为任务发出的同时探测校园网，探测失败时取消登录任务
+
+        Returns:
+            bool: 登录是否成功
+            str: 登录结果信息
+        """
+        # 登录任务使用独立的结果记录，被取消时不会影响本次登录的outcome
+        pending = {"status": None, "result": None, "error": None}
+        task = asyncio.ensure_future(self.send_login(tracer, deadline, pending))
+        try:
+            connected = await self.probe(tracer, deadline)
+        except BaseException:
+            discard(task)
+            raise
+        if not connected:
+            discard(task)
+            outcome["error"] = "not_on_campus"
+            return False, NOT_ON_CAMPUS_MESSAGE
+
+        result = await task
+        outcome.update(pending)
+        return result
+
+
+def discard(task):
+    """取消不再需要的任务，并在其结束时取出异常，避免事件循环报告未处理的异常"""
+    task.cancel()
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import ssl
+from urllib.parse import urlsplit, urlencode
+from transport import StdlibResponse
+
+
+class AsyncSession:
+    """基于asyncio的HTTP/1.1会话，接口与StdlibSession一致但方法为协程，按主机复用空闲长连接"""
+
+    def __init__(self, limit_per_host=100, source_address=None):
+        """
+        Args:
+            limit_per_host: 到同一主机的最大并发连接数，超出的请求等待空闲连接
+            source_address: 发起连接使用的本机地址
+        """
+        self.headers = {}
+        self.limit_per_host = max(1, int(limit_per_host))
+        self.source_address = (source_address, 0) if source_address else None
+        self._idle = {}
+        self._limits = {}
+        self._ssl_context = None
+        self.num_connections = 0
+        self.num_requests = 0
+
+    def _limit(self, key):
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.limit_per_host)
+        return limit
+
+    async def _open(self, scheme, host, port):
+        """
+        获取到指定主机的连接，优先复用空闲连接
+
+        Returns:
+            tuple: (StreamReader, StreamWriter, 是否为复用的连接)
+        """
+        idle = self._idle.get((scheme, host, port))
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        if scheme == "https" and self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        reader, writer = await asyncio.open_connection(host, port, ssl=self._ssl_context if scheme == "https" else None,
+                                                       local_addr=self.source_address)
+        self.num_connections += 1
+        return reader, writer, False
+
+    async def request(self, method, url, params=None, data=None, headers=None, timeout=None):
+        """
+        发送HTTP请求，服务器关闭了空闲长连接时自动重连一次
+
+        Args:
+            method: 请求方法
+            url: 请求地址
+            params: 附加到URL上的查询参数
+            data: 请求体（str或bytes）
+            headers: 额外的请求头
+            timeout: 超时时间（秒），包含等待空闲连接的时间
+
+        Returns:
+            StdlibResponse: 响应对象
+        """
+        parts = urlsplit(url)
+        try:
+            return await asyncio.wait_for(self._request(method, parts, params, data, headers), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"请求{parts.netloc}超时（{timeout}秒）") from None
+
+    async def _request(self, method, parts, params, data, headers):
+        scheme = parts.scheme or "http"
+        host = parts.hostname
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        query = parts.query
+        if params:
+            query = f"{query}&{urlencode(params)}" if query else urlencode(params)
+        if query:
+            path = f"{path}?{query}"
+
+        request_headers = {"Host": parts.netloc, "Accept-Encoding": "identity"}
+        request_headers.update(self.headers)
+        if headers:
+            request_headers.update(headers)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if data is not None or method in ("POST", "PUT"):
+            request_headers["Content-Length"] = str(len(data or b""))
+        head = f"{method} {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in request_headers.items()) + "\r\n"
+        payload = head.encode("latin-1") + (data or b"")
+
+        key = (scheme, host, port)
+        async with self._limit(key):
+            for attempt in range(2):
+                reader, writer, reused = await self._open(scheme, host, port)
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    status, response_headers, content, keep_alive = await self._read_response(reader, method)
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise ConnectionError(f"连接{parts.netloc}失败: {e}") from e
+                except BaseException:
+                    # 包括超时或推测登录被取消，连接中可能残留未读完的响应，不能再复用
+                    writer.close()
+                    raise
+
+                self.num_requests += 1
+                if keep_alive:
+                    self._idle.setdefault(key, []).append((reader, writer))
+                else:
+                    writer.close()
+                encoding = "utf-8"
+                content_type = response_headers.get("content-type", "")
+                if "charset=" in content_type:
+                    encoding = content_type.split("charset=", 1)[1].split(";")[0].strip() or encoding
+                return StdlibResponse(status, content, encoding)
+
+    @staticmethod
+    async def _read_response(reader, method):
+        """
+        读取一个HTTP响应
+
+        Returns:
+            int: 状态码
+            dict: 响应头（键为小写）
+            bytes: 响应体
+            bool: 连接能否继续复用
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("服务器关闭了连接")
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        status = int(status)
+        connection = response_headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            return status, response_headers, b"", keep_alive
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    # 跳过trailer
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            return status, response_headers, b"".join(chunks), keep_alive
+        if "content-length" in response_headers:
+            return status, response_headers, await reader.readexactly(int(response_headers["content-length"])), \
+                keep_alive
+        return status, response_headers, await reader.read(), False
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        """发送GET请求"""
+        return await self.request("GET", url, params=params, headers=headers, timeout=timeout)
+
+    async def post(self, url, data=None, headers=None, timeout=None):
+        """发送POST请求"""
+        return await self.request("POST", url, data=data, headers=headers, timeout=timeout)
+
+    def close(self):
+        """关闭所有空闲连接"""
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+    def connection_stats(self):
+        """
+        Returns:
+            dict: 包含connections（新建连接数）、requests（请求数）和reused（复用连接的请求数）
+        """
+        return {
+            "connections": self.num_connections,
+            "requests": self.num_requests,
+            "reused": max(0, self.num_requests - self.num_connections)
+        }
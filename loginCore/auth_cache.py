@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+from util import atomic_write_json
+
+
+class AuthCache:
+    """认证状态缓存模块，按(账号, IP)记录最近一次确认在线的时间"""
+
+    def __init__(self, cache_file="auth_cache.json", ttl=600):
+        """
+        初始化认证状态缓存
+
+        Args:
+            cache_file: 缓存文件路径
+            ttl: 缓存有效期（秒）
+        """
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.entries = {}
+        self.stats = {"checks": 0, "skips": 0}
+        self.load()
+
+    @staticmethod
+    def make_key(account, ip):
+        """生成缓存键"""
+        return f"{account}@{ip}"
+
+    def load(self):
+        """从磁盘加载缓存，文件不存在或损坏时使用空缓存"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = data.get("entries", {})
+            self.stats.update(data.get("stats", {}))
+        except Exception as e:
+            print(f"加载认证缓存失败: {e}")
+
+    def save(self):
+        """将缓存写回磁盘，先写临时文件再替换，避免并发读取到半个文件"""
+        try:
+            atomic_write_json(self.cache_file, {"entries": self.entries, "stats": self.stats})
+        except Exception as e:
+            print(f"保存认证缓存失败: {e}")
+
+    def is_fresh(self, account, ip):
+        """
+        检查缓存是否认为该账号与IP当前在线
+
+        Args:
+            account: 学号
+            ip: 认证的IP地址
+
+        Returns:
+            bool: 缓存记录存在且未过期
+        """
+        online_at = self.entries.get(self.make_key(account, ip))
+        return online_at is not None and time.time() - online_at < self.ttl
+
+    def online_at(self, account, ip):
+        """
+        Returns:
+            float: 该账号与IP最近确认在线的时间戳，没有记录时返回None
+        """
+        return self.entries.get(self.make_key(account, ip))
+
+    def mark_online(self, account, ip):
+        """记录该账号与IP已确认在线"""
+        self.entries[self.make_key(account, ip)] = time.time()
+
+    def invalidate(self, account, ip):
+        """清除该账号与IP的在线记录"""
+        self.entries.pop(self.make_key(account, ip), None)
+
+    def record(self, skipped):
+        """
+        记录一次登录检查并保存缓存
+
+        Args:
+            skipped: 本次检查是否跳过了门户登录
+        """
+        self.stats["checks"] += 1
+        if skipped:
+            self.stats["skips"] += 1
+        self.save()
+
+    def skip_rate(self):
+        """
+        Returns:
+            float: 跳过门户登录的检查所占比例
+        """
+        if not self.stats["checks"]:
+            return 0.0
+        return self.stats["skips"] / self.stats["checks"]
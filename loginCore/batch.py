@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from portal import ePortal
+
+
+class BatchLogin:
+    """多账号/多主机并发登录模块"""
+
+    def __init__(self, accounts, max_workers=8, transport="requests", portal_options=None):
+        """
+        初始化批量登录实例
+
+        Args:
+            accounts: 账号列表，每项为包含student_id、password和可选wlan_user_ip、wlan_user_mac的字典
+            max_workers: 最大并发数
+            transport: HTTP实现，"requests"或"stdlib"
+            portal_options: 传递给ePortal的其他参数，如base_url、site_url
+        """
+        self.accounts = accounts
+        self.max_workers = max(1, int(max_workers))
+        self.session = ePortal.create_session(pool_size=self.max_workers, transport=transport)
+        self.portal_options = portal_options or {}
+
+    def login_one(self, account):
+        """
+        登录单个账号
+
+        Args:
+            account: 账号配置字典
+
+        Returns:
+            dict: 该账号的登录结果
+        """
+        student_id = account.get("student_id")
+        start = time.perf_counter()
+        try:
+            portal = ePortal(student_id, account.get("password"), account.get("wlan_user_ip"),
+                             session=ePortal.account_session(self.session),
+                             wlan_user_mac=account.get("wlan_user_mac"), **self.portal_options)
+            success, message = portal.login()
+            ip = portal.wlan_user_ip
+        except Exception as e:
+            success, message = False, f"登录过程中发生异常: {str(e)}"
+            ip = account.get("wlan_user_ip")
+
+        return {
+            "student_id": student_id,
+            "wlan_user_ip": ip,
+            "success": success,
+            "message": message,
+            "elapsed": time.perf_counter() - start,
+        }
+
+    def run(self):
+        """
+        通过有界线程池并发登录所有账号
+
+        Returns:
+            list: 每个账号的登录结果，顺序与accounts一致
+            float: 总耗时（秒）
+        """
+        start = time.perf_counter()
+        if not self.accounts:
+            return [], 0.0
+
+        workers = min(self.max_workers, len(self.accounts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self.login_one, self.accounts))
+        return results, time.perf_counter() - start
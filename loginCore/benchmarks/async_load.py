@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+asyncio并发基准测试
+
+在本地模拟门户上为大量账号同时登录，比较线程池驱动的ePortal与在单个事件循环中运行的AsyncEPortal
+的总耗时、吞吐量与占用的线程数，并测量同样数量的认证状态查询与AsyncNotifier的发送。
+
+用法: python benchmarks/async_load.py [-n 账号数] [--threads 线程数] [--limit 连接数] [--latency 秒]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CORE_DIR)
+
+from fake_portal import FakePortal  # noqa: E402
+from portal import ePortal  # noqa: E402
+from transport import StdlibSession  # noqa: E402
+from async_transport import AsyncSession  # noqa: E402
+from async_portal import AsyncEPortal  # noqa: E402
+from async_notify import AsyncNotifier  # noqa: E402
+
+
+def client_ip(index):
+    """为第index个账号分配一个互不相同的地址"""
+    return f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+
+
+def client_threads():
+    """当前进程中除模拟门户处理连接的线程以外的线程数"""
+    return sum(1 for thread in threading.enumerate() if "process_request" not in thread.name)
+
+
+class ThreadPeak:
+    """后台记录运行期间客户端一侧的最大线程数"""
+
+    def __init__(self):
+        self.peak = client_threads()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+
+    def _watch(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, client_threads())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def report(results, elapsed, peak, baseline_threads, session):
+    """汇总一组登录结果"""
+    return {
+        "succeeded": sum(1 for success, _ in results if success),
+        "wall_ms": round(elapsed * 1000, 3),
+        "logins_per_s": round(len(results) / elapsed, 1),
+        "client_threads": peak - baseline_threads,
+        "connections": session.connection_stats()["connections"]
+    }
+
+
+def bench_threads(fake, count, threads, baseline_threads):
+    """线程池中的线程各自调用ePortal.login"""
+    session = StdlibSession()
+    portals = [ePortal(f"s{i}", "pw", client_ip(i), session=session, base_url=fake.base_url, site_url=fake.url)
+               for i in range(count)]
+    with ThreadPeak() as peak:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(lambda portal: portal.login(), portals))
+        elapsed = time.perf_counter() - start
+    return report(results, elapsed, peak.peak, baseline_threads, session)
+
+
+async def bench_async(fake, count, limit, baseline_threads):
+    """在同一个事件循环中并发调用全部AsyncEPortal.login"""
+    session = AsyncSession(limit_per_host=limit)
+    portals = [AsyncEPortal(f"a{i}", "pw", client_ip(i), session=session, base_url=fake.base_url, site_url=fake.url)
+               for i in range(count)]
+    with ThreadPeak() as peak:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(portal.login() for portal in portals))
+        elapsed = time.perf_counter() - start
+    result = report(results, elapsed, peak.peak, baseline_threads, session)
+
+    start = time.perf_counter()
+    authenticated = await asyncio.gather(*(portal.is_authenticated() for portal in portals))
+    result["status_checks_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    result["status_authenticated"] = sum(authenticated)
+
+    # 模拟门户在本机，不经系统代理，测量事件循环中的发送
+    notifier = AsyncNotifier(fake.webhook_url, session=session, proxies={})
+    start = time.perf_counter()
+    sent = await asyncio.gather(*(notifier.send_text(f"消息{i}") for i in range(min(count, 200))))
+    result["webhook_sent"] = sum(sent)
+    result["webhook_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    session.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncio并发基准测试")
+    parser.add_argument("-n", "--count", type=int, default=2000, help="同时登录的账号数")
+    parser.add_argument("--threads", type=int, default=64, help="线程池方式的线程数")
+    parser.add_argument("--limit", type=int, default=200, help="AsyncSession到门户的最大并发连接数")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟门户每个请求的延迟（秒）")
+    args = parser.parse_args()
+
+    results = {"count": args.count}
+    with FakePortal(latency=args.latency) as fake:
+        baseline_threads = client_threads()
+        results["threaded"] = bench_threads(fake, args.count, args.threads, baseline_threads)
+        fake.reset()
+        results["asyncio"] = asyncio.run(bench_async(fake, args.count, args.limit, baseline_threads))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
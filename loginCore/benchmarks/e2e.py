@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+端到端基准测试
+
+通过本地模拟门户驱动ePortal.login、AutoLogin.login、Notifier与批量登录，
+输出p50/p99延迟与批量登录吞吐量，并与保存的基线比较，出现回退时以非零状态码退出。
+
+用法:
+    python benchmarks/e2e.py [-n 次数] [--latency 秒] [--save-baseline]
+    python benchmarks/e2e.py --baseline benchmarks/baseline.json --tolerance 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CORE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_portal import FakePortal  # noqa: E402
+from portal import ePortal  # noqa: E402
+from notify import Notifier  # noqa: E402
+from batch import BatchLogin  # noqa: E402
+from main import AutoLogin  # noqa: E402
+from util import percentile  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def summarize(samples):
+    """返回以毫秒为单位的p50/p99"""
+    return {"p50_ms": round(percentile(samples, 50) * 1000, 3), "p99_ms": round(percentile(samples, 99) * 1000, 3)}
+
+
+def timed(fn, rounds):
+    """执行fn若干次并返回每次的耗时（秒）"""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_portal(fake, rounds, transport):
+    """复用同一ePortal实例重复登录"""
+    portal = ePortal("bench", "bench", "10.0.0.1", transport=transport,
+                     base_url=fake.base_url, site_url=fake.url)
+    return summarize(timed(portal.login, rounds))
+
+
+def bench_auto_login(fake, rounds, tmp_dir, cached):
+    """通过AutoLogin执行完整登录流程，cached为True时认证状态缓存生效"""
+    # 每种场景使用独立的目录，避免共享认证状态缓存文件
+    config_dir = os.path.join(tmp_dir, "cached" if cached else "uncached")
+    os.makedirs(config_dir, exist_ok=True)
+    config_file = os.path.join(config_dir, "config.json")
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "student_id": "bench",
+            "password": "bench",
+            "auth_cache_ttl": 600 if cached else 0,
+            "portal_base_url": fake.base_url,
+            "portal_site_url": fake.url
+        }, f)
+
+    auto_login = AutoLogin(config_file)
+    with contextlib.redirect_stdout(io.StringIO()):
+        samples = timed(auto_login.login, rounds)
+    result = summarize(samples)
+    result["skip_rate"] = round(auto_login.auth_cache.skip_rate(), 3)
+    return result
+
+
+def bench_notifier(fake, rounds):
+    """向模拟webhook发送通知"""
+    notifier = Notifier([fake.webhook_url], max_retries=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return summarize(timed(lambda: notifier.send_text("benchmark"), rounds))
+
+
+def bench_batch(fake, accounts, workers):
+    """并发批量登录，返回吞吐量与总耗时"""
+    entries = [{"student_id": f"bench{i}", "password": "bench", "wlan_user_ip": f"10.1.{i // 250}.{i % 250 + 1}"}
+               for i in range(accounts)]
+    batch = BatchLogin(entries, workers, portal_options={"base_url": fake.base_url, "site_url": fake.url})
+    results, wall_time = batch.run()
+    return {
+        "accounts": accounts,
+        "workers": workers,
+        "wall_ms": round(wall_time * 1000, 3),
+        "logins_per_sec": round(accounts / wall_time, 1) if wall_time else 0.0,
+        "p99_ms": summarize([result["elapsed"] for result in results])["p99_ms"],
+        "succeeded": sum(1 for result in results if result["success"])
+    }
+
+
+def run(args):
+    """执行全部基准测试"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            FakePortal(latency=args.latency, webhook_latency=args.latency) as fake:
+        results["portal_login_requests"] = bench_portal(fake, args.rounds, "requests")
+        results["portal_login_stdlib"] = bench_portal(fake, args.rounds, "stdlib")
+        fake.reset()
+        results["auto_login_uncached"] = bench_auto_login(fake, args.rounds, tmp_dir, cached=False)
+        results["auto_login_cached"] = bench_auto_login(fake, args.rounds, tmp_dir, cached=True)
+        results["notifier"] = bench_notifier(fake, args.rounds)
+        results["batch_login"] = bench_batch(fake, args.accounts, args.workers)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    与基线比较各项p50延迟与批量登录吞吐量，p99波动较大，仅输出不参与判断
+
+    Returns:
+        list: 出现回退的指标说明
+    """
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name, {})
+        for key, value in metrics.items():
+            if key != "p50_ms" or not base.get(key):
+                continue
+            # 极小的绝对差异不计入回退，避免计时噪声导致误报
+            if value > base[key] * (1 + tolerance) and value - base[key] > min_delta_ms:
+                regressions.append(f"{name}.{key}: {value:.3f}ms（基线{base[key]:.3f}ms）")
+        if "logins_per_sec" in metrics and base.get("logins_per_sec"):
+            if metrics["logins_per_sec"] < base["logins_per_sec"] * (1 - tolerance):
+                regressions.append(f"{name}.logins_per_sec: {metrics['logins_per_sec']}（基线{base['logins_per_sec']}）")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端基准测试")
+    parser.add_argument("-n", "--rounds", type=int, default=200, help="每项测试的执行次数")
+    parser.add_argument("--latency", type=float, default=0.002, help="模拟门户的请求延迟（秒）")
+    parser.add_argument("--accounts", type=int, default=50, help="批量登录的账号数")
+    parser.add_argument("--workers", type=int, default=16, help="批量登录的并发数")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的回退比例")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="延迟超出基线的绝对值低于该值时不视为回退")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"已保存基线: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"未找到基线文件: {args.baseline}（可使用--save-baseline生成）")
+        sys.exit(1)
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print("检测到性能回退:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("未检测到性能回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+本地模拟ePortal服务器
+
+模拟a79.htm校园网探测页、dr1003(...)登录接口、dr1002(...)认证状态接口以及企业微信webhook，
+支持配置延迟、HTTP错误率与登录失败信息，用于在没有真实门户的环境中测试和基准测试。
+
+用法: python benchmarks/fake_portal.py [--port 端口] [--latency 秒] [--error-rate 比例] [--fail-rate 比例]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+
+class FakePortalServer(ThreadingHTTPServer):
+    """加大监听队列，大量客户端同时建立连接时不因队列溢出而等待SYN重传"""
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class FakePortal:
+    """模拟ePortal服务器"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 fail_rate=0.0, fail_message="密码错误", webhook_latency=0.0):
+        """
+        初始化模拟服务器
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            latency: 每个请求的固定延迟（秒）
+            jitter: 在固定延迟上叠加的随机延迟上限（秒）
+            error_rate: 登录接口返回HTTP 500的比例
+            fail_rate: 登录接口返回认证失败的比例
+            fail_message: 认证失败时返回的msg
+            webhook_latency: webhook接口的额外延迟（秒）
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_rate = fail_rate
+        self.fail_message = fail_message
+        self.webhook_latency = webhook_latency
+        self.online = set()
+        self.login_times = []
+        self.requests = {}
+        self.webhook_messages = []
+        self._lock = threading.Lock()
+        self.server = FakePortalServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        """服务器根地址"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def base_url(self):
+        """登录接口地址，对应ePortal的base_url参数"""
+        return f"{self.url}eportal/"
+
+    @property
+    def webhook_url(self):
+        """模拟的企业微信webhook地址"""
+        return f"{self.url}cgi-bin/webhook/send?key=fake"
+
+    def _count(self, route):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def _delay(self, extra=0.0):
+        delay = self.latency + extra + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def handle_login(self, query):
+        """
+        处理登录请求
+
+        Returns:
+            int: HTTP状态码
+            str: 响应内容
+        """
+        if self.error_rate and random.random() < self.error_rate:
+            return 500, "Internal Server Error"
+        if self.fail_rate and random.random() < self.fail_rate:
+            return 200, "dr1003(" + json.dumps({"result": "0", "msg": self.fail_message, "ret_code": 1},
+                                               ensure_ascii=False) + ")"
+        ip = query.get("wlan_user_ip", [""])[0]
+        with self._lock:
+            self.online.add(ip)
+            self.login_times.append(time.time())
+        return 200, "dr1003(" + json.dumps({"result": "1", "msg": "Portal协议认证成功！"}, ensure_ascii=False) + ")"
+
+    def handle_status(self, client_ip):
+        """
+        处理认证状态查询，按请求来源IP判断是否在线，从127.0.0.1发起的查询视为代表任一已登录IP
+
+        Returns:
+            int: HTTP状态码
+            str: 响应内容
+        """
+        with self._lock:
+            online = client_ip in self.online or (bool(self.online) and client_ip == "127.0.0.1")
+        if online:
+            return 200, "dr1002(" + json.dumps({"result": 1, "uid": "fake"}) + ")"
+        return 200, "dr1002(" + json.dumps({"result": 0}) + ")"
+
+    def _make_handler(self):
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头与响应体分两次写出，关闭Nagle算法以免与客户端的延迟确认叠加出约40ms的额外延迟
+            disable_nagle_algorithm = True
+
+            def _reply(self, status, body, content_type="text/html; charset=utf-8"):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                portal._delay()
+                if parts.path == "/a79.htm":
+                    portal._count("probe")
+                    self._reply(200, "<html><body>ePortal</body></html>")
+                elif parts.path == "/eportal/":
+                    portal._count("login")
+                    self._reply(*portal.handle_login(parse_qs(parts.query)))
+                elif parts.path == "/drcom/chkstatus":
+                    portal._count("status")
+                    self._reply(*portal.handle_status(self.client_address[0]))
+                else:
+                    self._reply(404, "Not Found")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                if urlsplit(self.path).path != "/cgi-bin/webhook/send":
+                    self._reply(404, "Not Found")
+                    return
+                portal._count("webhook")
+                portal._delay(portal.webhook_latency)
+                with portal._lock:
+                    portal.webhook_messages.append(json.loads(body or b"{}"))
+                self._reply(200, json.dumps({"errcode": 0, "errmsg": "ok"}), "application/json")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def drop(self, ips):
+        """使指定IP掉线"""
+        with self._lock:
+            self.online.difference_update(ips)
+
+    def peak_login_rate(self, window=1.0):
+        """
+        Returns:
+            int: 任意window秒内收到的最多登录请求数
+        """
+        with self._lock:
+            times = sorted(self.login_times)
+        peak = 0
+        first = 0
+        for last, t in enumerate(times):
+            while t - times[first] >= window:
+                first += 1
+            peak = max(peak, last - first + 1)
+        return peak
+
+    def reset(self):
+        """清空在线状态与请求统计"""
+        with self._lock:
+            self.online.clear()
+            self.login_times.clear()
+            self.requests.clear()
+            self.webhook_messages.clear()
+
+    def start(self):
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-portal", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务器"""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟ePortal服务器")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8801, help="监听端口")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机延迟上限（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="登录接口返回HTTP 500的比例")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="登录接口返回认证失败的比例")
+    parser.add_argument("--fail-message", default="密码错误", help="认证失败时返回的msg")
+    args = parser.parse_args()
+
+    portal = FakePortal(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                        args.fail_rate, args.fail_message)
+    print(f"模拟门户已启动: portal_base_url={portal.base_url} portal_site_url={portal.url}")
+    print(f"模拟webhook: {portal.webhook_url}")
+    try:
+        portal.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+网关模式基准测试
+
+在本地模拟门户上为多个回环地址（127.0.1.x，仅Linux可直接绑定）认证，比较不限速的逐个登录循环与网关模式
+（gateway.GatewayLogin）的门户峰值请求速率，并验证：
+- 只有掉线的条目会重新登录
+- 两个进程同时运行时共用同一令牌桶预算
+
+用法: python benchmarks/gateway_load.py [--entries 条目数] [--rate 每秒令牌数] [--burst 桶容量] [-w 并发数]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CORE_DIR)
+
+from fake_portal import FakePortal  # noqa: E402
+from gateway import GatewayLogin  # noqa: E402
+from portal import ePortal  # noqa: E402
+from ratelimit import TokenBucket  # noqa: E402
+
+
+def make_entries(count, offset=0):
+    """生成count个回环地址条目"""
+    return [{"student_id": f"gw{i}", "password": "bench", "wlan_user_ip": f"127.0.{1 + i // 250}.{i % 250 + 1}",
+             "wlan_user_mac": f"02:00:00:00:{i // 256:02x}:{i % 256:02x}"}
+            for i in range(offset, offset + count)]
+
+
+def naive_loop(fake, entries, workers):
+    """不限速地并发登录所有条目"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    options = {"base_url": fake.base_url, "site_url": fake.url}
+    session = ePortal.create_session(pool_size=workers)
+
+    def login(entry):
+        return ePortal(entry["student_id"], entry["password"], entry["wlan_user_ip"], session=session,
+                       wlan_user_mac=entry["wlan_user_mac"], **options).login()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(login, entries))
+    return time.perf_counter() - start
+
+
+def run_gateway(fake_urls, entries, state_dir, rate, burst, workers, tag):
+    """执行一轮网关检查，返回汇总统计"""
+    bucket = TokenBucket(os.path.join(state_dir, "ratelimit.db"), rate, burst)
+    gateway = GatewayLogin(entries, bucket, workers, portal_options=fake_urls,
+                           state_file=os.path.join(state_dir, f"gateway_state_{tag}.json"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        results, stats = gateway.run()
+    bucket.close()
+    queued = [result["queue_ms"] for result in results if result["queue_ms"] is not None]
+    stats["max_queue_ms"] = max(queued) if queued else 0.0
+    return stats
+
+
+def _process_main(args):
+    return run_gateway(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="网关模式基准测试")
+    parser.add_argument("--entries", type=int, default=200, help="条目数")
+    parser.add_argument("--rate", type=float, default=20, help="令牌桶每秒补充的令牌数")
+    parser.add_argument("--burst", type=float, default=5, help="令牌桶容量")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="并发数")
+    parser.add_argument("--drop", type=float, default=0.1, help="第二轮前掉线的条目比例")
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries)
+    results = {}
+    with FakePortal() as fake, tempfile.TemporaryDirectory() as state_dir:
+        urls = {"base_url": fake.base_url, "site_url": fake.url}
+
+        wall = naive_loop(fake, entries, args.workers)
+        results["naive_loop"] = {"logins": len(fake.login_times), "wall_ms": round(wall * 1000, 1),
+                                 "peak_logins_per_sec": fake.peak_login_rate()}
+
+        fake.reset()
+        stats = run_gateway(urls, entries, state_dir, args.rate, args.burst, args.workers, "a")
+        stats.update(logins=len(fake.login_times), peak_logins_per_sec=fake.peak_login_rate())
+        results["gateway_all_offline"] = stats
+
+        # 部分条目掉线，下一轮只应为这些条目重新登录
+        dropped = entries[:int(len(entries) * args.drop)]
+        fake.drop(entry["wlan_user_ip"] for entry in dropped)
+        fake.login_times.clear()
+        stats = run_gateway(urls, entries, state_dir, args.rate, args.burst, args.workers, "a")
+        stats.update(logins=len(fake.login_times), dropped=len(dropped))
+        results["gateway_partial_drop"] = stats
+
+        # 两个进程各自负责一半条目，共用同一令牌桶
+        fake.reset()
+        half = len(entries) // 2
+        jobs = [(urls, entries[:half], state_dir, args.rate, args.burst, args.workers, "p1"),
+                (urls, entries[half:], state_dir, args.rate, args.burst, args.workers, "p2")]
+        start = time.perf_counter()
+        with multiprocessing.Pool(2) as pool:
+            per_process = pool.map(_process_main, jobs)
+        results["gateway_two_processes"] = {
+            "logins": len(fake.login_times),
+            "wall_ms": round((time.perf_counter() - start) * 1000, 1),
+            "peak_logins_per_sec": fake.peak_login_rate(),
+            "max_queue_depth": [stats["max_queue_depth"] for stats in per_process]
+        }
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+登录历史查询基准测试
+
+生成指定条数的模拟检查记录（含随机的掉线时段），测量单次写入以及不同时间范围的统计与掉线时段查询耗时。
+
+用法: python benchmarks/history_queries.py [--rows 条数] [--days 天数] [--db 数据库路径]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CORE_DIR)
+
+from history import HistoryStore, STATUS_SUCCESS, STATUS_FAILURE  # noqa: E402
+
+
+def populate(store, rows, days, end, seed=1, chunk=20000):
+    """
+    写入模拟记录，检查时间均匀分布在end之前的days天内，约1%的时间处于掉线状态
+
+    Returns:
+        float: 写入耗时（秒）
+    """
+    rng = random.Random(seed)
+    step = days * 86400 / rows
+    ts = end - days * 86400
+    outage_until = 0.0
+    start = time.perf_counter()
+    for offset in range(0, rows, chunk):
+        entries = []
+        for _ in range(min(chunk, rows - offset)):
+            ts += step
+            if ts >= outage_until and rng.random() < 0.0005:
+                outage_until = ts + rng.uniform(60, 1800)
+            if ts < outage_until:
+                entries.append((ts, "S00000000", "10.0.0.1", STATUS_FAILURE, True, "门户繁忙",
+                                {"total": rng.uniform(2000, 3000), "probe": rng.uniform(1000, 2000)}))
+            elif rng.random() < 0.1:
+                probe = rng.lognormvariate(2, 0.3)
+                login = rng.lognormvariate(3, 0.5)
+                entries.append((ts, "S00000000", "10.0.0.1", STATUS_SUCCESS, True, "登录成功",
+                                {"total": probe + login + 1, "probe": probe, "login": login, "parse": 0.2}))
+            else:
+                auth_check = rng.lognormvariate(1.5, 0.3)
+                entries.append((ts, "S00000000", "10.0.0.1", STATUS_SUCCESS, False, "已处于登录状态",
+                                {"total": auth_check + 0.5, "auth_check": auth_check}))
+        store.record_many(entries)
+    return time.perf_counter() - start
+
+
+def timed(fn, rounds):
+    """执行fn若干次并返回耗时中位数（毫秒）与最后一次的结果"""
+    samples = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="登录历史查询基准测试")
+    parser.add_argument("--rows", type=int, default=2000000, help="模拟记录条数")
+    parser.add_argument("--days", type=float, default=365, help="记录覆盖的天数")
+    parser.add_argument("--db", default=None, help="数据库路径，默认使用临时文件")
+    parser.add_argument("-n", "--rounds", type=int, default=5, help="每项查询的测量轮数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = args.db or os.path.join(tmp_dir, "history.db")
+        store = HistoryStore(db_file, retention_days=0)
+        end = time.time()
+        populate_seconds = populate(store, args.rows, args.days, end)
+
+        results = {
+            "rows": args.rows,
+            "populate_seconds": round(populate_seconds, 1),
+            "db_mb": round(os.path.getsize(db_file) / 1024 / 1024, 1)
+        }
+        results["record_ms"], _ = timed(
+            lambda: store.record(time.time(), "S00000000", "10.0.0.1", STATUS_SUCCESS, False, "已处于登录状态",
+                                 {"total": 5.0, "auth_check": 4.5}), args.rounds)
+        for name, seconds in (("24h", 86400), ("7d", 7 * 86400), ("365d", 365 * 86400)):
+            since = end - seconds
+            summary_ms, summary = timed(lambda: store.summary(since, end), args.rounds)
+            outages_ms, outages = timed(lambda: store.outages(since, end), args.rounds)
+            results[name] = {
+                "summary_ms": summary_ms,
+                "outages_ms": outages_ms,
+                "attempts": summary["attempts"],
+                "outages": len(outages)
+            }
+        store.close()
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+常驻模式内存基准测试
+
+在本地模拟门户上以常驻模式连续执行上万次检查（交替为跳过登录与实际登录并发送通知），
+用tracemalloc记录Python对象占用的内存、从/proc读取进程RSS，比较默认模式与低内存模式的
+内存占用，并检查预热后内存是否随检查次数增长。每种模式在独立的子进程中运行，互不影响。
+
+每次采样前等待通知发送完毕并执行一次完整的垃圾回收，只统计仍被引用的内存，
+不把尚未回收的循环引用（如requests的响应对象）与正在发送的通知计入增长。
+
+用法: python benchmarks/resident_memory.py [--quick] [-n 检查次数] [--warmup 次数] [--trace-depth 层数]
+                                          [--max-growth KiB]
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, CORE_DIR)
+
+
+def rss_kib():
+    """
+    Returns:
+        int: 当前进程的常驻内存（KiB），不支持/proc时返回历史峰值
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def slope(samples):
+    """最小二乘拟合每1000次检查的内存变化（KiB）"""
+    if len(samples) < 2:
+        return 0.0
+    xs = [cycle for cycle, _ in samples]
+    ys = [value for _, value in samples]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator * 1000 if denominator else 0.0
+
+
+def where(traceback):
+    """返回分配位置所在的loginCore代码行，不在其中时返回最内层的代码行"""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(CORE_DIR):
+            return f"{os.path.relpath(frame.filename, CORE_DIR)}:{frame.lineno}"
+    return str(traceback[-1]) if len(traceback) else "?"
+
+
+def settle(auto_login):
+    """等待后台线程中的通知发送完毕并回收循环引用，使采样只反映仍被引用的内存"""
+    if auto_login.notifier is not None:
+        auto_login.notifier.submit(lambda: None).result()
+    gc.collect()
+
+
+def run_child(args):
+    """在子进程中执行检查并输出测量结果"""
+    # 保留多层调用栈时可以把标准库中的分配归到调用它的loginCore代码，但每次分配的开销随层数增加
+    tracemalloc.start(args.trace_depth)
+    from main import AutoLogin
+    from daemon import LoginDaemon
+
+    auto_login = AutoLogin(config_file=args.config, lean=args.mode == "lean")
+    daemon = LoginDaemon(auto_login, interval=3600)
+    student_id = auto_login.config["student_id"]
+    samples = []
+    snapshot = None
+    start_rss = rss_kib()
+    start = time.perf_counter()
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        for cycle in range(1, args.cycles + 1):
+            if cycle % 2:
+                # 奇数次检查前清除认证缓存，使其实际发送登录请求与通知，偶数次检查则查询状态后跳过登录
+                auto_login.auth_cache.invalidate(student_id, auto_login.portal.wlan_user_ip if auto_login.portal
+                                                 else None)
+            daemon.check()
+            sample = cycle >= args.warmup and (cycle - args.warmup) % max(1, (args.cycles - args.warmup) // 20) == 0
+            if sample or cycle == args.cycles:
+                settle(auto_login)
+                samples.append((cycle, tracemalloc.get_traced_memory()[0] / 1024, rss_kib()))
+            if cycle == args.warmup:
+                snapshot = tracemalloc.take_snapshot()
+    elapsed = time.perf_counter() - start
+
+    # 不计入基准测试自身保存的采样与快照
+    own = [tracemalloc.Filter(False, os.path.abspath(__file__), all_frames=True)]
+    end = tracemalloc.take_snapshot().filter_traces(own)
+    snapshot = snapshot.filter_traces(own)
+    growth = [
+        {"where": where(stat.traceback), "size_kib": round(stat.size_diff / 1024, 1), "count": stat.count_diff}
+        for stat in end.compare_to(snapshot, "traceback")[:5] if stat.size_diff > 0
+    ]
+    traced = [(cycle, traced) for cycle, traced, _ in samples]
+    rss = [(cycle, value) for cycle, _, value in samples]
+    result = {
+        "cycles": args.cycles,
+        "trace_depth": args.trace_depth,
+        "logins": auto_login.auth_cache.stats["checks"] - auto_login.auth_cache.stats["skips"],
+        "ms_per_check": round(elapsed / args.cycles * 1000, 3),
+        "requests_loaded": "requests" in sys.modules,
+        "rss_after_import_kib": start_rss,
+        "rss_end_kib": samples[-1][2],
+        "traced_warmup_kib": round(samples[0][1], 1),
+        "traced_end_kib": round(samples[-1][1], 1),
+        "traced_peak_kib": round(tracemalloc.get_traced_memory()[1] / 1024, 1),
+        "traced_slope_kib_per_1k": round(slope(traced), 2),
+        "rss_slope_kib_per_1k": round(slope(rss), 2),
+        "top_growth": growth
+    }
+    print(json.dumps(result, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="常驻模式内存基准测试")
+    parser.add_argument("--quick", action="store_true",
+                        help="适合持续集成的快速模式：默认检查2000次、预热500次，只记录一层调用栈")
+    parser.add_argument("-n", "--cycles", type=int, default=None, help="每种模式的检查次数，默认10000")
+    parser.add_argument("--warmup", type=int, default=None, help="预热的检查次数，之后开始统计内存增长，默认1000")
+    parser.add_argument("--trace-depth", type=int, default=None,
+                        help="tracemalloc记录的调用栈层数，默认6，层数越多增长位置越准确但运行越慢")
+    parser.add_argument("--max-growth", type=float, default=64.0,
+                        help="预热后每1000次检查允许的Python内存增长（KiB），超出时以非零状态码退出")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--config", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    defaults = (2000, 500, 1) if args.quick else (10000, 1000, 6)
+    args.cycles = args.cycles or defaults[0]
+    args.warmup = min(args.warmup or defaults[1], args.cycles - 1)
+    args.trace_depth = args.trace_depth or defaults[2]
+
+    if args.child:
+        args.mode = args.child
+        run_child(args)
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    from fake_portal import FakePortal
+
+    results = {}
+    with FakePortal() as fake, tempfile.TemporaryDirectory() as tmp:
+        for mode in ("default", "lean"):
+            # 每种模式使用独立的状态目录，历史记录与缓存文件从空白开始
+            state_dir = os.path.join(tmp, mode)
+            os.makedirs(state_dir)
+            config_file = os.path.join(state_dir, "config.json")
+            with open(config_file, "w", encoding="utf-8") as f:
+                json.dump({"student_id": "bench", "password": "bench", "portal_base_url": fake.base_url,
+                           "portal_site_url": fake.url, "webhook_urls": [fake.webhook_url],
+                           "notify_coalesce_window": 0, "retry_max_attempts": 1}, f)
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, "--config",
+                                     config_file, "-n", str(args.cycles), "--warmup", str(args.warmup),
+                                     "--trace-depth", str(args.trace_depth)],
+                                    capture_output=True, text=True, encoding="utf-8")
+            if output.returncode != 0:
+                print(output.stderr, file=sys.stderr)
+                sys.exit(output.returncode)
+            results[mode] = json.loads(output.stdout.strip().splitlines()[-1])
+            fake.reset()
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    exceeded = [mode for mode, result in results.items() if result["traced_slope_kib_per_1k"] > args.max_growth]
+    if exceeded:
+        print(f"预热后内存持续增长: {', '.join(exceeded)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
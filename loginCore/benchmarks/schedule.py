@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+检查调度模拟基准测试
+
+按给定的会话时长分布模拟若干天的认证会话，比较固定间隔检查与自适应调度（scheduler.AdaptiveScheduler）
+每天向门户发送的请求数与平均掉线时长。
+
+用法: python benchmarks/schedule.py [--days 天数] [--lifetime 秒] [--lifetime-stddev 秒] [-i 固定间隔]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CORE_DIR)
+
+from scheduler import AdaptiveScheduler  # noqa: E402
+
+
+def simulate(next_check, check, days, lifetime, stddev, seed):
+    """
+    模拟认证会话与检查
+
+    Args:
+        next_check: 返回距下一次检查等待时间的函数，参数为当前时间
+        check: 执行一次检查的函数，参数为(当前时间, 是否在线)，返回本次检查的请求数
+        days: 模拟天数
+        lifetime: 会话时长均值（秒）
+        stddev: 会话时长标准差（秒）
+        seed: 随机数种子，两种策略使用相同的会话时长序列
+
+    Returns:
+        dict: 每天请求数与平均掉线时长
+    """
+    rng = random.Random(seed)
+    end = days * 86400
+    now = 0.0
+    expires_at = max(60.0, rng.gauss(lifetime, stddev))
+    lost_at = None
+    requests = 0
+    offline = []
+    while now < end:
+        online = now < expires_at
+        if not online and lost_at is None:
+            lost_at = expires_at
+        requests += check(now, online)
+        if not online:
+            # 检查时重新登录，开始新的会话
+            offline.append(now - lost_at)
+            lost_at = None
+            expires_at = now + max(60.0, rng.gauss(lifetime, stddev))
+        now += next_check(now)
+    return {
+        "requests_per_day": round(requests / days, 1),
+        "avg_offline_seconds": round(sum(offline) / len(offline), 1) if offline else 0.0,
+        "sessions": len(offline)
+    }
+
+
+def fixed_policy(interval, cache_ttl):
+    """
+    固定间隔检查：认证状态缓存有效时查询认证状态（1个请求），否则探测并登录（2个请求）
+
+    Returns:
+        tuple: (next_check, check)
+    """
+    state = {"login_at": 0.0}
+
+    def check(now, online):
+        fresh = now - state["login_at"] < cache_ttl
+        if fresh and online:
+            return 1
+        state["login_at"] = now
+        # 缓存有效但已掉线时先查询了认证状态
+        return 3 if fresh else 2
+
+    return (lambda now: interval), check
+
+
+def adaptive_policy(interval, min_interval, max_interval):
+    """
+    自适应调度：每次检查先查询认证状态，在线时1个请求，掉线时再探测并登录
+
+    Returns:
+        tuple: (next_check, check)
+    """
+    scheduler = AdaptiveScheduler(None, interval, min_interval, max_interval)
+    scheduler.last_login_at = scheduler.last_online_at = 0.0
+
+    def check(now, online):
+        requests = 1 if online else 3
+        scheduler.observe(online, True, requests, now=now)
+        return requests
+
+    return (lambda now: scheduler.next_interval(now)), check
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检查调度模拟基准测试")
+    parser.add_argument("--days", type=float, default=30, help="模拟天数")
+    parser.add_argument("--lifetime", type=float, default=7200, help="会话时长均值（秒）")
+    parser.add_argument("--lifetime-stddev", type=float, default=300, help="会话时长标准差（秒）")
+    parser.add_argument("-i", "--interval", type=float, default=180, help="固定检查间隔（秒）")
+    parser.add_argument("--cache-ttl", type=float, default=600, help="认证状态缓存有效期（秒）")
+    parser.add_argument("--min-interval", type=float, default=30, help="自适应调度的最短间隔（秒）")
+    parser.add_argument("--max-interval", type=float, default=900, help="自适应调度的最长间隔（秒）")
+    parser.add_argument("--seed", type=int, default=1, help="随机数种子")
+    args = parser.parse_args()
+
+    results = {
+        "fixed": simulate(*fixed_policy(args.interval, args.cache_ttl),
+                          args.days, args.lifetime, args.lifetime_stddev, args.seed),
+        "adaptive": simulate(*adaptive_policy(args.interval, args.min_interval, args.max_interval),
+                             args.days, args.lifetime, args.lifetime_stddev, args.seed)
+    }
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
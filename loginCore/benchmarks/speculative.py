@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+推测登录基准测试
+
+在带延迟的本地模拟门户上比较顺序登录（先探测校园网再发送登录请求）与推测登录（两者同时发出）
+完成认证的耗时，并测量未连接校园网时两种方式返回的耗时。推测登录只在探测确认处于校园网后生效，
+因此每种场景的第一次登录仍为顺序登录，未连接校园网时始终不会发出登录请求。
+
+用法: python benchmarks/speculative.py [-n 轮数] [--latency 秒] [--jitter 秒]
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CORE_DIR)
+
+from fake_portal import FakePortal  # noqa: E402
+from e2e import summarize, timed  # noqa: E402
+from portal import ePortal  # noqa: E402
+
+
+def closed_port():
+    """返回本机一个未被监听的端口，模拟不在校园网时门户无法访问"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def bench(base_url, site_url, rounds, transport, speculative):
+    """复用同一ePortal实例重复登录，返回耗时统计与最后一次的结果"""
+    portal = ePortal("bench", "bench", "10.0.0.1", transport=transport, base_url=base_url, site_url=site_url,
+                     speculative=speculative)
+    result = summarize(timed(portal.login, rounds))
+    result["message"] = portal.login()[1]
+    result["can_speculate"] = portal.can_speculate()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推测登录基准测试")
+    parser.add_argument("-n", "--rounds", type=int, default=50, help="每种场景的登录次数")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟门户每个请求的延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.005, help="模拟门户的随机延迟上限（秒）")
+    args = parser.parse_args()
+
+    results = {}
+    with FakePortal(latency=args.latency, jitter=args.jitter) as fake:
+        for transport in ("stdlib", "requests"):
+            for speculative in (False, True):
+                name = f"{transport}_{'speculative' if speculative else 'sequential'}"
+                results[name] = bench(fake.base_url, fake.url, args.rounds, transport, speculative)
+
+    port = closed_port()
+    for speculative in (False, True):
+        name = f"off_campus_{'speculative' if speculative else 'sequential'}"
+        results[name] = bench(f"http://127.0.0.1:{port}/eportal/", f"http://127.0.0.1:{port}/",
+                              min(args.rounds, 10), "stdlib", speculative)
+
+    for transport in ("stdlib", "requests"):
+        sequential = results[f"{transport}_sequential"]["p50_ms"]
+        speculative = results[f"{transport}_speculative"]["p50_ms"]
+        results[f"{transport}_p50_improvement"] = f"{(sequential - speculative) / sequential:.1%}"
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
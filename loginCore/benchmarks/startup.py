@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+单次登录启动耗时基准测试
+
+分别测量导入main模块的耗时（-X importtime）以及针对本地模拟门户执行一次完整单次登录
+（探测、登录并发送通知）的进程总耗时，任一中位数超过预算时以非零状态码退出，
+可用于持续集成中防止启动性能回退。
+
+用法: python benchmarks/startup.py [-n 轮数] [--import-budget 毫秒] [--run-budget 毫秒]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CORE_DIR)
+
+from fake_portal import FakePortal  # noqa: E402
+
+
+def measure_import(python):
+    """
+    测量导入main模块的累计耗时
+
+    Returns:
+        float: 耗时（毫秒）
+        bool: 导入过程中是否加载了requests
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", "import main, sys; print('requests' in sys.modules)"],
+        cwd=CORE_DIR, capture_output=True, text=True, check=True
+    )
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # 格式: import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "main":
+            cumulative_us = int(parts[1].strip())
+    return cumulative_us / 1000, result.stdout.strip() == "True"
+
+
+def measure_run(python, fake, state_dir):
+    """
+    测量一次完整单次登录进程的耗时
+
+    每轮使用新的状态目录并清空模拟门户的在线状态，使进程实际探测校园网、发送登录请求并发送通知，
+    而不是命中认证缓存后跳过登录
+
+    Args:
+        python: Python解释器路径
+        fake: FakePortal实例
+        state_dir: 本轮使用的空目录，配置文件与状态文件均写在其中
+
+    Returns:
+        float: 耗时（毫秒）
+    """
+    config_file = os.path.join(state_dir, "config.json")
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump({"student_id": "bench", "password": "bench", "portal_base_url": fake.base_url,
+                   "portal_site_url": fake.url, "webhook_urls": [fake.webhook_url]}, f)
+    fake.reset()
+
+    start = time.perf_counter()
+    subprocess.run([python, "main.py", "-c", config_file], cwd=CORE_DIR, capture_output=True, check=True)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if not fake.login_times or not fake.webhook_messages:
+        print(f"单次登录进程未完成登录与通知: {fake.requests}")
+        sys.exit(1)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单次登录启动耗时基准测试")
+    parser.add_argument("-n", "--rounds", type=int, default=10, help="测量轮数")
+    parser.add_argument("--import-budget", type=float, default=50.0, help="导入main模块的耗时预算（毫秒）")
+    parser.add_argument("--run-budget", type=float, default=250.0, help="单次登录进程的耗时预算（毫秒）")
+    args = parser.parse_args()
+
+    with FakePortal() as fake, tempfile.TemporaryDirectory() as tmp_dir:
+        import_times = []
+        run_times = []
+        loads_requests = False
+        for round_index in range(args.rounds):
+            import_ms, loaded = measure_import(sys.executable)
+            import_times.append(import_ms)
+            loads_requests = loads_requests or loaded
+            state_dir = os.path.join(tmp_dir, str(round_index))
+            os.makedirs(state_dir)
+            run_times.append(measure_run(sys.executable, fake, state_dir))
+
+    import_median = statistics.median(import_times)
+    run_median = statistics.median(run_times)
+    print(f"导入main模块: 中位数{import_median:.1f}ms，最大{max(import_times):.1f}ms（预算{args.import_budget:.0f}ms）")
+    print(f"单次登录进程: 中位数{run_median:.1f}ms，最大{max(run_times):.1f}ms（预算{args.run_budget:.0f}ms）")
+    print(f"启动时导入requests: {'是' if loads_requests else '否'}")
+
+    failed = False
+    if loads_requests:
+        print("失败: 单次登录路径不应在启动时导入requests")
+        failed = True
+    if import_median > args.import_budget:
+        print("失败: 导入耗时超出预算")
+        failed = True
+    if run_median > args.run_budget:
+        print("失败: 启动耗时超出预算")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
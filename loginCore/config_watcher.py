@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import ctypes
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+
+# inotify事件掩码，见<sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+
+def file_signature(path):
+    """
+    Returns:
+        tuple: 文件的(inode, 大小, 修改时间)，文件不存在时返回None
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class ConfigWatcher:
+    """配置文件监听模块，配置文件变化时在后台线程中调用回调函数（Linux上使用inotify，其他系统轮询修改时间）"""
+
+    def __init__(self, path, callback, poll_interval=2.0, debounce=0.2):
+        """
+        初始化配置文件监听实例
+
+        Args:
+            path: 配置文件路径
+            callback: 配置文件变化时调用的无参函数
+            poll_interval: 不支持inotify时检查修改时间的间隔（秒）
+            debounce: 事件防抖时间（秒），等待写入完成后再调用回调函数
+        """
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.signature = file_signature(self.path)
+        self._fd = None
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._stop_event = threading.Event()
+        self._thread = None
+        if sys.platform.startswith("linux"):
+            try:
+                self._fd = self._inotify_watch(os.path.dirname(self.path))
+            except OSError as e:
+                print(f"监听配置文件失败，将改为定期检查: {e}")
+
+    @staticmethod
+    def _inotify_watch(directory):
+        """
+        监听配置文件所在目录，UI等程序以替换文件的方式保存配置时也能收到事件
+
+        Returns:
+            int: inotify文件描述符
+        """
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, os.strerror(errno))
+        return fd
+
+    @classmethod
+    def start(cls, path, callback, **kwargs):
+        """
+        创建监听实例并启动后台线程
+
+        Returns:
+            ConfigWatcher: 监听实例
+        """
+        watcher = cls(path, callback, **kwargs)
+        watcher._thread = threading.Thread(target=watcher.run, name="config-watcher", daemon=True)
+        watcher._thread.start()
+        return watcher
+
+    def _read_events(self):
+        """
+        读取所有已到达的inotify事件
+
+        Returns:
+            bool: 是否有事件涉及配置文件
+        """
+        name = os.fsencode(os.path.basename(self.path))
+        relevant = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except (BlockingIOError, InterruptedError):
+                return relevant
+            if not data:
+                return relevant
+            offset = 0
+            while offset + INOTIFY_EVENT_HEADER.size <= len(data):
+                _, _, _, length = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+                offset += INOTIFY_EVENT_HEADER.size
+                if data[offset:offset + length].rstrip(b"\0") == name:
+                    relevant = True
+                offset += length
+
+    def wait_for_change(self):
+        """
+        等待配置文件发生变化
+
+        Returns:
+            bool: 是否检测到变化，调用stop()后返回False
+        """
+        while not self._stop_event.is_set():
+            sources = [self._wakeup_r] if self._fd is None else [self._wakeup_r, self._fd]
+            timeout = self.poll_interval if self._fd is None else None
+            readable, _, _ = select.select(sources, [], [], timeout)
+            if self._wakeup_r in readable:
+                return False
+            if self._fd is not None and not self._read_events():
+                continue
+
+            # 等待写入完成，合并保存过程中产生的多个事件
+            if self._stop_event.wait(self.debounce):
+                return False
+            if self._fd is not None:
+                self._read_events()
+            signature = file_signature(self.path)
+            if signature is not None and signature != self.signature:
+                self.signature = signature
+                return True
+        return False
+
+    def run(self):
+        """监听循环，每次配置文件变化时调用一次回调函数"""
+        while self.wait_for_change():
+            try:
+                self.callback()
+            except Exception as e:
+                print(f"重新加载配置时发生异常: {e}")
+
+    def stop(self):
+        """停止监听并释放资源"""
+        self._stop_event.set()
+        try:
+            self._wakeup_w.send(b"\0")
+        except OSError:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._wakeup_r.close()
+        self._wakeup_w.close()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+
+class ControlServer:
+    """本地控制接口，供图形界面与脚本查询常驻进程的状态并触发登录，响应只读取内存中的状态，不访问门户"""
+
+    def __init__(self, daemon, port=None, socket_path=None, host="127.0.0.1"):
+        """
+        初始化控制接口
+
+        Args:
+            daemon: LoginDaemon实例
+            port: 在本机该端口提供HTTP接口，为None时不启动
+            socket_path: 在该路径的Unix套接字上提供HTTP接口，为None时不启动（仅支持Unix套接字的系统）
+            host: HTTP接口的监听地址
+        """
+        self.daemon = daemon
+        self.socket_path = socket_path
+        self.servers = []
+        handler = self._make_handler()
+        if port:
+            self.servers.append(ThreadingHTTPServer((host, port), handler))
+        if socket_path:
+            if UnixHTTPServer is None:
+                print("当前系统不支持Unix套接字，请改用control_port")
+                self.socket_path = None
+            else:
+                if os.path.exists(socket_path):
+                    os.unlink(socket_path)
+                # Unix套接字不支持TCP_NODELAY选项
+                unix_handler = type("UnixHandler", (handler,), {"disable_nagle_algorithm": False})
+                self.servers.append(UnixHTTPServer(socket_path, unix_handler))
+                # 套接字只允许当前用户访问
+                os.chmod(socket_path, 0o600)
+
+    def status(self):
+        """
+        Returns:
+            dict: 常驻进程的当前状态
+        """
+        daemon = self.daemon
+        auto_login = daemon.auto_login
+        portal = auto_login.portal
+        return {
+            "online": daemon.last_success,
+            "account": auto_login.config.get("student_id"),
+            "ip": portal.wlan_user_ip if portal is not None else None,
+            "check_count": daemon.check_count,
+            "last_check_time": daemon.last_check_time,
+            "last_check_duration_ms": None if daemon.last_check_duration is None
+            else round(daemon.last_check_duration * 1000, 3),
+            "last_login_time": daemon.last_login_time,
+            "next_check_in": None if daemon.next_check_at is None
+            else round(max(0.0, daemon.next_check_at - time.time()), 3),
+            "pid": os.getpid()
+        }
+
+    def last_results(self):
+        """
+        Returns:
+            dict: 最近一次检查中各地址的登录结果与各阶段耗时（毫秒）
+        """
+        auto_login = self.daemon.auto_login
+        tracer = auto_login.last_trace
+        return {
+            "results": auto_login.last_results,
+            "phases_ms": tracer.durations() if tracer is not None else {}
+        }
+
+    def login_now(self, wait, timeout=30):
+        """
+        请求常驻进程立即执行一次检查
+
+        Args:
+            wait: 是否等待检查完成
+            timeout: 等待的最长时间（秒）
+
+        Returns:
+            int: HTTP状态码
+            dict: 响应内容
+        """
+        check_count = self.daemon.request_check()
+        if not wait:
+            return 202, {"queued": True}
+        if not self.daemon.wait_for_check(check_count, timeout):
+            return 504, {"error": "等待登录检查超时"}
+        response = {"success": self.daemon.last_success}
+        response.update(self.last_results())
+        return 200, response
+
+    def _make_handler(self):
+        control = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头与响应体分两次写出，关闭Nagle算法避免响应被延迟确认拖慢
+            disable_nagle_algorithm = True
+
+            def _reply(self, status, body, content_type="application/json; charset=utf-8"):
+                if not isinstance(body, str):
+                    body = json.dumps(body, ensure_ascii=False)
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if path == "/status":
+                    self._reply(200, control.status())
+                elif path == "/last-results":
+                    self._reply(200, control.last_results())
+                elif path == "/metrics":
+                    import metrics
+                    self._reply(200, metrics.REGISTRY.render(), "text/plain; version=0.0.4; charset=utf-8")
+                else:
+                    self._reply(404, {"error": "未知接口"})
+
+            def do_POST(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                if parts.path != "/login-now":
+                    self._reply(404, {"error": "未知接口"})
+                    return
+                wait = parse_qs(parts.query).get("wait", ["0"])[0] not in ("0", "false", "")
+                self._reply(*control.login_now(wait))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """在后台线程中启动所有接口"""
+        for server in self.servers:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="control", daemon=True).start()
+        return self
+
+    def close(self):
+        """停止所有接口并删除Unix套接字文件"""
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+        """基于Unix套接字的HTTP服务器"""
+
+        def get_request(self):
+            request, _ = super().get_request()
+            # BaseHTTPRequestHandler需要client_address，Unix套接字没有客户端地址
+            return request, ("unix", 0)
+else:
+    UnixHTTPServer = None
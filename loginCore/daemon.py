@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import threading
+from collections import deque
+
+
+class LoginDaemon:
+    """常驻进程模式，配置、会话与状态保存在内存中，由内部调度器定期检查登录"""
+
+    def __init__(self, auto_login, interval=180, watch=False, metrics_port=None, adaptive=False,
+                 control_port=None, control_socket=None):
+        """
+        初始化常驻进程实例
+
+        Args:
+            auto_login: AutoLogin实例
+            interval: 两次检查之间的间隔（秒），监听网络变化时作为兜底检查间隔
+            watch: 是否监听网络变化事件，校园网地址出现时立即登录
+            metrics_port: 在本机该端口提供/metrics指标接口，为None时不启动
+            adaptive: 是否根据观测到的会话时长自适应调整检查间隔，也可在配置文件中设置adaptive_schedule
+            control_port: 在本机该端口提供控制接口，为None时使用配置文件中的control_port
+            control_socket: 在该路径的Unix套接字上提供控制接口，为None时使用配置文件中的control_socket
+        """
+        self.auto_login = auto_login
+        self.auto_login.resident = True
+        self.interval = max(1, int(interval))
+        self.check_count = 0
+        self.last_check_time = None
+        self.last_check_duration = None
+        self.last_success = None
+        self.last_login_time = None
+        self.next_check_at = None
+        # 每次网络事件从发生到完成认证的耗时（秒），未能完成认证的事件单独记录从发生到检查结束的耗时
+        self.event_latencies = deque(maxlen=1000)
+        self.event_failures = deque(maxlen=1000)
+        self._stop_event = threading.Event()
+        # 控制接口请求立即检查时唤醒调度循环
+        self._wake_event = threading.Event()
+        self._check_cond = threading.Condition()
+        self._checking = False
+        self.scheduler = None
+        if adaptive or auto_login.config.get("adaptive_schedule"):
+            from scheduler import AdaptiveScheduler
+            self.scheduler = AdaptiveScheduler(os.path.join(auto_login.state_dir, "schedule.json"), self.interval,
+                                               auto_login.config.get("min_check_interval", 30),
+                                               auto_login.config.get("max_check_interval", 900))
+            # 每次检查都先查询认证状态，以便观测认证失效的时间
+            auto_login.observe_auth = True
+        self.watcher = None
+        if watch:
+            from watcher import NetworkWatcher
+            self.watcher = NetworkWatcher.create(auto_login.config.get("campus_subnets"))
+            if self.watcher is None:
+                print("当前系统不支持监听网络变化，将仅按固定间隔检查")
+        # 配置文件变化时重新加载，修改账号或webhook无需重启常驻进程
+        from config_watcher import ConfigWatcher
+        self.config_watcher = ConfigWatcher.start(auto_login.config_file, auto_login.reload_config)
+        self.metrics_server = None
+        if metrics_port:
+            import metrics
+            self.metrics_server = metrics.serve(metrics_port)
+            print(f"指标接口已启动: http://127.0.0.1:{metrics_port}/metrics")
+        self.control_server = None
+        control_port = control_port or auto_login.config.get("control_port")
+        control_socket = control_socket or auto_login.config.get("control_socket")
+        if control_port or control_socket:
+            from control import ControlServer
+            self.control_server = ControlServer(self, control_port, control_socket).start()
+            if control_port:
+                print(f"控制接口已启动: http://127.0.0.1:{control_port}/status")
+            if self.control_server.socket_path:
+                print(f"控制接口已启动: {self.control_server.socket_path}")
+
+    def check(self):
+        """
+        执行一次登录检查
+
+        Returns:
+            bool: 本次检查后是否处于登录状态
+        """
+        with self._check_cond:
+            self._checking = True
+        start = time.perf_counter()
+        try:
+            success = self.auto_login.login()
+        except Exception as e:
+            print(f"登录检查过程中发生异常: {e}")
+            success = False
+
+        self.last_check_time = time.time()
+        self.last_check_duration = time.perf_counter() - start
+        self.last_success = success
+        if any(result["success"] and not result["skipped"] for result in self.auto_login.last_results):
+            self.last_login_time = self.last_check_time
+        with self._check_cond:
+            self.check_count += 1
+            self._checking = False
+            self._check_cond.notify_all()
+        if self.scheduler is not None:
+            self.observe(success)
+
+        # 配置了textfile collector输出路径时，每次检查后更新指标文件
+        metrics_textfile = self.auto_login.config.get("metrics_textfile")
+        if metrics_textfile:
+            import metrics
+            metrics.REGISTRY.write_textfile(metrics_textfile)
+        return success
+
+    def observe(self, success):
+        """
+        将本次检查的结果提供给自适应调度，并更新请求数与掉线时长指标
+
+        Args:
+            success: 本次检查后是否处于登录状态
+        """
+        import metrics
+
+        auto_login = self.auto_login
+        tracer = auto_login.last_trace
+        requests = 0
+        if tracer is not None:
+            requests = sum(1 for record in tracer.spans if record["span"] in ("auth_check", "probe", "login"))
+        # 未连接校园网导致的掉线不是会话过期，不计入会话时长样本
+        outcome = auto_login.portal.last_outcome if auto_login.portal is not None else None
+        learn = not (outcome and outcome.get("error") == "not_on_campus")
+        self.scheduler.observe(auto_login.last_auth_state, success, requests, learn)
+
+        report = self.scheduler.report()
+        metrics.PORTAL_REQUESTS_PER_DAY.set(report["requests_per_day"])
+        metrics.AVG_OFFLINE_SECONDS.set(report["avg_offline_seconds"])
+
+    def run(self):
+        """启动调度循环，直到调用stop()或收到中断信号"""
+        print(f"常驻模式已启动，检查间隔: {self.interval}秒")
+        event_time = None
+        try:
+            while not self._stop_event.is_set():
+                self.check()
+                print(f"本次检查耗时: {self.last_check_duration * 1000:.1f}ms")
+                if self.scheduler is not None:
+                    report = self.scheduler.report()
+                    print(f"每天门户请求数: {report['requests_per_day']}，平均掉线时长: {report['avg_offline_seconds']}秒，"
+                          f"下次检查间隔: {self.scheduler.next_interval():.0f}秒")
+                if event_time is not None:
+                    latency = time.time() - event_time
+                    if self.last_success:
+                        self.event_latencies.append(latency)
+                        print(f"网络变化到完成认证耗时: {latency * 1000:.1f}ms")
+                    else:
+                        self.event_failures.append(latency)
+                        print(f"网络变化后未能完成认证，检查耗时: {latency * 1000:.1f}ms")
+                portal = self.auto_login.portal
+                if portal is not None:
+                    stats = portal.connection_stats()
+                    print(f"连接池: 新建{stats['connections']}个连接，复用{stats['reused']}次")
+                event_time = self.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.watcher is not None:
+                self.watcher.close()
+            self.config_watcher.stop()
+            if self.metrics_server is not None:
+                self.metrics_server.shutdown()
+            if self.control_server is not None:
+                self.control_server.close()
+            print(f"常驻模式已退出，共执行检查{self.check_count}次")
+
+    def wait(self):
+        """
+        等待下一次检查：监听网络变化时在校园网地址出现后立即返回，否则等待固定间隔
+
+        Returns:
+            float: 触发本次检查的网络事件时间戳，按间隔触发时返回None
+        """
+        interval = self.scheduler.next_interval() if self.scheduler is not None else self.interval
+        self.next_check_at = time.time() + interval
+        try:
+            if self._wake_event.is_set():
+                return None
+            if self.watcher is None:
+                self._wake_event.wait(interval)
+                return None
+            return self.watcher.wait(interval)
+        finally:
+            self._wake_event.clear()
+            self.next_check_at = None
+
+    def request_check(self):
+        """
+        请求调度循环立即执行一次检查
+
+        Returns:
+            int: 请求的检查完成后check_count将达到的值
+        """
+        with self._check_cond:
+            # 正在进行的检查开始于请求之前，需要等待下一次检查
+            target = self.check_count + (2 if self._checking else 1)
+        self._wake_event.set()
+        if self.watcher is not None:
+            self.watcher.wakeup()
+        return target
+
+    def wait_for_check(self, target, timeout):
+        """
+        等待检查次数达到target
+
+        Returns:
+            bool: 是否在超时前完成
+        """
+        with self._check_cond:
+            return self._check_cond.wait_for(lambda: self.check_count >= target, timeout)
+
+    def stop(self):
+        """通知调度循环退出"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self.watcher is not None:
+            self.watcher.wakeup()
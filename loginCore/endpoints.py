@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from util import atomic_write_json
+
+
+class EndpointSelector:
+    """门户节点选择模块，并发探测候选节点，使用延迟最低的可用节点，节点超时时自动切换"""
+
+    def __init__(self, endpoints, cache_file=None, ttl=300, probe_timeout=2):
+        """
+        初始化节点选择实例
+
+        Args:
+            endpoints: 候选节点列表，每项包含base_url（登录接口地址）与site_url（门户站点地址）
+            cache_file: 选择结果的缓存文件路径，单次登录进程之间共享选择结果
+            ttl: 选择结果的有效期（秒）
+            probe_timeout: 探测单个节点的超时时间（秒）
+        """
+        self.endpoints = [{"base_url": endpoint["base_url"], "site_url": endpoint["site_url"].rstrip("/") + "/"}
+                          for endpoint in endpoints]
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self.current = None
+        self.selected_at = 0
+        self.latencies = {}
+        # 出现超时的节点及其被标记为不可用的时间
+        self.down = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """从缓存文件加载上次的选择结果，缓存的节点不在候选列表中时忽略"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("endpoint") in self.endpoints:
+                self.current = data["endpoint"]
+                self.selected_at = data.get("selected_at", 0)
+                self.latencies = data.get("latencies", {})
+        except Exception as e:
+            print(f"加载门户节点缓存失败: {e}")
+
+    def save(self):
+        """将选择结果写入缓存文件"""
+        if not self.cache_file:
+            return
+        try:
+            atomic_write_json(self.cache_file, {"endpoint": self.current, "selected_at": self.selected_at,
+                                                "latencies": self.latencies}, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存门户节点缓存失败: {e}")
+
+    def is_fresh(self):
+        """当前选择是否仍在有效期内"""
+        return self.current is not None and time.time() - self.selected_at < self.ttl
+
+    def select(self, session):
+        """
+        返回当前应使用的节点，只有一个候选节点时不探测，选择结果过期时重新探测
+
+        Args:
+            session: 用于探测的HTTP会话，探测建立的长连接可被随后的登录请求复用
+
+        Returns:
+            dict: 包含base_url与site_url的节点
+        """
+        if len(self.endpoints) == 1:
+            return self.endpoints[0]
+        with self._lock:
+            if not self.is_fresh():
+                self.probe(session)
+            return self.current or self.endpoints[0]
+
+    def probe(self, session, exclude=()):
+        """
+        并发探测候选节点，选择最先响应的可用节点，即延迟最低的节点，不等待较慢的节点
+
+        Args:
+            session: 用于探测的HTTP会话
+            exclude: 不参与选择的节点站点地址
+
+        Returns:
+            dict: 选中的节点，全部不可用时返回None并保留原选择
+        """
+        now = time.time()
+        candidates = [endpoint for endpoint in self.endpoints
+                      if endpoint["site_url"] not in exclude
+                      and now - self.down.get(endpoint["site_url"], 0) >= self.ttl]
+        if not candidates:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint["site_url"] not in exclude]
+
+        def check(endpoint):
+            start = time.perf_counter()
+            response = session.get(f"{endpoint['site_url']}a79.htm", timeout=self.probe_timeout)
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP状态码: {response.status_code}")
+            return endpoint, time.perf_counter() - start
+
+        chosen = None
+        executor = ThreadPoolExecutor(max_workers=max(1, len(candidates)), thread_name_prefix="endpoint-probe")
+        try:
+            futures = [executor.submit(check, endpoint) for endpoint in candidates]
+            for future in as_completed(futures, timeout=self.probe_timeout + 1):
+                try:
+                    endpoint, latency = future.result()
+                except Exception:
+                    continue
+                chosen = endpoint
+                self.latencies[endpoint["site_url"]] = round(latency * 1000, 3)
+                break
+        except Exception:
+            pass
+        finally:
+            executor.shutdown(wait=False)
+
+        if chosen is not None:
+            self.current = chosen
+            self.selected_at = time.time()
+            self.save()
+        return chosen
+
+    def fail_over(self, session, endpoint):
+        """
+        将出现超时或无法访问的节点标记为不可用，并切换到其他可用节点
+
+        Args:
+            session: 用于探测的HTTP会话
+            endpoint: 出现故障的节点
+
+        Returns:
+            dict: 切换后的节点，没有其他可用节点时返回None
+        """
+        if len(self.endpoints) == 1:
+            return None
+        with self._lock:
+            self.down[endpoint["site_url"]] = time.time()
+            chosen = self.probe(session, exclude=(endpoint["site_url"],))
+            if chosen is None:
+                return None
+            print(f"门户节点{endpoint['site_url']}不可用，已切换到{chosen['site_url']}")
+            return chosen
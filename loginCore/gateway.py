@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from portal import ePortal
+from metrics import GATEWAY_QUEUE_DEPTH, GATEWAY_TIME_TO_ONLINE
+from util import atomic_write_json
+
+
+def can_bind(ip):
+    """
+    检查本机是否拥有该地址，可以用它作为源地址发起连接
+
+    Returns:
+        bool: 是否可以绑定
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind((ip, 0))
+        return True
+    except OSError:
+        return False
+
+
+def load_entries(path):
+    """
+    从CSV文件读取网关条目，表头包含student_id、password、wlan_user_ip与可选的wlan_user_mac
+
+    Args:
+        path: CSV文件路径
+
+    Returns:
+        list: 条目字典的列表
+    """
+    import csv
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return [{key: (value or "").strip() for key, value in row.items()} for row in csv.DictReader(f)]
+
+
+class GatewayLogin:
+    """网关模式模块，为多个(账号, IP, MAC)条目认证，只为掉线的条目重新登录，登录请求经共享令牌桶限速"""
+
+    def __init__(self, entries, bucket, max_workers=4, transport="requests", portal_options=None,
+                 state_file=None, online_ttl=600, probe_timeout=3):
+        """
+        初始化网关实例
+
+        Args:
+            entries: 条目列表，每项为包含student_id、password、wlan_user_ip和可选wlan_user_mac的字典
+            bucket: ratelimit.TokenBucket实例，所有进程的登录请求共用其速率预算
+            max_workers: 并发探测与登录的线程数
+            transport: HTTP实现，"requests"或"stdlib"；各条目的会话共用同一连接池
+            portal_options: 传递给ePortal的其他参数，如base_url、site_url
+            state_file: 状态文件路径，记录各条目最近确认在线与发现掉线的时间
+            online_ttl: 本机不拥有条目地址、无法以其查询认证状态时，登录成功后视为在线的时长（秒）
+            probe_timeout: 认证状态查询的超时时间（秒）
+        """
+        self.entries = entries
+        self.bucket = bucket
+        self.max_workers = max(1, int(max_workers))
+        self.session = ePortal.create_session(pool_size=self.max_workers, transport=transport)
+        self.portal_options = portal_options or {}
+        self.state_file = state_file
+        self.online_ttl = online_ttl
+        self.probe_timeout = probe_timeout
+        self.state = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def make_key(entry):
+        """生成条目的状态键"""
+        return f"{entry.get('student_id')}@{entry.get('wlan_user_ip')}"
+
+    def load(self):
+        """从状态文件加载各条目的状态"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        except Exception as e:
+            print(f"加载网关状态失败: {e}")
+
+    def save(self):
+        """将各条目的状态写入状态文件"""
+        if not self.state_file:
+            return
+        try:
+            atomic_write_json(self.state_file, self.state)
+        except Exception as e:
+            print(f"保存网关状态失败: {e}")
+
+    def probe(self, entry):
+        """
+        检查条目当前是否在线
+
+        本机拥有条目地址时以该地址为源地址查询认证状态接口；否则无法代其查询（接口按请求的来源地址判断），
+        登录成功后的online_ttl秒内一律视为在线，期间掉线不会被发现，过期后重新登录
+
+        Args:
+            entry: 条目字典
+
+        Returns:
+            ePortal: 该条目的ePortal实例
+            bool: 是否在线
+        """
+        portal = ePortal(entry.get("student_id"), entry.get("password"), entry.get("wlan_user_ip"),
+                         session=ePortal.account_session(self.session), wlan_user_mac=entry.get("wlan_user_mac"),
+                         **self.portal_options)
+        ip = portal.wlan_user_ip
+        if can_bind(ip):
+            from transport import StdlibSession
+
+            session = StdlibSession(source_address=ip)
+            session.headers.update(portal.headers)
+            return portal, portal.is_authenticated(timeout=self.probe_timeout, session=session)
+
+        online_at = self.state.get(self.make_key(entry), {}).get("online_at")
+        return portal, online_at is not None and time.time() - online_at < self.online_ttl
+
+    def run(self):
+        """
+        执行一轮检查：并发探测所有条目，掉线的条目进入队列，由工作线程取得令牌后依次登录
+
+        Returns:
+            list: 每个条目的结果，顺序与entries一致
+            dict: 本轮的汇总统计
+        """
+        start = time.perf_counter()
+        results = [None] * len(self.entries)
+        queue = deque()
+        stats = {"entries": len(self.entries), "online": 0, "queued": 0, "succeeded": 0, "max_queue_depth": 0}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            probes = list(executor.map(self._safe_probe, self.entries))
+        now = time.time()
+        for index, (entry, (portal, online, error)) in enumerate(zip(self.entries, probes)):
+            state = self.state.setdefault(self.make_key(entry), {})
+            result = {
+                "student_id": entry.get("student_id"),
+                "wlan_user_ip": entry.get("wlan_user_ip"),
+                "wlan_user_mac": portal.wlan_user_mac if portal is not None else entry.get("wlan_user_mac"),
+                "online": online,
+                "relogin": False,
+                "success": online,
+                "message": error or ("已处于登录状态" if online else None),
+                "queue_ms": None,
+                "time_to_online": None
+            }
+            results[index] = result
+            if online:
+                stats["online"] += 1
+                state.pop("dropped_at", None)
+                continue
+            if portal is None:
+                continue
+            state.setdefault("dropped_at", now)
+            queue.append((index, portal, time.perf_counter()))
+        stats["queued"] = stats["max_queue_depth"] = len(queue)
+        GATEWAY_QUEUE_DEPTH.set(len(queue))
+
+        workers = min(self.max_workers, len(queue))
+        if workers:
+            threads = [threading.Thread(target=self._worker, args=(queue, results), name=f"gateway-{i}")
+                       for i in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        stats["succeeded"] = sum(1 for result in results if result["relogin"] and result["success"])
+        stats["wall_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        self.save()
+        return results, stats
+
+    def _safe_probe(self, entry):
+        try:
+            portal, online = self.probe(entry)
+            return portal, online, None
+        except Exception as e:
+            return None, False, f"检查过程中发生异常: {str(e)}"
+
+    def _worker(self, queue, results):
+        """工作线程：从队列中取出条目，取得令牌后登录"""
+        while True:
+            with self._lock:
+                if not queue:
+                    return
+                index, portal, enqueued_at = queue.popleft()
+                GATEWAY_QUEUE_DEPTH.set(len(queue))
+            self.bucket.acquire()
+            result = results[index]
+            result["queue_ms"] = round((time.perf_counter() - enqueued_at) * 1000, 3)
+            result["relogin"] = True
+            success, message = portal.login()
+            result.update(success=success, message=message)
+
+            now = time.time()
+            with self._lock:
+                state = self.state.setdefault(self.make_key(result), {})
+                if success:
+                    state["online_at"] = now
+                    dropped_at = state.pop("dropped_at", None)
+                    if dropped_at is not None:
+                        # 从发现掉线到重新登录成功的时长，跨越多轮检查时从第一次发现掉线算起
+                        result["time_to_online"] = round(now - dropped_at, 3)
+                        GATEWAY_TIME_TO_ONLINE.observe(now - dropped_at)
+                else:
+                    state.pop("online_at", None)
@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+import threading
+import time
+from datetime import datetime
+
+# 每次检查的结果状态
+STATUS_FAILURE = 0
+STATUS_SUCCESS = 1
+STATUS_OFF_CAMPUS = 2
+
+# 按阶段保存耗时的列，total为单个地址从开始检查到得出结果的总耗时
+PHASES = ("total", "ip", "auth_check", "probe", "login", "parse", "notify")
+
+# 耗时直方图的桶按2^(1/8)倍递增，由直方图计算的分位数相对误差不超过9%
+BUCKET_BASE = 2 ** 0.125
+MIN_BUCKET_MS = 0.01
+
+# 汇总数据的时间粒度（秒），按天与按小时各保存一份，start为时间戳除以粒度取整
+PERIODS = (86400, 3600)
+
+# 内存中缓存的门户返回信息编号的最大条数
+MESSAGE_CACHE_SIZE = 256
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    account TEXT NOT NULL,
+    ip TEXT,
+    status INTEGER NOT NULL,
+    needed INTEGER NOT NULL,
+    message_id INTEGER,
+    {", ".join(f"{phase}_ms REAL" for phase in PHASES)}
+);
+CREATE INDEX IF NOT EXISTS attempts_ts ON attempts(ts);
+CREATE INDEX IF NOT EXISTS attempts_status_ts ON attempts(status, ts);
+CREATE TABLE IF NOT EXISTS rollup (
+    period INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    successes INTEGER NOT NULL DEFAULT 0,
+    needed INTEGER NOT NULL DEFAULT 0,
+    logins INTEGER NOT NULL DEFAULT 0,
+    off_campus INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, start, account)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS latency_hist (
+    period INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (period, start, account, phase, bucket)
+) WITHOUT ROWID;
+"""
+
+
+def bucket_of(ms):
+    """
+    Returns:
+        int: 耗时（毫秒）所在直方图桶的编号，桶的上界为BUCKET_BASE ** 编号
+    """
+    return math.ceil(math.log(max(ms, MIN_BUCKET_MS), BUCKET_BASE) - 1e-9)
+
+
+def bucket_value(bucket):
+    """
+    Returns:
+        float: 直方图桶的上界（毫秒）
+    """
+    return BUCKET_BASE ** bucket
+
+
+def split_range(since, until, periods=PERIODS):
+    """
+    将时间范围拆分为尽量粗的整段汇总区间与首尾不足最小粒度的零散区间
+
+    Args:
+        since: 起始时间戳（含）
+        until: 结束时间戳（不含）
+        periods: 从粗到细的汇总粒度（秒）
+
+    Returns:
+        list: (period, first, last)汇总区间的列表，表示start在[first, last)内的汇总数据
+        list: (start, end)零散区间的列表，需要读取逐次记录
+    """
+    if not periods:
+        return [], [(since, until)] if since < until else []
+    period = periods[0]
+    first = math.ceil(since / period)
+    last = math.floor(until / period)
+    if first >= last:
+        return split_range(since, until, periods[1:])
+    rollups, raw = [(period, first, last)], []
+    for start, end in ((since, first * period), (last * period, until)):
+        sub_rollups, sub_raw = split_range(start, end, periods[1:])
+        rollups += sub_rollups
+        raw += sub_raw
+    return rollups, raw
+
+
+def parse_time(text, now=None):
+    """
+    解析命令行中的时间
+
+    Args:
+        text: 相对时间（如30m、24h、7d，表示距现在多久之前）、日期时间（如2026-10-01或2026-10-01 08:00）或时间戳
+        now: 当前时间戳，默认为time.time()
+
+    Returns:
+        float: 时间戳
+    """
+    now = time.time() if now is None else now
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    text = text.strip()
+    if text[-1:] in units:
+        try:
+            return now - float(text[:-1]) * units[text[-1]]
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"无法解析时间: {text}") from None
+
+
+class HistoryStore:
+    """登录历史记录模块，将每次检查的结果保存在SQLite数据库中，并按小时汇总供统计查询"""
+
+    def __init__(self, db_file="history.db", retention_days=180, cache_kib=None):
+        """
+        初始化历史记录
+
+        Args:
+            db_file: 数据库文件路径
+            retention_days: 逐次记录的保留天数，按小时的汇总数据不会删除，0表示不删除
+            cache_kib: SQLite页缓存的上限（KiB），为None时使用SQLite的默认值（约2MiB）
+        """
+        import sqlite3
+
+        self.db_file = db_file
+        self.retention_days = retention_days
+        self._message_ids = {}
+        self._lock = threading.Lock()
+        # 常驻模式下控制接口等其他线程也可能查询，连接由锁保护
+        self.conn = sqlite3.connect(db_file, timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if cache_kib is not None:
+            self.conn.execute(f"PRAGMA cache_size=-{int(cache_kib)}")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self.conn.close()
+
+    def _message_id(self, text):
+        if text is None:
+            return None
+        message_id = self._message_ids.get(text)
+        if message_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO messages(text) VALUES (?)", (text,))
+            message_id = self.conn.execute("SELECT id FROM messages WHERE text = ?", (text,)).fetchone()[0]
+            # 门户返回的信息可能带有变化的内容，缓存超过上限时清空，避免常驻进程的内存随之增长
+            if len(self._message_ids) >= MESSAGE_CACHE_SIZE:
+                self._message_ids.clear()
+            self._message_ids[text] = message_id
+        return message_id
+
+    def record(self, ts, account, ip, status, needed, message, phases):
+        """
+        保存一次检查的结果
+
+        Args:
+            ts: 检查开始的时间戳
+            account: 学号
+            ip: 认证的IP地址
+            status: STATUS_SUCCESS、STATUS_FAILURE或STATUS_OFF_CAMPUS
+            needed: 是否实际向门户发送了登录请求（已在线而跳过时为False）
+            message: 门户返回或程序生成的结果信息
+            phases: 阶段名称到耗时（毫秒）的映射，未执行的阶段可省略
+        """
+        self.record_many([(ts, account, ip, status, needed, message, phases)])
+
+    def record_many(self, entries):
+        """
+        在一个事务中保存多次检查的结果
+
+        Args:
+            entries: (ts, account, ip, status, needed, message, phases)元组的列表，含义同record()
+        """
+        attempts = []
+        rollup = {}
+        histogram = {}
+        with self._lock, self.conn:
+            for ts, account, ip, status, needed, message, phases in entries:
+                values = [phases.get(phase) for phase in PHASES]
+                attempts.append([ts, account, ip, status, int(needed), self._message_id(message)] + values)
+                success = status == STATUS_SUCCESS
+                flags = (1, success, needed, success and needed, status == STATUS_OFF_CAMPUS)
+                buckets = [(phase, bucket_of(value)) for phase, value in zip(PHASES, values) if value is not None]
+                for period in PERIODS:
+                    start = int(ts // period)
+                    counts = rollup.setdefault((period, start, account), [0, 0, 0, 0, 0])
+                    for i, flag in enumerate(flags):
+                        counts[i] += int(bool(flag))
+                    for phase, bucket in buckets:
+                        key = (period, start, account, phase, bucket)
+                        histogram[key] = histogram.get(key, 0) + 1
+
+            self.conn.executemany(
+                f"INSERT INTO attempts(ts, account, ip, status, needed, message_id, "
+                f"{', '.join(f'{phase}_ms' for phase in PHASES)}) VALUES ({', '.join('?' * (6 + len(PHASES)))})",
+                attempts)
+            self.conn.executemany(
+                "INSERT INTO rollup(period, start, account, attempts, successes, needed, logins, off_campus) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(period, start, account) DO UPDATE SET "
+                "attempts = attempts + excluded.attempts, successes = successes + excluded.successes, "
+                "needed = needed + excluded.needed, logins = logins + excluded.logins, "
+                "off_campus = off_campus + excluded.off_campus",
+                [key + tuple(counts) for key, counts in rollup.items()])
+            self.conn.executemany(
+                "INSERT INTO latency_hist(period, start, account, phase, bucket, count) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(period, start, account, phase, bucket) DO UPDATE SET count = count + excluded.count",
+                [key + (count,) for key, count in histogram.items()])
+            # 每写入约1000条记录清理一次超出保留期的逐次记录，按ts索引删除
+            total = self.conn.execute("SELECT MAX(id) FROM attempts").fetchone()[0] or 0
+            if self.retention_days and attempts and total // 1000 != (total - len(attempts)) // 1000:
+                cutoff = max(entry[0] for entry in attempts) - self.retention_days * 86400
+                self.conn.execute("DELETE FROM attempts WHERE ts < ?", (cutoff,))
+
+    def summary(self, since, until, account=None):
+        """
+        统计时间范围内的检查次数、成功率与各阶段耗时分位数
+
+        整天与整小时的部分读取汇总数据，首尾不足一小时的部分按ts索引读取逐次记录，
+        查询耗时只与时间范围跨越的天数有关，与记录总数无关。
+
+        Args:
+            since: 起始时间戳（含）
+            until: 结束时间戳（不含）
+            account: 只统计该学号，为None时统计所有学号
+
+        Returns:
+            dict: 统计结果
+        """
+        rollups, edges = split_range(since, until)
+        counts = dict.fromkeys(("attempts", "successes", "needed", "logins", "off_campus"), 0)
+        histograms = {phase: {} for phase in PHASES}
+        account_filter = " AND account = ?" if account is not None else ""
+        account_args = (account,) if account is not None else ()
+
+        with self._lock:
+            for period, first, last in rollups:
+                row = self.conn.execute(
+                    "SELECT TOTAL(attempts), TOTAL(successes), TOTAL(needed), TOTAL(logins), TOTAL(off_campus) "
+                    f"FROM rollup WHERE period = ? AND start >= ? AND start < ?{account_filter}",
+                    (period, first, last) + account_args).fetchone()
+                for key, value in zip(counts, row):
+                    counts[key] += int(value)
+                for phase, bucket, count in self.conn.execute(
+                        "SELECT phase, bucket, SUM(count) FROM latency_hist WHERE period = ? AND start >= ? "
+                        f"AND start < ?{account_filter} GROUP BY phase, bucket",
+                        (period, first, last) + account_args):
+                    histogram = histograms.setdefault(phase, {})
+                    histogram[bucket] = histogram.get(bucket, 0) + count
+
+            columns = ", ".join(f"{phase}_ms" for phase in PHASES)
+            for start, end in edges:
+                for row in self.conn.execute(
+                        f"SELECT status, needed, {columns} FROM attempts WHERE ts >= ? AND ts < ?{account_filter}",
+                        (start, end) + account_args):
+                    status, needed = row[0], row[1]
+                    counts["attempts"] += 1
+                    counts["successes"] += status == STATUS_SUCCESS
+                    counts["needed"] += needed
+                    counts["logins"] += status == STATUS_SUCCESS and needed
+                    counts["off_campus"] += status == STATUS_OFF_CAMPUS
+                    for phase, value in zip(PHASES, row[2:]):
+                        if value is not None:
+                            histogram = histograms[phase]
+                            bucket = bucket_of(value)
+                            histogram[bucket] = histogram.get(bucket, 0) + 1
+
+        on_campus = counts["attempts"] - counts["off_campus"]
+        counts["failures"] = on_campus - counts["successes"]
+        counts["online_rate"] = round(counts["successes"] / on_campus, 4) if on_campus else None
+        login_attempts = counts["needed"] - counts["off_campus"]
+        counts["login_success_rate"] = round(counts["logins"] / login_attempts, 4) if login_attempts > 0 else None
+        counts["latency_ms"] = {phase: self.percentiles(histogram) for phase, histogram in histograms.items()
+                                if histogram}
+        return counts
+
+    @staticmethod
+    def percentiles(histogram, quantiles=(50, 90, 99)):
+        """
+        由直方图计算分位数
+
+        Args:
+            histogram: 桶编号到样本数的映射
+            quantiles: 要计算的分位（0~100）
+
+        Returns:
+            dict: 如{"count": 120, "p50": 35.2, ...}，取值为所在桶的上界（毫秒）
+        """
+        total = sum(histogram.values())
+        result = {"count": total}
+        ordered = sorted(histogram.items())
+        for q in quantiles:
+            rank = max(1, math.ceil(q / 100 * total))
+            seen = 0
+            for bucket, count in ordered:
+                seen += count
+                if seen >= rank:
+                    result[f"p{q}"] = round(bucket_value(bucket), 3)
+                    break
+        return result
+
+    def outages(self, since, until, account=None, now=None):
+        """
+        查找时间范围内的掉线时段：从一次登录失败开始，到其后第一次成功结束，未连接校园网不计入
+
+        每个掉线时段只需几次按(status, ts)索引的查询，耗时与掉线次数有关，与记录总数无关。
+
+        Args:
+            since: 起始时间戳（含）
+            until: 结束时间戳（不含）
+            account: 只统计该学号，为None时统计所有学号
+            now: 当前时间戳，用于计算尚未恢复的掉线时长
+
+        Returns:
+            list: 每个掉线时段的start、end（尚未恢复时为None）、duration（秒）、failures与message
+        """
+        now = time.time() if now is None else now
+        account_filter = " AND account = ?" if account is not None else ""
+        account_args = (account,) if account is not None else ()
+        result = []
+        cursor = since
+        with self._lock:
+            while True:
+                row = self.conn.execute(
+                    "SELECT ts, message_id FROM attempts WHERE status = ? AND ts >= ? AND ts < ?"
+                    f"{account_filter} ORDER BY ts LIMIT 1",
+                    (STATUS_FAILURE, cursor, until) + account_args).fetchone()
+                if row is None:
+                    break
+                start, message_id = row
+                row = self.conn.execute(
+                    f"SELECT ts FROM attempts WHERE status = ? AND ts > ?{account_filter} ORDER BY ts LIMIT 1",
+                    (STATUS_SUCCESS, start) + account_args).fetchone()
+                end = row[0] if row is not None else None
+                failures = self.conn.execute(
+                    f"SELECT COUNT(*) FROM attempts WHERE status = ? AND ts >= ? AND ts < ?{account_filter}",
+                    (STATUS_FAILURE, start, end if end is not None else math.inf) + account_args).fetchone()[0]
+                message = self.conn.execute("SELECT text FROM messages WHERE id = ?", (message_id,)).fetchone()
+                result.append({
+                    "start": start,
+                    "end": end,
+                    "duration": round((end if end is not None else now) - start, 3),
+                    "failures": failures,
+                    "message": message[0] if message else None
+                })
+                if end is None:
+                    break
+                cursor = end
+        return result
+
+
+def format_report(summary, outages, since, until):
+    """
+    Returns:
+        str: 供命令行输出的统计报告
+    """
+    def fmt(ts):
+        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+    def rate(value):
+        return "-" if value is None else f"{value:.1%}"
+
+    lines = [
+        f"时间范围: {fmt(since)} ~ {fmt(until)}",
+        f"检查次数: {summary['attempts']}，发送登录请求: {summary['needed']}，在线: {summary['successes']}，"
+        f"失败: {summary['failures']}，未连接校园网: {summary['off_campus']}",
+        f"在线率: {rate(summary['online_rate'])}，登录成功率: {rate(summary['login_success_rate'])}"
+    ]
+    if summary["latency_ms"]:
+        lines.append("各阶段耗时（毫秒）:")
+        for phase in PHASES:
+            stats = summary["latency_ms"].get(phase)
+            if stats:
+                lines.append(f"  {phase:<10} p50 {stats['p50']:>9.1f}  p90 {stats['p90']:>9.1f}  "
+                             f"p99 {stats['p99']:>9.1f}  ({stats['count']}次)")
+    lines.append(f"掉线时段: {len(outages)}个")
+    for outage in outages:
+        end = fmt(outage["end"]) if outage["end"] is not None else "尚未恢复"
+        lines.append(f"  {fmt(outage['start'])} ~ {end}，持续{outage['duration']:.0f}秒，"
+                     f"失败{outage['failures']}次: {outage['message']}")
+    return "\n".join(lines)
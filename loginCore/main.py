@@ -3,22 +3,113 @@
 
 import json
 import os
-import argparse
-from portal import ePortal
-from notify import Notifier
+import sys
+import time
+from portal import ePortal, NOT_ON_CAMPUS_MESSAGE
+from auth_cache import AuthCache
+from spool import NotificationSpool
+from netinfo import get_resolver
+from tracing import Tracer, Deadline, DeadlineExceeded
+from metrics import LOGIN_ATTEMPTS, LAST_AUTH_TIMESTAMP
+from retry import RetryPolicy, CircuitBreaker
+
+# 低内存模式下历史记录数据库的页缓存上限（KiB）
+LEAN_HISTORY_CACHE_KIB = 256
 
 class AutoLogin:
     """校园网自动登录入口模块"""
     
-    def __init__(self, config_file="config.json"):
+    def __init__(self, config_file="config.json", transport=None, trace=False, deadline=None, lean=False):
         """
         初始化自动登录实例
         
         Args:
             config_file: 配置文件路径
+            transport: 门户请求使用的HTTP实现，不指定则使用配置文件中的transport
+            trace: 是否以JSON行的形式向标准错误输出各阶段耗时
+            deadline: 单次登录流程的总时限（秒），不指定则使用配置文件中的deadline
+            lean: 是否启用低内存模式，为False时使用配置文件中的lean_mode
         """
         self.config_file = config_file
         self.config = self.load_config()
+        self.transport_option = transport
+        self.lean_option = lean
+        self.deadline_option = deadline
+        self.trace = trace
+        self.last_trace = None
+        self.resident = False
+        # 为True时每次检查都先查询认证状态，供自适应调度观测会话时长
+        self.observe_auth = False
+        self.last_auth_state = None
+        # 最近一次登录中各地址的结果，供控制接口查询
+        self.last_results = []
+        self.portal = None
+        self.notifier = None
+        self.selector = None
+        self.history = None
+        self.single_flight = None
+        state_dir = self.state_dir = os.path.dirname(os.path.abspath(config_file))
+        self.auth_cache = AuthCache(os.path.join(state_dir, "auth_cache.json"))
+        self.spool = NotificationSpool(os.path.join(state_dir, "notify_spool.json"))
+        self.breaker = CircuitBreaker(state_file=os.path.join(state_dir, "breaker.json"))
+        self.apply_config()
+    
+    def apply_config(self, previous=None):
+        """
+        按当前配置设置各组件的参数，重新加载配置时只重建受影响的组件
+        
+        Args:
+            previous: 重新加载前的配置，初始化时为None
+        """
+        config = self.config
+        self.transport = self.transport_option or config.get("transport", "auto")
+        self.lean = bool(self.lean_option or config.get("lean_mode"))
+        self.deadline = self.deadline_option if self.deadline_option is not None else config.get("deadline", 20)
+        self.auth_cache.ttl = config.get("auth_cache_ttl", 600)
+        self.spool.window = config.get("notify_coalesce_window", 3600)
+        self.breaker.failure_threshold = config.get("breaker_threshold", 5)
+        self.breaker.reset_timeout = config.get("breaker_reset_timeout", 60)
+        self.retry_policy = RetryPolicy(config.get("retry_max_attempts", 3),
+                                        config.get("retry_base_delay", 0.5),
+                                        config.get("retry_max_delay", 10))
+        if previous is None:
+            return
+        
+        changed = {key for key in set(previous) | set(config) if previous.get(key) != config.get(key)}
+        # 正在进行的登录持有原ePortal实例，不受影响；下次登录时按新配置重建
+        if changed & {"portal_endpoints", "portal_endpoint_ttl"}:
+            self.selector = None
+        if changed & {"portal_base_url", "portal_site_url", "portal_endpoints", "portal_endpoint_ttl",
+                      "campus_subnets", "transport", "wlan_user_mac", "speculative_login", "lean_mode"}:
+            self.portal = None
+        if changed & {"history_file", "history_retention_days", "lean_mode"}:
+            self.history = None
+        # 账号密码与webhook URL变化时，get_portal与get_notifier会在下次使用时重建对应实例
+        if changed:
+            print(f"已重新加载配置，变化的配置项: {', '.join(sorted(changed))}")
+    
+    def reload_config(self):
+        """
+        重新读取配置文件，校验通过后整体替换当前配置，校验失败时继续使用原配置
+        
+        Returns:
+            bool: 是否已应用新配置
+        """
+        try:
+            with open(self.config_file, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except Exception as e:
+            print(f"重新加载配置文件失败，继续使用原配置: {e}")
+            return False
+        
+        error = validate_config(config)
+        if error:
+            print(f"配置文件无效，继续使用原配置: {error}")
+            return False
+        
+        previous, self.config = self.config, config
+        self.apply_config(previous)
+        return True
     
     def load_config(self):
         """
@@ -30,7 +121,39 @@ class AutoLogin:
         default_config = {
             "student_id": "",
             "password": "",
-            "webhook_urls": []
+            "webhook_urls": [],
+            "accounts": [],
+            "max_workers": 8,
+            "auth_cache_ttl": 600,
+            "notify_coalesce_window": 3600,
+            "campus_subnets": ["10.0.0.0/8", "172.16.0.0/12"],
+            "login_all_interfaces": False,
+            "deadline": 20,
+            "metrics_textfile": "",
+            "retry_max_attempts": 3,
+            "retry_base_delay": 0.5,
+            "retry_max_delay": 10,
+            "breaker_threshold": 5,
+            "breaker_reset_timeout": 60,
+            "portal_base_url": "",
+            "portal_site_url": "",
+            "portal_endpoints": [],
+            "portal_endpoint_ttl": 300,
+            "adaptive_schedule": False,
+            "control_port": 0,
+            "control_socket": "",
+            "min_check_interval": 30,
+            "max_check_interval": 900,
+            "history_file": "history.db",
+            "history_retention_days": 180,
+            "wlan_user_mac": "",
+            "speculative_login": False,
+            "lean_mode": False,
+            "gateway_entries": [],
+            "gateway_rate": 2,
+            "gateway_burst": 5,
+            "gateway_workers": 4,
+            "transport": "auto"
         }
         
         if os.path.exists(self.config_file):
@@ -65,66 +188,547 @@ class AutoLogin:
             print(f"配置不完整，请配置{self.config_file}文件设置学号和密码")
             return False
         
-        student_id = self.config.get("student_id")
-        password = self.config.get("password")
+        # 使用本次登录开始时的配置，登录过程中重新加载配置不影响本次登录
+        config = self.config
+        
+        # 计划任务在网络连接时与定时触发可能同时启动多个进程，同一时间只有一个进程请求门户，其余进程复用其结果
+        if self.single_flight is None:
+            from singleflight import SingleFlight
+            self.single_flight = SingleFlight(self.state_dir)
+        # 持有锁超过总时限仍未完成的登录进程视为已卡死
+        self.single_flight.lock.stale_after = (self.deadline or 60) + 30
+        result, coalesced = self.single_flight.run(config.get("student_id"), lambda: self.run_login(config))
+        if coalesced:
+            self.last_trace = None
+            self.last_auth_state = None
+            self.last_results = result["results"]
+            for record in result["results"]:
+                print(f"{record['ip']}: {record['message']}（复用其他进程正在进行的登录结果）")
+        return result["success"]
+    
+    def run_login(self, config):
+        """
+        按指定配置执行一次登录流程
+        
+        Args:
+            config: 本次登录使用的配置
+            
+        Returns:
+            dict: 是否全部登录成功（success）与各地址的结果记录（results）
+        """
+        student_id = config.get("student_id")
+        password = config.get("password")
+        
+        tracer = Tracer(emit=self.trace)
+        deadline = Deadline(self.deadline or None)
+        self.last_trace = tracer
+        self.last_auth_state = None
+        results = []
         
-        # 使用ePortal进行登录
-        portal = ePortal(student_id, password)
-        success, message = portal.login()
+        with tracer.span("total"):
+            with tracer.span("ip"):
+                portal = self.get_portal(config)
+            
+            # 主机有多个校园网网卡时，按配置逐个认证所有地址
+            ips = [portal.wlan_user_ip]
+            if config.get("login_all_interfaces"):
+                ips = portal.resolver.get_campus_ips() or ips
+            
+            successes = [self.login_address(portal, ip, tracer, deadline, config, results) for ip in ips]
+        self.last_results = results
+        return {"success": all(successes), "results": results}
+    
+    def login_address(self, portal, ip, tracer, deadline, config, results=None):
+        """
+        认证单个本机地址
         
-        # 发送通知（如果配置了webhook URLs）
-        if success and self.config.get("webhook_urls"):
-            self.send_notification(True, message, portal.wlan_user_ip)
+        Args:
+            portal: ePortal实例
+            ip: 要认证的IP地址
+            tracer: Tracer实例
+            deadline: Deadline实例
+            config: 本次登录使用的配置
+            results: 可选的列表，追加本地址的结果记录
+            
+        Returns:
+            bool: 登录是否成功
+        """
+        start = time.perf_counter()
+        # 第一个地址的记录包含各地址共用的IP获取阶段
+        first_span = 0 if not results else len(tracer.spans)
+        record = {"ip": ip, "success": False, "skipped": False, "message": None, "time": time.time()}
+        if results is not None:
+            results.append(record)
+        student_id = portal.user_account
+        portal.wlan_user_ip = ip
+        
+        # 缓存认为在线且认证状态探测一致时，无需再请求门户登录
+        if self.observe_auth or self.auth_cache.is_fresh(student_id, ip):
+            try:
+                with tracer.span("auth_check", ip=ip):
+                    authenticated = portal.is_authenticated(timeout=deadline.timeout(0.2, 3))
+            except DeadlineExceeded:
+                authenticated = False
+            # 多个地址中任一地址掉线即视为掉线
+            self.last_auth_state = authenticated and self.last_auth_state is not False
+            if authenticated:
+                LOGIN_ATTEMPTS.inc("skipped", "已处于登录状态")
+                LAST_AUTH_TIMESTAMP.set(time.time())
+                # 探测确认在线后刷新缓存有效期，与登录成功时一致
+                self.auth_cache.mark_online(student_id, ip)
+                self.auth_cache.record(skipped=True)
+                print(f"已处于登录状态，跳过登录（跳过率: {self.auth_cache.skip_rate():.1%}）")
+                record.update(success=True, skipped=True, message="已处于登录状态",
+                              elapsed_ms=round((time.perf_counter() - start) * 1000, 3))
+                self.record_history(student_id, record, tracer.spans[first_span:])
+                self.flush_notifications(config)
+                return True
+        
+        # 认证缓存中近期登录成功的记录同样说明该地址处于校园网，推测登录据此判断
+        online_at = self.auth_cache.online_at(student_id, ip)
+        if online_at is not None:
+            portal.mark_on_campus(confirmed_at=online_at)
+        
+        # 使用ePortal进行登录，门户繁忙等可重试的失败按策略退避重试
+        success, message = self.retry_policy.run(portal, tracer, deadline, self.breaker)
+        LOGIN_ATTEMPTS.inc("success" if success else "failure", message[:64])
+        if success:
+            LAST_AUTH_TIMESTAMP.set(time.time())
+            self.auth_cache.mark_online(student_id, ip)
+        else:
+            self.auth_cache.invalidate(student_id, ip)
+        self.auth_cache.record(skipped=False)
+        record.update(success=success, message=message, elapsed_ms=round((time.perf_counter() - start) * 1000, 3))
         
         print(message)
+        
+        # 发送通知（如果配置了webhook URLs），未连接校园网不属于登录失败，无需通知
+        if config.get("webhook_urls") and message != NOT_ON_CAMPUS_MESSAGE:
+            with tracer.span("notify"):
+                self.send_notification(config, success, message, ip)
+        
+        self.record_history(student_id, record, tracer.spans[first_span:])
         return success
     
-    def send_notification(self, success, message, ip_address):
+    def get_history(self):
+        """
+        获取HistoryStore实例，未配置history_file时返回None
+        
+        Returns:
+            HistoryStore: 历史记录实例
+        """
+        history_file = self.config.get("history_file", "history.db")
+        if not history_file:
+            return None
+        if self.history is None:
+            from history import HistoryStore
+            self.history = HistoryStore(os.path.join(self.state_dir, history_file),
+                                        self.config.get("history_retention_days", 180),
+                                        LEAN_HISTORY_CACHE_KIB if self.lean else None)
+        return self.history
+    
+    def record_history(self, student_id, record, spans):
+        """
+        将单个地址的检查结果保存到历史记录，保存失败不影响登录流程
+        
+        Args:
+            student_id: 学号
+            record: login_address生成的结果记录
+            spans: 本次检查期间Tracer记录的阶段
+        """
+        from history import STATUS_SUCCESS, STATUS_FAILURE, STATUS_OFF_CAMPUS
+        
+        phases = {"total": record["elapsed_ms"]}
+        for span in spans:
+            phases[span["span"]] = phases.get(span["span"], 0) + span["duration_ms"]
+        if record["success"]:
+            status = STATUS_SUCCESS
+        elif record["message"] == NOT_ON_CAMPUS_MESSAGE:
+            status = STATUS_OFF_CAMPUS
+        else:
+            status = STATUS_FAILURE
+        try:
+            history = self.get_history()
+            if history is not None:
+                history.record(record["time"], student_id, record["ip"], status, not record["skipped"],
+                               record["message"], phases)
+        except Exception as e:
+            print(f"保存登录历史失败: {e}")
+    
+    def show_history(self, since="24h", until=None, account=None, as_json=False):
+        """
+        输出时间范围内的成功率、各阶段耗时分位数与掉线时段
+        
+        Args:
+            since: 起始时间，如24h、7d、2026-10-01
+            until: 结束时间，默认为当前时间
+            account: 只统计该学号
+            as_json: 是否以JSON格式输出
+            
+        Returns:
+            bool: 是否成功输出统计
+        """
+        from history import parse_time, format_report
+        
+        history = self.get_history()
+        if history is None:
+            print("未启用登录历史记录，请在配置文件中设置history_file")
+            return False
+        try:
+            now = time.time()
+            start = parse_time(since, now)
+            end = parse_time(until, now) if until else now
+        except ValueError as e:
+            print(e)
+            return False
+        
+        summary = history.summary(start, end, account)
+        outages = history.outages(start, end, account, now)
+        if as_json:
+            summary.update(since=start, until=end, outages=outages)
+            print(json.dumps(summary, ensure_ascii=False, indent=2))
+        else:
+            print(format_report(summary, outages, start, end))
+        return True
+    
+    def batch_login(self, max_workers=None):
+        """
+        并发登录配置文件accounts中的所有账号
+        
+        Args:
+            max_workers: 最大并发数，不指定则使用配置文件中的max_workers
+            
+        Returns:
+            bool: 是否所有账号都登录成功
+        """
+        from batch import BatchLogin
+        
+        accounts = self.config.get("accounts") or []
+        if not accounts:
+            print(f"未配置批量账号，请在{self.config_file}文件中设置accounts")
+            return False
+        
+        if max_workers is None:
+            max_workers = self.config.get("max_workers", 8)
+        
+        transport = "requests" if self.transport == "auto" else self.transport
+        results, wall_time = BatchLogin(accounts, max_workers, transport, self.portal_options(self.config)).run()
+        for result in results:
+            print(f"{result['student_id']} ({result['wlan_user_ip']}): {result['message']} "
+                  f"[{result['elapsed'] * 1000:.0f}ms]")
+        
+        succeeded = sum(1 for result in results if result["success"])
+        print(f"批量登录完成: 成功{succeeded}/{len(results)}，总耗时{wall_time * 1000:.0f}ms")
+        return succeeded == len(results)
+    
+    def gateway_login(self, entries_file=None, max_workers=None):
+        """
+        网关模式：为配置文件gateway_entries或CSV文件中的所有条目执行一轮检查，只为掉线的条目重新登录
+        
+        Args:
+            entries_file: 条目CSV文件路径，不指定则使用配置文件中的gateway_entries
+            max_workers: 并发数，不指定则使用配置文件中的gateway_workers
+            
+        Returns:
+            bool: 本轮结束后是否所有条目都在线
+        """
+        from gateway import GatewayLogin, load_entries
+        from ratelimit import TokenBucket
+        
+        entries = load_entries(entries_file) if entries_file else self.config.get("gateway_entries") or []
+        if not entries:
+            print(f"未配置网关条目，请在{self.config_file}文件中设置gateway_entries或通过--entries指定CSV文件")
+            return False
+        for entry in entries:
+            if not entry.get("student_id") or not entry.get("password") or not entry.get("wlan_user_ip"):
+                print(f"网关条目缺少student_id、password或wlan_user_ip: {entry.get('student_id')}")
+                return False
+        
+        if max_workers is None:
+            max_workers = self.config.get("gateway_workers", 4)
+        # 令牌桶状态保存在配置文件所在目录，同一目录下运行的所有网关进程共用同一速率预算
+        bucket = TokenBucket(os.path.join(self.state_dir, "ratelimit.db"), self.config.get("gateway_rate", 2),
+                             self.config.get("gateway_burst", 5))
+        transport = "requests" if self.transport == "auto" else self.transport
+        gateway = GatewayLogin(entries, bucket, max_workers, transport, self.portal_options(self.config),
+                               os.path.join(self.state_dir, "gateway_state.json"),
+                               online_ttl=self.config.get("auth_cache_ttl", 600))
+        try:
+            results, stats = gateway.run()
+        finally:
+            bucket.close()
+        
+        for result in results:
+            line = f"{result['student_id']} ({result['wlan_user_ip']}): {result['message']}"
+            if result["relogin"]:
+                line += f" [排队{result['queue_ms']:.0f}ms]"
+            if result["time_to_online"] is not None:
+                line += f" [掉线{result['time_to_online']:.1f}秒后恢复]"
+            print(line)
+        print(f"网关检查完成: 共{stats['entries']}个条目，在线{stats['online']}个，重新登录{stats['queued']}个"
+              f"（成功{stats['succeeded']}个），最大队列深度{stats['max_queue_depth']}，总耗时{stats['wall_ms']:.0f}ms")
+        return stats["online"] + stats["succeeded"] == stats["entries"]
+    
+    def get_portal(self, config):
         """
-        发送登录结果通知
+        获取ePortal实例，账号未变化时复用已有实例，仅刷新本机IP
         
         Args:
+            config: 本次登录使用的配置
+            
+        Returns:
+            ePortal: ePortal实例
+        """
+        student_id = config.get("student_id")
+        password = config.get("password")
+        portal = self.portal
+        if portal is None or portal.user_account != student_id or portal.user_password != password:
+            portal = ePortal(student_id, password, transport=self.resolve_transport(),
+                             resolver=get_resolver(config.get("campus_subnets")),
+                             wlan_user_mac=config.get("wlan_user_mac"),
+                             speculative=bool(config.get("speculative_login")), **self.portal_options(config))
+            self.portal = portal
+        else:
+            portal.wlan_user_ip = portal.get_local_ip()
+        return portal
+    
+    def portal_options(self, config):
+        """
+        Args:
+            config: 使用的配置
+            
+        Returns:
+            dict: 配置中指定的门户地址，作为ePortal的base_url、site_url与selector参数
+        """
+        endpoints = config.get("portal_endpoints") or []
+        if endpoints and self.selector is None:
+            from endpoints import EndpointSelector
+            self.selector = EndpointSelector(endpoints, os.path.join(self.state_dir, "portal_endpoint.json"),
+                                             ttl=config.get("portal_endpoint_ttl", 300))
+        return {
+            "base_url": config.get("portal_base_url") or None,
+            "site_url": config.get("portal_site_url") or None,
+            "selector": self.selector
+        }
+    
+    def resolve_transport(self):
+        """
+        确定门户与通知请求使用的HTTP实现，auto时单次登录使用启动更快的标准库实现，常驻模式使用requests连接池；
+        低内存模式下总是使用标准库实现，进程中不加载requests
+        
+        Returns:
+            str: "requests"或"stdlib"
+        """
+        if self.lean:
+            return "stdlib"
+        if self.transport == "auto":
+            return "requests" if self.resident else "stdlib"
+        return self.transport
+    
+    def get_notifier(self, config):
+        """
+        获取Notifier实例，webhook URL未变化时复用已有实例
+        
+        Args:
+            config: 本次登录使用的配置
+            
+        Returns:
+            Notifier: 通知器实例
+        """
+        # 仅在需要发送通知时才导入通知模块（及其依赖的requests）
+        from notify import Notifier
+        
+        webhook_urls = config.get("webhook_urls", [])
+        transport = self.resolve_transport()
+        if self.notifier is None or self.notifier.webhook_urls != webhook_urls or self.notifier.transport != transport:
+            self.notifier = Notifier(webhook_urls, transport=transport)
+        return self.notifier
+    
+    def send_notification(self, config, success, message, ip_address):
+        """
+        暂存登录结果通知，登录成功（已联网）时发送所有暂存的通知
+        
+        Args:
+            config: 本次登录使用的配置
             success: 是否登录成功
             message: 登录结果消息
             ip_address: 当前IP地址
         """
-        webhook_urls = self.config.get("webhook_urls", [])
+        webhook_urls = config.get("webhook_urls", [])
         if not webhook_urls:
             return
         
-        notifier = Notifier(webhook_urls)
-        
         status = "成功" if success else "失败"
-        content = f"校园网登录{status}通知\n\n" \
-                 f"学号: {self.config.get('student_id')}\n" \
+        title = f"校园网登录{status}通知"
+        content = f"{title}\n\n" \
+                 f"学号: {config.get('student_id')}\n" \
                  f"IP地址: {ip_address}\n" \
                  f"登录结果: {message}\n" \
                  f"时间: {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         
-        notifier.send_text(content)
+        self.spool.enqueue(f"{status}:{message}", title, content)
+        if success:
+            self.flush_notifications(config)
+    
+    def flush_notifications(self, config):
+        """
+        在后台发送所有暂存的通知，避免webhook响应慢时拖慢登录流程
+        
+        Args:
+            config: 本次登录使用的配置
+        """
+        if not config.get("webhook_urls") or not len(self.spool):
+            return
+        
+        notifier = self.get_notifier(config)
+        notifier.submit(self.spool.flush, notifier)
+
+
+def validate_config(config):
+    """
+    校验配置内容
+    
+    Args:
+        config: 解析出的配置
+        
+    Returns:
+        str: 第一个错误的说明，配置有效时返回None
+    """
+    if not isinstance(config, dict):
+        return "配置文件内容应为JSON对象"
+    for key in ("student_id", "password", "portal_base_url", "portal_site_url", "metrics_textfile",
+                "control_socket", "history_file", "wlan_user_mac"):
+        if not isinstance(config.get(key, ""), str):
+            return f"{key}应为字符串"
+    for key in ("webhook_urls", "campus_subnets"):
+        value = config.get(key, [])
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            return f"{key}应为字符串列表"
+    for key in ("accounts", "portal_endpoints", "gateway_entries"):
+        if not isinstance(config.get(key, []), list):
+            return f"{key}应为列表"
+    for endpoint in config.get("portal_endpoints", []):
+        if not isinstance(endpoint, dict) or not endpoint.get("base_url") or not endpoint.get("site_url"):
+            return "portal_endpoints的每一项都应包含base_url与site_url"
+    for key in ("max_workers", "auth_cache_ttl", "notify_coalesce_window", "deadline", "retry_max_attempts",
+                "retry_base_delay", "retry_max_delay", "breaker_threshold", "breaker_reset_timeout",
+                "portal_endpoint_ttl", "min_check_interval", "max_check_interval", "control_port",
+                "history_retention_days", "gateway_rate", "gateway_burst", "gateway_workers"):
+        value = config.get(key, 0)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            return f"{key}应为非负数"
+    if config.get("gateway_rate", 2) <= 0:
+        return "gateway_rate应为正数"
+    for entry in config.get("gateway_entries", []):
+        if not isinstance(entry, dict) or not entry.get("student_id") or not entry.get("wlan_user_ip"):
+            return "gateway_entries的每一项都应包含student_id与wlan_user_ip"
+    try:
+        from portal import normalize_mac
+        normalize_mac(config.get("wlan_user_mac"))
+        for item in config.get("accounts", []) + config.get("gateway_entries", []):
+            normalize_mac(item.get("wlan_user_mac") if isinstance(item, dict) else None)
+    except ValueError as e:
+        return str(e)
+    if config.get("transport", "auto") not in ("auto", "requests", "stdlib"):
+        return "transport应为auto、requests或stdlib"
+    try:
+        from netinfo import parse_subnet
+        for subnet in config.get("campus_subnets", []):
+            parse_subnet(subnet)
+    except Exception as e:
+        return f"campus_subnets格式错误: {e}"
+    return None
 
 
-def parse_args():
+def parse_fast_args(argv):
+    """
+    快速解析最常见的单次登录参数（无参数、login、-c/--config），避免导入argparse
+    
+    Args:
+        argv: 命令行参数列表（不含程序名）
+        
+    Returns:
+        SimpleNamespace: 解析结果，参数不属于快速路径时返回None
+    """
+    from types import SimpleNamespace
+    
+    args = SimpleNamespace(config="config.json", interval=180, watch=False, workers=None, transport=None,
+                           trace=False, deadline=None, metrics_port=None, adaptive=False, control_port=None,
+                           control_socket=None, entries=None, since="24h", until=None, account=None, json=False,
+                           lean=False, command="login")
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("-c", "--config") and i + 1 < len(argv):
+            args.config = argv[i + 1]
+            i += 2
+        elif arg.startswith("--config="):
+            args.config = arg.split("=", 1)[1]
+            i += 1
+        elif arg == "login":
+            i += 1
+        else:
+            return None
+    return args
+
+
+def parse_args(argv=None):
     """解析命令行参数"""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="安徽大学校园网自动登录工具")
     parser.add_argument("-c", "--config", help="指定配置文件路径", default="config.json")
-    parser.add_argument("command", nargs="?", default="login", help="执行的命令，目前支持: login")
+    parser.add_argument("-i", "--interval", type=int, default=180, help="daemon模式下的检查间隔（秒）")
+    parser.add_argument("--watch", action="store_true", help="daemon模式下监听网络变化，校园网地址出现时立即登录（仅Linux）")
+    parser.add_argument("--trace", action="store_true", help="以JSON行的形式向标准错误输出各阶段耗时")
+    parser.add_argument("--deadline", type=float, default=None, help="单次登录流程的总时限（秒），0表示不限时")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="daemon模式下根据观测到的会话时长自适应调整检查间隔，-i指定的间隔用于样本不足时")
+    parser.add_argument("--metrics-port", type=int, default=None, help="daemon模式下在本机该端口提供/metrics指标接口")
+    parser.add_argument("--control-port", type=int, default=None,
+                        help="daemon模式下在本机该端口提供控制接口（status、login-now、last-results、metrics）")
+    parser.add_argument("--control-socket", default=None, help="daemon模式下在该路径的Unix套接字上提供控制接口")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="batch与gateway模式下的最大并发数")
+    parser.add_argument("-t", "--transport", choices=["auto", "requests", "stdlib"], default=None,
+                        help="门户请求使用的HTTP实现，默认auto：单次登录使用标准库，常驻模式使用requests")
+    parser.add_argument("--lean", action="store_true",
+                        help="低内存模式：门户与通知只使用标准库HTTP实现，缩小历史记录的缓存，适合内存较小的路由器")
+    parser.add_argument("--entries", default=None,
+                        help="gateway模式下的条目CSV文件，表头为student_id,password,wlan_user_ip,wlan_user_mac")
+    parser.add_argument("--since", default="24h", help="history命令统计的起始时间，如24h、7d、2026-10-01 08:00")
+    parser.add_argument("--until", default=None, help="history命令统计的结束时间，默认为当前时间")
+    parser.add_argument("--account", default=None, help="history命令只统计该学号")
+    parser.add_argument("--json", action="store_true", help="history命令以JSON格式输出")
+    parser.add_argument("command", nargs="?", default="login",
+                        help="执行的命令，目前支持: login, daemon, batch, gateway, history")
     
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def main():
     """程序入口点"""
-    args = parse_args()
+    argv = sys.argv[1:]
+    args = parse_fast_args(argv) or parse_args(argv)
     
     # 使用指定的配置文件路径创建AutoLogin实例
-    auto_login = AutoLogin(config_file=args.config)
+    auto_login = AutoLogin(config_file=args.config, transport=args.transport, trace=args.trace,
+                           deadline=args.deadline, lean=args.lean)
     
     if args.command == "login":
         auto_login.login()
+    elif args.command == "daemon":
+        from daemon import LoginDaemon
+        LoginDaemon(auto_login, interval=args.interval, watch=args.watch, metrics_port=args.metrics_port,
+                    adaptive=args.adaptive, control_port=args.control_port, control_socket=args.control_socket).run()
+    elif args.command == "batch":
+        auto_login.batch_login(max_workers=args.workers)
+    elif args.command == "gateway":
+        auto_login.gateway_login(args.entries, args.workers)
+    elif args.command == "history":
+        auto_login.show_history(args.since, args.until, args.account, args.json)
     else:
         print(f"未知命令: {args.command}")
-        print("可用命令: login")
+        print("可用命令: login, daemon, batch, gateway, history")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from util import atomic_write
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    """转义Prometheus标签值"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    """生成{name="value",...}形式的标签字符串"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """单调递增计数器"""
+
+    def __init__(self, name, documentation, labelnames=(), max_series=None):
+        """
+        Args:
+            name: 指标名
+            documentation: 指标说明
+            labelnames: 标签名
+            max_series: 标签组合的最大数量，超出后新的组合最后一个标签值计为other，避免常驻进程的内存随之增长
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        """
+        计数器加一
+
+        Args:
+            *labelvalues: 与labelnames一一对应的标签值
+            amount: 增加的数量
+        """
+        with self._lock:
+            if self.max_series is not None and labelvalues not in self._values \
+                    and len(self._values) >= self.max_series and labelvalues:
+                labelvalues = labelvalues[:-1] + ("other",)
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        """返回指定标签的当前值"""
+        return self._values.get(labelvalues, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labelvalues, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Gauge:
+    """可任意设置的数值，可通过函数在输出时计算"""
+
+    def __init__(self, name, documentation, function=None):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self._value = None
+
+    def set(self, value):
+        self._value = value
+
+    def value(self):
+        return self.function() if self.function is not None else self._value
+
+    def render(self):
+        value = self.value()
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        if value is not None:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+
+class Histogram:
+    """按固定桶统计的耗时分布"""
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """
+        记录一次观测值
+
+        Args:
+            value: 观测值（秒）
+        """
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            cumulative = 0
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+            cumulative += self._counts[-1]
+            lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum {self._sum}")
+            lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表，负责输出Prometheus文本格式"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Returns:
+            str: Prometheus文本格式的全部指标
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """
+        以node_exporter textfile collector的格式写入文件，先写临时文件再替换，避免被读取到半个文件
+
+        Args:
+            path: 输出文件路径（通常以.prom结尾）
+        """
+        try:
+            atomic_write(path, self.render())
+        except Exception as e:
+            print(f"写入指标文件失败: {e}")
+
+
+REGISTRY = MetricsRegistry()
+
+LOGIN_ATTEMPTS = REGISTRY.register(Counter(
+    "ahu_login_attempts_total", "门户登录尝试次数，按结果与门户返回信息区分", ("result", "msg"), max_series=64))
+PROBE_SECONDS = REGISTRY.register(Histogram(
+    "ahu_portal_probe_seconds", "校园网探测请求耗时"))
+LOGIN_SECONDS = REGISTRY.register(Histogram(
+    "ahu_portal_login_seconds", "门户登录请求耗时"))
+LOGIN_TRIGGERS = REGISTRY.register(Counter(
+    "ahu_login_triggers_total", "登录触发次数，flights为实际执行登录，coalesced为复用其他进程正在进行的登录结果",
+    ("kind",)))
+WEBHOOK_DELIVERIES = REGISTRY.register(Counter(
+    "ahu_webhook_deliveries_total", "webhook通知发送次数，按结果区分", ("result",)))
+LAST_AUTH_TIMESTAMP = REGISTRY.register(Gauge(
+    "ahu_last_auth_success_timestamp_seconds", "最近一次确认认证成功的时间戳"))
+SECONDS_SINCE_AUTH = REGISTRY.register(Gauge(
+    "ahu_seconds_since_last_auth", "距最近一次确认认证成功的秒数",
+    function=lambda: None if LAST_AUTH_TIMESTAMP.value() is None else round(time.time() - LAST_AUTH_TIMESTAMP.value(), 3)))
+
+PORTAL_REQUESTS_PER_DAY = REGISTRY.register(Gauge(
+    "ahu_portal_requests_per_day", "daemon模式下平均每天向门户发送的请求数"))
+AVG_OFFLINE_SECONDS = REGISTRY.register(Gauge(
+    "ahu_average_offline_seconds", "daemon模式下从认证失效到重新登录的平均时长（估计值）"))
+
+GATEWAY_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "ahu_gateway_queue_depth", "网关模式下等待登录的掉线条目数"))
+GATEWAY_TIME_TO_ONLINE = REGISTRY.register(Histogram(
+    "ahu_gateway_time_to_online_seconds", "网关模式下条目从发现掉线到重新登录成功的时长",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)))
+
+
+def serve(port, host="127.0.0.1"):
+    """
+    在后台线程中启动仅监听本机的/metrics HTTP接口
+
+    Args:
+        port: 监听端口
+        host: 监听地址
+
+    Returns:
+        ThreadingHTTPServer: 服务器实例
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import socket
+import struct
+import sys
+import threading
+
+# 默认的校园网地址段
+DEFAULT_CAMPUS_SUBNETS = ["10.0.0.0/8", "172.16.0.0/12"]
+
+# netlink协议常量（见linux/netlink.h、linux/rtnetlink.h）
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_LABEL = 3
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+
+NLMSGHDR = struct.Struct("=LHHLL")
+IFADDRMSG = struct.Struct("=BBBBI")
+RTATTR = struct.Struct("=HH")
+
+
+def parse_subnet(subnet):
+    """
+    解析CIDR格式的地址段
+
+    Args:
+        subnet: 如"10.0.0.0/8"
+
+    Returns:
+        tuple: (网络地址, 掩码)，均为整数
+    """
+    address, _, prefix = subnet.partition("/")
+    prefix = int(prefix or 32)
+    mask = (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF
+    return struct.unpack("!I", socket.inet_aton(address))[0] & mask, mask
+
+
+def ip_in_subnets(ip, subnets):
+    """
+    判断IP是否属于任一地址段
+
+    Args:
+        ip: IPv4地址字符串
+        subnets: parse_subnet返回值的列表
+
+    Returns:
+        bool: 是否属于
+    """
+    value = struct.unpack("!I", socket.inet_aton(ip))[0]
+    return any(value & mask == network for network, mask in subnets)
+
+
+def parse_netlink_messages(data):
+    """
+    解析netlink消息，提取地址与链路变化
+
+    Args:
+        data: 从netlink套接字读取的数据
+
+    Yields:
+        tuple: (消息类型, 网卡名, IP地址, 网卡索引)，链路消息的网卡名与IP地址为None
+    """
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length, msg_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+        if length < NLMSGHDR.size:
+            break
+        if msg_type in (RTM_NEWADDR, RTM_DELADDR):
+            family, _, _, _, index = IFADDRMSG.unpack_from(data, offset + NLMSGHDR.size)
+            if family == socket.AF_INET:
+                label, local, address = None, None, None
+                attr_offset = offset + NLMSGHDR.size + IFADDRMSG.size
+                while attr_offset + RTATTR.size <= offset + length:
+                    attr_len, attr_type = RTATTR.unpack_from(data, attr_offset)
+                    if attr_len < RTATTR.size:
+                        break
+                    value = data[attr_offset + RTATTR.size:attr_offset + attr_len]
+                    if attr_type == IFA_LOCAL:
+                        local = socket.inet_ntoa(value[:4])
+                    elif attr_type == IFA_ADDRESS:
+                        address = socket.inet_ntoa(value[:4])
+                    elif attr_type == IFA_LABEL:
+                        label = value.split(b"\0", 1)[0].decode(errors="replace")
+                    attr_offset += (attr_len + 3) & ~3
+                yield msg_type, label, local or address, index
+        elif msg_type in (RTM_NEWLINK, RTM_DELLINK):
+            yield msg_type, None, None, None
+        elif msg_type in (NLMSG_DONE, NLMSG_ERROR):
+            return
+        offset += (length + 3) & ~3
+
+
+def dump_ipv4_addresses():
+    """
+    通过netlink枚举本机所有IPv4地址（仅Linux）
+
+    Returns:
+        list: (网卡名, IP地址)的列表
+    """
+    addresses = []
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+        request = NLMSGHDR.pack(NLMSGHDR.size + IFADDRMSG.size, RTM_GETADDR,
+                                NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0)
+        sock.sendto(request, (0, 0))
+        done = False
+        while not done:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + NLMSGHDR.size <= len(data):
+                length, msg_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+                if msg_type in (NLMSG_DONE, NLMSG_ERROR) or length < NLMSGHDR.size:
+                    done = True
+                    break
+                offset += (length + 3) & ~3
+            for msg_type, label, ip, _ in parse_netlink_messages(data):
+                if msg_type == RTM_NEWADDR and ip:
+                    addresses.append((label, ip))
+    return addresses
+
+
+def get_route_ip():
+    """
+    通过UDP套接字查询默认路由对应的本机IP，不会实际发送数据包
+
+    Returns:
+        str: 本机IP地址，失败时返回None
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+    except Exception:
+        return None
+
+
+class AddressResolver:
+    """本机校园网地址发现模块，按地址段选择校园网网卡地址，地址变化时才重新枚举"""
+
+    def __init__(self, campus_subnets=None):
+        """
+        初始化地址发现实例
+
+        Args:
+            campus_subnets: 校园网地址段列表（CIDR格式）
+        """
+        self.campus_subnets = [parse_subnet(subnet) for subnet in (campus_subnets or DEFAULT_CAMPUS_SUBNETS)]
+        self._cache = None
+        self._lock = threading.Lock()
+        self._events = self._subscribe()
+
+    @staticmethod
+    def _subscribe():
+        """
+        订阅内核的地址变化事件，用于判断缓存是否失效
+
+        Returns:
+            socket: 非阻塞的netlink套接字，非Linux系统或订阅失败时返回None
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_IPV4_IFADDR))
+            sock.setblocking(False)
+            return sock
+        except OSError:
+            return None
+
+    def _addresses_changed(self):
+        """
+        读取并清空已到达的地址变化事件
+
+        Returns:
+            bool: 是否有地址发生变化
+        """
+        changed = False
+        while True:
+            try:
+                data = self._events.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return changed
+            except OSError:
+                # 事件过多导致缓冲区溢出时无法确定变化内容，按已变化处理
+                return True
+            if not data:
+                return changed
+            changed = True
+
+    def invalidate(self):
+        """清除缓存，下次查询时重新枚举"""
+        with self._lock:
+            self._cache = None
+
+    def get_campus_ips(self):
+        """
+        获取所有校园网地址段内的本机IP
+
+        Returns:
+            list: IP地址列表，按网卡枚举顺序排列
+        """
+        with self._lock:
+            if self._events is None:
+                return self._enumerate()
+            if self._addresses_changed() or self._cache is None:
+                self._cache = self._enumerate()
+            return list(self._cache)
+
+    def _enumerate(self):
+        """枚举本机地址并按校园网地址段筛选"""
+        if self._events is not None:
+            try:
+                return [ip for _, ip in dump_ipv4_addresses()
+                        if not ip.startswith("127.") and ip_in_subnets(ip, self.campus_subnets)]
+            except OSError as e:
+                print(f"枚举网卡地址失败: {e}")
+        ip = get_route_ip()
+        return [ip] if ip and ip_in_subnets(ip, self.campus_subnets) else []
+
+    def get_primary_ip(self):
+        """
+        获取用于认证的本机IP，优先使用校园网地址段内的地址
+
+        Returns:
+            str: IP地址，均失败时返回本地回环地址
+        """
+        ips = self.get_campus_ips()
+        if ips:
+            return ips[0]
+        return get_route_ip() or "127.0.0.1"
+
+
+_resolvers = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_resolver(campus_subnets=None):
+    """
+    获取共享的地址发现实例，相同地址段配置复用同一缓存
+
+    Args:
+        campus_subnets: 校园网地址段列表（CIDR格式）
+
+    Returns:
+        AddressResolver: 地址发现实例
+    """
+    key = tuple(campus_subnets or DEFAULT_CAMPUS_SUBNETS)
+    with _resolvers_lock:
+        resolver = _resolvers.get(key)
+        if resolver is None:
+            resolver = _resolvers[key] = AddressResolver(list(key))
+        return resolver
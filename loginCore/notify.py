@@ -2,27 +2,105 @@
 # -*- coding: utf-8 -*-
 
 import json
-import requests
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from metrics import WEBHOOK_DELIVERIES
+
+# 企业微信返回的可重试错误码：-1系统繁忙，45009接口调用超过频率限制
+RETRYABLE_ERRCODES = (-1, 45009)
+
+
+def build_text_message(content, mentioned_list=None, mentioned_mobile_list=None):
+    """
+    构建企业微信文本消息
+    
+    Args:
+        content: 消息内容
+        mentioned_list: 要@的成员ID列表
+        mentioned_mobile_list: 要@的成员手机号列表
+        
+    Returns:
+        dict: 消息数据
+    """
+    return {
+        "msgtype": "text",
+        "text": {
+            "content": content,
+            "mentioned_list": mentioned_list or [],
+            "mentioned_mobile_list": mentioned_mobile_list or [],
+        },
+    }
+
+
+def interpret_webhook_response(status_code, text):
+    """
+    判断webhook的响应是否发送成功，失败时区分是否可以重试
+    
+    Args:
+        status_code: HTTP状态码
+        text: 响应内容
+        
+    Returns:
+        bool: 是否发送成功
+        str: 失败原因，成功时为None
+        bool: 失败是否可以重试
+    """
+    if status_code != 200:
+        return False, f"HTTP状态码: {status_code}", status_code == 429 or status_code >= 500
+    result = json.loads(text)
+    if result.get("errcode") == 0:
+        return True, None, False
+    return False, str(result), result.get("errcode") in RETRYABLE_ERRCODES
+
+
+def backoff_delay(backoff, attempt):
+    """
+    计算第attempt次重试前带随机抖动的指数退避时间
+    
+    Args:
+        backoff: 重试退避的基础时间（秒）
+        attempt: 重试序号，从1开始
+        
+    Returns:
+        float: 等待时间（秒）
+    """
+    return random.uniform(0, backoff * 2 ** (attempt - 1))
 
 
 class Notifier:
     """通知模块，用于发送消息通知"""
     
-    def __init__(self, webhook_urls):
+    def __init__(self, webhook_urls, timeout=5, max_retries=2, backoff=0.5, transport="requests"):
         """
         初始化通知器实例
         
         Args:
             webhook_urls: webhook URL的列表或字符串
+            timeout: 单次请求的超时时间（秒）
+            max_retries: 单个webhook失败后的最大重试次数
+            backoff: 重试退避的基础时间（秒），实际等待时间带随机抖动
+            transport: "requests"或仅依赖标准库的"stdlib"，stdlib不导入requests并复用长连接
         """
         if isinstance(webhook_urls, str):
             self.webhook_urls = [webhook_urls]
         else:
             self.webhook_urls = webhook_urls
         
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.transport = transport
+        self.last_results = {}
+        self._background = None
+        
         # 获取系统代理设置
         self.proxies = self._get_system_proxies()
+        self.session = None
+        if transport == "stdlib":
+            from transport import StdlibSession
+            self.session = StdlibSession(proxies=self.proxies)
     
     def _get_system_proxies(self):
         """
@@ -40,10 +118,19 @@ class Notifier:
             proxies['http'] = http_proxy
         if https_proxy:
             proxies['https'] = https_proxy
+        if self.transport == "stdlib":
+            # 与requests相同由urllib读取：环境变量（包括NO_PROXY）优先，否则读取Windows注册表或macOS的系统代理
+            try:
+                from urllib.request import getproxies
+                return getproxies()
+            except Exception as e:
+                print(f"获取系统代理时发生错误: {str(e)}")
+                return proxies
             
         # 如果没有在环境变量中找到代理，则尝试使用requests的系统代理检测
         if not proxies:
             try:
+                import requests
                 system_proxies = requests.utils.get_environ_proxies('')
                 if system_proxies:
                     proxies = system_proxies
@@ -64,49 +151,97 @@ class Notifier:
         Returns:
             bool: 是否发送成功
         """
-        data = {
-            "msgtype": "text",
-            "text": {
-                "content": content,
-                "mentioned_list": mentioned_list or [],
-                "mentioned_mobile_list": mentioned_mobile_list or [],
-            },
-        }
-        return self._send(data)
+        return self._send(build_text_message(content, mentioned_list, mentioned_mobile_list))
+    
+    def submit(self, fn, *args):
+        """
+        在通知器的后台线程中执行任务，任务按提交顺序依次执行
+        
+        Args:
+            fn: 要执行的函数
+            *args: 函数参数
+            
+        Returns:
+            Future: 任务的执行结果
+        """
+        if self._background is None:
+            self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notifier")
+        return self._background.submit(fn, *args)
     
     def _send(self, data, webhook_url=None):
         """
-        发送消息到指定的webhook URL
+        并发发送消息到指定的webhook URL，各URL的结果记录在last_results中
         
         Args:
             data: 要发送的消息数据
             webhook_url: 要发送的webhook URL，如果不指定，则发送到所有webhook URLs
             
         Returns:
-            bool: 是否发送成功
+            bool: 是否全部发送成功
         """
         if webhook_url is None:
             webhooks = self.webhook_urls
         else:
             webhooks = [webhook_url]
+        if not webhooks:
+            return True
 
-        for webhook in webhooks:
+        body = json.dumps(data)
+        if len(webhooks) == 1:
+            results = {webhooks[0]: self._post(webhooks[0], body)}
+        else:
+            with ThreadPoolExecutor(max_workers=len(webhooks)) as executor:
+                futures = {webhook: executor.submit(self._post, webhook, body) for webhook in webhooks}
+            results = {webhook: future.result() for webhook, future in futures.items()}
+        
+        self.last_results = results
+        return all(result["success"] for result in results.values())
+    
+    def _post(self, webhook, body):
+        """
+        发送消息到单个webhook，可重试的失败按带抖动的指数退避重试
+        
+        Args:
+            webhook: webhook URL
+            body: 已序列化的消息数据
+            
+        Returns:
+            dict: 包含success、attempts和error的发送结果
+        """
+        if self.session is None:
+            import requests
+        
+        headers = {"Content-Type": "application/json"}
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(backoff_delay(self.backoff, attempt))
             try:
-                headers = {"Content-Type": "application/json"}
-                # 使用系统代理发送请求
-                response = requests.post(
-                    webhook, 
-                    headers=headers, 
-                    data=json.dumps(data),
-                    proxies=self.proxies if self.proxies else None  # 如果有代理则使用
-                )
-                if response.status_code != 200 or response.json()["errcode"] != 0:
-                    print(f"发送消息失败: {response.json()}")
-                    return False
+                if self.session is not None:
+                    response = self.session.post(webhook, data=body, headers=headers, timeout=self.timeout)
+                else:
+                    # 使用系统代理发送请求
+                    response = requests.post(
+                        webhook, 
+                        headers=headers, 
+                        data=body,
+                        proxies=self.proxies if self.proxies else None,  # 如果有代理则使用
+                        timeout=self.timeout
+                    )
+                success, error, retryable = interpret_webhook_response(response.status_code, response.text)
+                if success:
+                    WEBHOOK_DELIVERIES.inc("success")
+                    return {"success": True, "attempts": attempt + 1, "error": None}
             except Exception as e:
-                print(f"发送消息过程中发生错误: {str(e)}")
-                return False
-        return True
+                error = str(e)
+                retryable = True
+            
+            if not retryable:
+                break
+        
+        WEBHOOK_DELIVERIES.inc("failure")
+        print(f"发送消息失败: {error}")
+        return {"success": False, "attempts": attempt + 1, "error": error}
 
 
 # 使用示例
@@ -1,128 +1,468 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import requests
-import socket
 import re
 import json
+import threading
+import time
+from netinfo import get_resolver
+from tracing import Tracer, Deadline, DeadlineExceeded
+from metrics import PROBE_SECONDS, LOGIN_SECONDS
+
+NOT_ON_CAMPUS_MESSAGE = "尚未连接校园网"
+DEFAULT_BASE_URL = "http://172.16.253.3:801/eportal/"
+DEFAULT_SITE_URL = "http://172.16.253.3/"
+# 推测登录只在该时长（秒）内探测确认过处于校园网的地址上进行
+ON_CAMPUS_TTL = 600
 
 class ePortal:
     """安徽大学校园网自动登录类"""
     
-    def __init__(self, user_account, user_password):
+    def __init__(self, user_account, user_password, wlan_user_ip=None, session=None, transport="requests",
+                 resolver=None, base_url=None, site_url=None, selector=None, wlan_user_mac=None,
+                 speculative=False):
         """
         初始化ePortal实例
         
         Args:
             user_account: 学号
             user_password: 密码
+            wlan_user_ip: 需要认证的IP地址，不指定则自动获取本机IP
+            session: 共享的HTTP会话，不指定则创建自有的长连接会话
+            transport: 自建会话时使用的HTTP实现，"requests"或仅依赖标准库的"stdlib"
+            resolver: 本机地址发现实例，不指定则使用默认校园网地址段的共享实例
+            base_url: 登录接口地址，默认为http://172.16.253.3:801/eportal/
+            site_url: 门户站点地址，用于校园网探测与认证状态查询，默认为http://172.16.253.3/
+            selector: EndpointSelector实例，指定后从多个候选节点中选择门户地址，忽略base_url与site_url
+            wlan_user_mac: 需要认证的MAC地址，可包含:或-分隔符，不指定则为000000000000
+            speculative: 是否在探测校园网的同时发出登录请求，探测失败时丢弃登录结果；
+                只在近期已确认处于校园网的地址上生效，见can_speculate
         """
         self.user_account = user_account
         self.user_password = user_password
-        self.base_url = "http://172.16.253.3:801/eportal/"
-        self.login_url = f"{self.base_url}?c=Portal&a=login&callback=dr1003&login_method=1&jsVersion=3.3.2&v=1117"
-        self.campus_check_url = "http://172.16.253.3/a79.htm"
+        self.wlan_user_mac = normalize_mac(wlan_user_mac)
+        self.speculative = speculative
+        # 各认证地址最近一次确认处于校园网的时间
+        self.on_campus_at = {}
+        self.login_timeout = 10
+        self.last_outcome = None
         self.headers = {
             "Accept": "*/*",
             "Accept-Language": "zh-CN,zh;q=0.9",
             "Cache-Control": "no-cache",
             "Pragma": "no-cache",
-            "Referer": "http://172.16.253.3/",
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        self.wlan_user_ip = self.get_local_ip()
+        self.resolver = resolver or get_resolver()
+        self.session = session or self.create_session(transport=transport)
+        self.session.headers.update(self.headers)
+        self.selector = selector
+        if selector is not None:
+            endpoint = selector.select(self.session)
+            base_url, site_url = endpoint["base_url"], endpoint["site_url"]
+        self.set_urls(base_url or DEFAULT_BASE_URL, site_url or DEFAULT_SITE_URL)
+        self.wlan_user_ip = wlan_user_ip or self.get_local_ip()
+    
+    def set_urls(self, base_url, site_url):
+        """
+        设置门户地址
+        
+        Args:
+            base_url: 登录接口地址
+            site_url: 门户站点地址
+        """
+        site_url = site_url.rstrip("/") + "/"
+        self.base_url = base_url
+        self.site_url = site_url
+        self.login_url = f"{self.base_url}?c=Portal&a=login&callback=dr1003&login_method=1&jsVersion=3.3.2&v=1117"
+        self.campus_check_url = f"{site_url}a79.htm"
+        self.status_url = f"{site_url}drcom/chkstatus?callback=dr1002&jsVersion=4.X&v=1117"
+        self.headers["Referer"] = site_url
+        self.session.headers["Referer"] = site_url
+    
+    @property
+    def endpoint(self):
+        """当前使用的门户节点"""
+        return {"base_url": self.base_url, "site_url": self.site_url}
+    
+    def fail_over(self):
+        """
+        当前门户节点超时或无法访问时切换到其他候选节点
+        
+        Returns:
+            bool: 是否已切换
+        """
+        if self.selector is None:
+            return False
+        endpoint = self.selector.fail_over(self.session, self.endpoint)
+        if endpoint is None:
+            return False
+        self.set_urls(endpoint["base_url"], endpoint["site_url"])
+        return True
+    
+    @staticmethod
+    def create_session(pool_size=4, transport="requests"):
+        """
+        创建带连接池的长连接会话，探测与登录请求复用同一TCP连接
+        
+        Args:
+            pool_size: 每个主机保持的最大连接数
+            transport: "requests"或"stdlib"，stdlib不导入requests，启动更快
+            
+        Returns:
+            requests.Session或StdlibSession: 会话实例
+        """
+        if transport == "stdlib":
+            from transport import StdlibSession
+            return StdlibSession()
+        
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    @staticmethod
+    def account_session(session):
+        """
+        为单个账号创建会话，Cookie与请求头（如set_urls修改的Referer）各自独立，连接池仍与共享会话共用
+        
+        Args:
+            session: create_session创建的共享会话
+            
+        Returns:
+            requests.Session或StdlibSession: 会话实例
+        """
+        if not hasattr(session, "adapters"):
+            # StdlibSession不保存Cookie，同一批账号的请求头相同，可以直接共享
+            return session
+        
+        import requests
+        
+        account_session = requests.Session()
+        # 挂载共享会话的适配器，连接池属于适配器，Cookie与请求头属于各自的会话
+        for prefix, adapter in session.adapters.items():
+            account_session.mount(prefix, adapter)
+        return account_session
+    
+    def connection_stats(self):
+        """
+        统计会话连接池中新建与复用的连接数
+        
+        Returns:
+            dict: 包含connections（新建连接数）、requests（请求数）和reused（复用连接的请求数）
+        """
+        if hasattr(self.session, "connection_stats"):
+            return self.session.connection_stats()
+        
+        connections = 0
+        requests_count = 0
+        pools = self.session.get_adapter(self.base_url).poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            connections += pool.num_connections
+            requests_count += pool.num_requests
+        return {
+            "connections": connections,
+            "requests": requests_count,
+            "reused": max(0, requests_count - connections)
+        }
     
     def get_local_ip(self):
         """
-        获取本机IP地址
+        获取本机IP地址，优先选择校园网地址段内的网卡地址
         
         Returns:
             str: 本机IP地址
         """
         try:
-            # 创建一个临时socket连接到一个公共IP，获取本机IP
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
+            return self.resolver.get_primary_ip()
         except Exception as e:
-            # 如果上述方法失败，尝试其他方法
-            try:
-                hostname = socket.gethostname()
-                ip = socket.gethostbyname(hostname)
-                return ip
-            except Exception as e:
-                print(f"获取IP地址失败: {e}")
-                return "127.0.0.1"  # 失败时返回本地回环地址
+            print(f"获取IP地址失败: {e}")
+            return "127.0.0.1"  # 失败时返回本地回环地址
     
-    def is_connected_to_campus_network(self):
+    def is_connected_to_campus_network(self, timeout=5):
         """
         检查是否已连接到校园网（但可能尚未认证）
         
+        Args:
+            timeout: 超时时间（秒）
+        
         Returns:
             bool: 是否已连接到校园网
         """
         try:
-            response = requests.get(self.campus_check_url, timeout=5, headers=self.headers)
+            response = self.session.get(self.campus_check_url, timeout=timeout)
             return response.status_code == 200
         except Exception:
             return False
     
-    def login(self):
+    def is_authenticated(self, timeout=3, session=None):
+        """
+        通过认证状态接口检查当前IP是否已经完成认证，不发送登录请求
+        
+        Args:
+            timeout: 超时时间（秒）
+            session: 查询使用的会话，默认为自身的会话；网关模式下使用以客户端地址发起连接的会话
+        
+        Returns:
+            bool: 是否已认证
+        """
+        try:
+            response = (session or self.session).get(self.status_url, timeout=timeout)
+            if response.status_code != 200:
+                return False
+            return interpret_status_result(extract_jsonp("dr1002", response.text), self.wlan_user_ip)
+        except Exception:
+            return False
+    
+    def build_login_params(self):
+        """
+        构建登录参数
+        
+        Returns:
+            dict: 登录请求的查询参数
+        """
+        return {
+            "c": "Portal",
+            "a": "login",
+            "callback": "dr1003",
+            "login_method": "1",
+            "user_account": self.user_account,
+            "user_password": self.user_password,
+            "wlan_user_ip": self.wlan_user_ip,
+            "wlan_user_ipv6": "",
+            "wlan_user_mac": self.wlan_user_mac,
+            "wlan_ac_ip": "",
+            "wlan_ac_name": "",
+            "jsVersion": "3.3.2",
+            "v": "1117"
+        }
+    
+    def login(self, tracer=None, deadline=None):
         """
         执行登录操作
         
+        Args:
+            tracer: Tracer实例，用于记录各阶段耗时
+            deadline: Deadline实例，探测与登录请求按份额分配剩余时间
+        
         Returns:
             bool: 登录是否成功
             str: 登录结果信息
         """
-        # 首先检查是否已连接到校园网
-        if not self.is_connected_to_campus_network():
-            return False, "尚未连接校园网"
-            
+        tracer = tracer or Tracer()
+        deadline = deadline or Deadline()
+        # 记录本次登录的HTTP状态码、解析出的结果与异常类型，供重试策略区分可重试与不可重试的失败
+        outcome = self.last_outcome = {"status": None, "result": None, "error": None}
+        
         try:
-            # 构建登录参数
-            params = {
-                "c": "Portal",
-                "a": "login",
-                "callback": "dr1003",
-                "login_method": "1",
-                "user_account": self.user_account,
-                "user_password": self.user_password,
-                "wlan_user_ip": self.wlan_user_ip,
-                "wlan_user_ipv6": "",
-                "wlan_user_mac": "000000000000",
-                "wlan_ac_ip": "",
-                "wlan_ac_name": "",
-                "jsVersion": "3.3.2",
-                "v": "1117"
-            }
+            if self.selector is not None and not self.selector.is_fresh():
+                endpoint = self.selector.select(self.session)
+                self.set_urls(endpoint["base_url"], endpoint["site_url"])
             
-            # 发送登录请求
-            response = requests.get(
-                self.login_url, 
-                params=params,
-                headers=self.headers
-            )
+            if self.speculative and self.can_speculate():
+                return self.login_speculative(tracer, deadline, outcome)
             
-            # 处理返回结果
-            if response.status_code == 200:
-                # 提取JSON数据 (通常在dr1003()中)
-                json_str = re.search(r'dr1003\((.*)\)', response.text)
-                if json_str:
-                    result = json.loads(json_str.group(1))
-                    if result.get("result") == "1":
-                        return True, "登录成功"
-                    else:
-                        return False, result.get("msg", "登录失败，未知原因")
-                else:
-                    return False, "登录失败，无法解析返回数据"
-            else:
-                return False, f"登录失败，HTTP状态码: {response.status_code}"
+            # 首先检查是否已连接到校园网，再发送登录请求
+            if not self.probe(tracer, deadline):
+                outcome["error"] = "not_on_campus"
+                return False, NOT_ON_CAMPUS_MESSAGE
+            return self.send_login(tracer, deadline, outcome)
         
+        except DeadlineExceeded as e:
+            outcome["error"] = "deadline"
+            return False, f"登录超时: {str(e)}"
         except Exception as e:
+            outcome["error"] = type(e).__name__
+            # 登录请求超时或连接失败时切换节点，重试策略的下一次尝试将使用新节点
+            self.fail_over()
             return False, f"登录过程中发生异常: {str(e)}"
+    
+    def probe(self, tracer, deadline):
+        """
+        探测是否已连接到校园网，当前节点无法访问时切换到其他候选节点再检查一次
+        
+        Returns:
+            bool: 是否已连接到校园网
+        """
+        with tracer.span("probe", histogram=PROBE_SECONDS):
+            connected = self.is_connected_to_campus_network(timeout=deadline.timeout(0.3, 5))
+            if not connected and self.fail_over():
+                connected = self.is_connected_to_campus_network(timeout=deadline.timeout(0.3, 5))
+        self.mark_on_campus(connected)
+        return connected
+    
+    def mark_on_campus(self, connected=True, confirmed_at=None):
+        """
+        记录当前认证地址是否处于校园网，供推测登录判断
+        
+        Args:
+            connected: 是否已确认处于校园网，为False时清除该地址的记录
+            confirmed_at: 确认的时间戳，默认为当前时间
+        """
+        if connected:
+            self.on_campus_at[self.wlan_user_ip] = confirmed_at or time.time()
+        else:
+            self.on_campus_at.pop(self.wlan_user_ip, None)
+    
+    def can_speculate(self):
+        """
+        判断能否在探测校园网完成之前发出登录请求
+        
+        登录请求的查询参数中包含明文密码。门户地址位于172.16.0.0/12私有地址段内，不在校园网时该地址
+        可能属于家庭或公司网络中的其他主机，因此只有当前地址在ON_CAMPUS_TTL秒内确认过处于校园网时才推测登录。
+        本机网卡地址位于校园网地址段内不能作为依据，默认的校园网地址段同样是常见的私有地址段
+        
+        Returns:
+            bool: 是否可以推测登录
+        """
+        confirmed_at = self.on_campus_at.get(self.wlan_user_ip)
+        return confirmed_at is not None and time.time() - confirmed_at < ON_CAMPUS_TTL
+    
+    def send_login(self, tracer, deadline, outcome):
+        """
+        发送登录请求并解析结果
+        
+        Args:
+            tracer: Tracer实例
+            deadline: Deadline实例
+            outcome: 记录HTTP状态码与解析结果的字典
+            
+        Returns:
+            bool: 登录是否成功
+            str: 登录结果信息
+        """
+        params = self.build_login_params()
+        with tracer.span("login", histogram=LOGIN_SECONDS):
+            response = self.session.get(
+                self.login_url, 
+                params=params,
+                timeout=deadline.timeout(0.9, self.login_timeout)
+            )
+        
+        # 处理返回结果
+        outcome["status"] = response.status_code
+        if response.status_code != 200:
+            return False, f"登录失败，HTTP状态码: {response.status_code}"
+        with tracer.span("parse"):
+            outcome["result"] = extract_jsonp("dr1003", response.text)
+            return interpret_login_result(outcome["result"])
+    
+    def login_speculative(self, tracer, deadline, outcome):
+        """
+        在后台线程中发送登录请求的同时探测校园网，总耗时由两次往返之和变为两者中较慢的一次
+        
+        探测失败时立即返回未连接校园网，丢弃登录请求的结果；探测时切换了门户节点则改为向新节点登录
+        
+        Returns:
+            bool: 登录是否成功
+            str: 登录结果信息
+        """
+        endpoint = self.endpoint
+        # 登录线程使用独立的结果记录，被丢弃时不会影响本次登录的outcome
+        pending = {"outcome": {"status": None, "result": None, "error": None}}
+        
+        def speculate():
+            try:
+                pending["result"] = self.send_login(tracer, deadline, pending["outcome"])
+            except BaseException as e:
+                pending["error"] = e
+        
+        thread = threading.Thread(target=speculate, name="speculative-login", daemon=True)
+        thread.start()
+        if not self.probe(tracer, deadline):
+            outcome["error"] = "not_on_campus"
+            return False, NOT_ON_CAMPUS_MESSAGE
+        if self.endpoint != endpoint:
+            return self.send_login(tracer, deadline, outcome)
+        
+        thread.join(deadline.remaining())
+        if thread.is_alive():
+            raise DeadlineExceeded(f"超出总时限{deadline.seconds}秒")
+        if "error" in pending:
+            raise pending["error"]
+        outcome.update(pending["outcome"])
+        return pending["result"]
+
+def normalize_mac(mac):
+    """
+    将MAC地址转换为门户使用的12位小写十六进制格式
+    
+    Args:
+        mac: MAC地址，如aa:bb:cc:dd:ee:ff、AA-BB-CC-DD-EE-FF，为空时返回000000000000
+        
+    Returns:
+        str: 12位十六进制MAC地址
+        
+    Raises:
+        ValueError: MAC地址格式错误
+    """
+    if not mac:
+        return "000000000000"
+    digits = re.sub(r"[:\-.]", "", mac).lower()
+    if not re.fullmatch(r"[0-9a-f]{12}", digits):
+        raise ValueError(f"MAC地址格式错误: {mac}")
+    return digits
+
+
+def extract_jsonp(callback, text):
+    """
+    提取JSONP响应中的JSON数据
+    
+    Args:
+        callback: 回调函数名，如dr1003
+        text: 响应内容
+        
+    Returns:
+        dict: 解析出的数据，无法解析时返回None
+    """
+    json_str = re.search(callback + r'\((.*)\)', text)
+    if not json_str:
+        return None
+    try:
+        return json.loads(json_str.group(1))
+    except ValueError:
+        return None
+
+
+def interpret_login_result(result):
+    """
+    将登录接口返回的数据转换为登录结果
+    
+    Args:
+        result: extract_jsonp解析出的dr1003数据
+        
+    Returns:
+        bool: 登录是否成功
+        str: 登录结果信息
+    """
+    if result is None:
+        return False, "登录失败，无法解析返回数据"
+    if result.get("result") == "1":
+        return True, "登录成功"
+    return False, result.get("msg", "登录失败，未知原因")
+
+
+def interpret_status_result(result, wlan_user_ip):
+    """
+    根据认证状态接口返回的数据判断指定IP是否已认证
+    
+    Args:
+        result: extract_jsonp解析出的dr1002数据
+        wlan_user_ip: 需要认证的IP地址
+        
+    Returns:
+        bool: 是否已认证
+    """
+    if not result or str(result.get("result")) != "1":
+        return False
+    # 接口返回了在线IP时，要求与当前认证的IP一致
+    online_ip = result.get("v46ip") or result.get("v4ip")
+    return not online_ip or online_ip == wlan_user_ip
 
 
 # 使用示例
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+# 每秒补充令牌数的下限
+MIN_RATE = 0.001
+
+
+class TokenBucket:
+    """跨进程共享的令牌桶限流模块，桶的状态保存在SQLite数据库中，多个进程共用同一速率预算"""
+
+    def __init__(self, state_file, rate=2.0, burst=5, name="portal_login"):
+        """
+        初始化令牌桶
+
+        Args:
+            state_file: 状态数据库路径，使用同一路径的进程共享令牌
+            rate: 每秒补充的令牌数，即长期平均的最大请求速率
+            burst: 桶的容量，即空闲后允许连续发出的最大请求数
+            name: 桶的名称，同一数据库中可保存多个独立的桶
+        """
+        import sqlite3
+
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.name = name
+        # 手动管理事务，以BEGIN IMMEDIATE在读取前取得写锁，保证多个进程的读-改-写不交错
+        self.conn = sqlite3.connect(state_file, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                          "updated_at REAL NOT NULL)")
+        self._lock = threading.Lock()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self.conn.close()
+
+    def reserve(self, max_wait=None, now=None):
+        """
+        预定一个令牌，令牌不足时允许透支，由调用方等待到令牌补足的时间
+
+        Args:
+            max_wait: 最长可接受的等待时间（秒），需要等待更久时不预定，为None时不限
+            now: 当前时间戳，默认为time.time()（各进程共用的时钟）
+
+        Returns:
+            float: 需要等待的时间（秒），超过max_wait而未预定时返回None
+        """
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time() if now is None else now
+                row = self.conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?",
+                                        (self.name,)).fetchone()
+                tokens, updated_at = row if row is not None else (self.burst, now)
+                # 速率不大于0时按最小速率处理，避免除以零
+                rate = max(MIN_RATE, self.rate)
+                tokens = min(self.burst, tokens + max(0.0, now - updated_at) * rate)
+                wait = max(0.0, (1 - tokens) / rate)
+                if max_wait is not None and wait > max_wait:
+                    self.conn.execute("ROLLBACK")
+                    return None
+                self.conn.execute("INSERT OR REPLACE INTO buckets(name, tokens, updated_at) VALUES (?, ?, ?)",
+                                  (self.name, tokens - 1, now))
+                self.conn.execute("COMMIT")
+                return wait
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def acquire(self, max_wait=None):
+        """
+        取得一个令牌，令牌不足时等待
+
+        Args:
+            max_wait: 最长等待时间（秒），为None时不限
+
+        Returns:
+            float: 实际等待的时间（秒），超过max_wait未取得令牌时返回None
+        """
+        wait = self.reserve(max_wait)
+        if wait:
+            time.sleep(wait)
+        return wait
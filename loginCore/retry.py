@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import random
+import threading
+import time
+from util import atomic_write_json
+
+SUCCESS = "success"
+RETRYABLE = "retryable"
+FATAL = "fatal"
+
+# 门户返回这些信息时说明门户繁忙或限流，稍后重试可能成功
+RETRYABLE_KEYWORDS = ("频繁", "繁忙", "稍后", "超时", "忙", "busy", "timeout", "too many", "try again")
+# 门户返回这些信息时说明账号或密码有误，重试只会增加门户负担
+FATAL_KEYWORDS = ("密码", "账号", "用户名", "不存在", "欠费", "停机", "禁用", "password", "account", "userid",
+                  "ldap auth error")
+
+
+def classify(success, message, outcome):
+    """
+    根据登录结果、HTTP状态码与解析出的dr1003数据，判断失败是否值得重试
+
+    Args:
+        success: ePortal.login返回的是否成功
+        message: ePortal.login返回的结果信息
+        outcome: ePortal.last_outcome
+
+    Returns:
+        str: SUCCESS、RETRYABLE或FATAL
+    """
+    if success:
+        return SUCCESS
+    outcome = outcome or {}
+
+    error = outcome.get("error")
+    if error in ("not_on_campus", "deadline"):
+        # 未连接校园网或已超出总时限，本次运行内重试没有意义
+        return FATAL
+    if error:
+        # 连接失败、超时等网络异常
+        return RETRYABLE
+
+    status = outcome.get("status")
+    if status is not None and status != 200:
+        return RETRYABLE if status == 429 or status >= 500 else FATAL
+
+    result = outcome.get("result")
+    if result is None:
+        # 门户过载时常返回错误页面而不是JSONP数据
+        return RETRYABLE
+
+    msg = str(result.get("msg", message)).lower()
+    if any(keyword in msg for keyword in FATAL_KEYWORDS):
+        return FATAL
+    if any(keyword in msg for keyword in RETRYABLE_KEYWORDS):
+        return RETRYABLE
+    return FATAL
+
+
+class CircuitBreaker:
+    """门户熔断器，连续出现可重试失败时暂停登录请求，避免在门户故障期间持续冲击门户"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=60, state_file=None):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 连续可重试失败达到该次数后熔断
+            reset_timeout: 熔断后经过该时间（秒）允许一次试探请求
+            state_file: 状态文件路径，指定后在多个进程之间共享熔断状态
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state_file = state_file
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """从状态文件加载熔断状态"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.failures = data.get("failures", 0)
+            self.opened_at = data.get("opened_at")
+        except Exception as e:
+            print(f"加载熔断状态失败: {e}")
+
+    def save(self):
+        """将熔断状态写入状态文件"""
+        if not self.state_file:
+            return
+        try:
+            atomic_write_json(self.state_file, {"failures": self.failures, "opened_at": self.opened_at})
+        except Exception as e:
+            print(f"保存熔断状态失败: {e}")
+
+    @property
+    def state(self):
+        """当前状态"""
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """
+        Returns:
+            bool: 当前是否允许向门户发送登录请求
+        """
+        return self.state != self.OPEN
+
+    def record(self, kind, outcome=None):
+        """
+        记录一次登录结果
+
+        Args:
+            kind: classify的返回值
+            outcome: ePortal.last_outcome，未连接校园网或超出总时限时不改变熔断状态
+        """
+        if outcome and outcome.get("error") in ("not_on_campus", "deadline"):
+            # 门户故障时探测同样会超时而被判断为未连接校园网，这类结果不能说明门户可用
+            return
+        with self._lock:
+            changed = False
+            if kind == RETRYABLE:
+                self.failures += 1
+                # 半开状态下试探失败，或连续失败达到阈值时熔断
+                if self.opened_at is not None or self.failures >= self.failure_threshold:
+                    self.opened_at = time.time()
+                    changed = True
+            elif self.failures or self.opened_at is not None:
+                # 门户给出了明确答复（成功或账号错误），说明门户可用
+                self.failures = 0
+                self.opened_at = None
+                changed = True
+            if changed or kind == RETRYABLE:
+                self.save()
+
+
+class RetryPolicy:
+    """登录重试策略，可重试的失败按decorrelated jitter退避，使大量主机的重试时间相互错开"""
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=10.0):
+        """
+        初始化重试策略
+
+        Args:
+            max_attempts: 最大尝试次数（含首次）
+            base_delay: 退避的最小等待时间（秒）
+            max_delay: 退避的最大等待时间（秒）
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, previous):
+        """
+        计算下一次重试前的等待时间: min(max_delay, uniform(base_delay, previous * 3))
+
+        Args:
+            previous: 上一次的等待时间（秒）
+
+        Returns:
+            float: 等待时间（秒）
+        """
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+    def run(self, portal, tracer=None, deadline=None, breaker=None):
+        """
+        按策略执行登录，剩余时间不足以等待下一次重试时提前返回
+
+        Args:
+            portal: ePortal实例
+            tracer: Tracer实例
+            deadline: Deadline实例
+            breaker: CircuitBreaker实例，熔断时不再发送请求
+
+        Returns:
+            bool: 登录是否成功
+            str: 登录结果信息
+        """
+        delay = self.base_delay
+        success, message = False, "门户暂时不可用，已暂停登录请求"
+        for attempt in range(1, self.max_attempts + 1):
+            if breaker is not None and not breaker.allow():
+                return False, "门户暂时不可用，已暂停登录请求"
+
+            success, message = portal.login(tracer, deadline)
+            kind = classify(success, message, portal.last_outcome)
+            if breaker is not None:
+                breaker.record(kind, portal.last_outcome)
+            if kind != RETRYABLE or attempt == self.max_attempts:
+                break
+
+            delay = self.next_delay(delay)
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None and remaining <= delay:
+                break
+            print(f"{message}，{delay:.1f}秒后重试（第{attempt}次）")
+            time.sleep(delay)
+        return success, message
+
+    async def run_async(self, portal, tracer=None, deadline=None, breaker=None):
+        """
+        run的协程版本，用于AsyncEPortal，重试前的等待不阻塞事件循环
+
+        Args:
+            portal: AsyncEPortal实例
+            tracer: Tracer实例
+            deadline: Deadline实例
+            breaker: CircuitBreaker实例，熔断时不再发送请求
+
+        Returns:
+            bool: 登录是否成功
+            str: 登录结果信息
+        """
+        import asyncio
+
+        delay = self.base_delay
+        success, message = False, "门户暂时不可用，已暂停登录请求"
+        for attempt in range(1, self.max_attempts + 1):
+            if breaker is not None and not breaker.allow():
+                return False, "门户暂时不可用，已暂停登录请求"
+
+            success, message = await portal.login(tracer, deadline)
+            kind = classify(success, message, portal.last_outcome)
+            if breaker is not None:
+                breaker.record(kind, portal.last_outcome)
+            if kind != RETRYABLE or attempt == self.max_attempts:
+                break
+
+            delay = self.next_delay(delay)
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None and remaining <= delay:
+                break
+            print(f"{message}，{delay:.1f}秒后重试（第{attempt}次）")
+            await asyncio.sleep(delay)
+        return success, message
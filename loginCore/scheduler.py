@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import math
+import os
+import time
+from collections import deque
+from util import atomic_write_json, percentile
+
+
+class AdaptiveScheduler:
+    """自适应检查调度模块，根据观测到的认证会话时长，在预计掉线时段密集检查，其余时段稀疏检查"""
+
+    def __init__(self, state_file=None, interval=180, min_interval=30, max_interval=900, min_samples=3):
+        """
+        初始化调度实例
+
+        Args:
+            state_file: 状态文件路径，保存观测到的会话时长与统计数据
+            interval: 会话时长样本不足或处于离线状态时使用的检查间隔（秒）
+            min_interval: 预计掉线时段内的检查间隔（秒）
+            max_interval: 其余时段的最长检查间隔（秒）
+            min_samples: 开始按会话时长调度所需的最少样本数
+        """
+        self.state_file = state_file
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.min_samples = min_samples
+        # 最近观测到的会话时长（秒），即从登录到认证失效的时间
+        self.lifetimes = deque(maxlen=50)
+        self.last_login_at = None
+        self.last_online_at = None
+        self.offline_since = None
+        self.stats = {"started_at": time.time(), "checks": 0, "requests": 0, "offline_seconds": 0.0,
+                      "offline_events": 0}
+        self.load()
+
+    def load(self):
+        """从状态文件加载历史观测数据"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.lifetimes.extend(data.get("lifetimes", []))
+            self.last_login_at = data.get("last_login_at")
+            self.last_online_at = data.get("last_online_at")
+            self.stats.update(data.get("stats", {}))
+        except Exception as e:
+            print(f"加载调度状态失败: {e}")
+
+    def save(self):
+        """将观测数据写入状态文件"""
+        if not self.state_file:
+            return
+        try:
+            atomic_write_json(self.state_file, {"lifetimes": list(self.lifetimes), "last_login_at": self.last_login_at,
+                                                "last_online_at": self.last_online_at, "stats": self.stats})
+        except Exception as e:
+            print(f"保存调度状态失败: {e}")
+
+    def observe(self, auth_state, success, requests=0, learn=True, now=None):
+        """
+        记录一次检查的结果
+
+        Args:
+            auth_state: 检查开始时认证状态接口的结果，True为在线，False为已掉线，None为未检查
+            success: 本次检查后是否处于登录状态
+            requests: 本次检查向门户发送的请求数
+            learn: 是否将本次掉线计入会话时长样本，未连接校园网等非会话过期导致的掉线应为False
+            now: 当前时间戳，默认为time.time()
+        """
+        now = time.time() if now is None else now
+        self.stats["checks"] += 1
+        self.stats["requests"] += requests
+
+        if auth_state is True:
+            self.last_online_at = now
+        elif self.last_online_at is not None and self.offline_since is None:
+            # 掉线发生在最后一次确认在线与本次检查之间，取中点作为估计值
+            lost_at = (self.last_online_at + now) / 2
+            self.offline_since = lost_at
+            # 两次检查相隔过久（如进程重启）时估计误差太大，不计入样本
+            precise = now - self.last_online_at <= 2 * self.max_interval
+            if learn and precise and auth_state is False and self.last_login_at is not None \
+                    and lost_at > self.last_login_at:
+                self.lifetimes.append(round(lost_at - self.last_login_at, 3))
+            self.last_online_at = None
+
+        if success and auth_state is not True:
+            # 本次检查重新完成了登录，开始新的会话
+            self.last_login_at = now
+            self.last_online_at = now
+            if self.offline_since is not None:
+                self.stats["offline_seconds"] += now - self.offline_since
+                self.stats["offline_events"] += 1
+                self.offline_since = None
+        self.save()
+
+    def expiry_window(self):
+        """
+        Returns:
+            tuple: 预计掉线时段相对登录时间的(起点, 终点)（秒），样本不足时返回None
+        """
+        if len(self.lifetimes) < self.min_samples:
+            return None
+        margin = self.min_interval
+        return (max(0.0, percentile(self.lifetimes, 5) - margin), percentile(self.lifetimes, 95) + margin)
+
+    def next_interval(self, now=None):
+        """
+        计算距下一次检查的等待时间
+
+        Returns:
+            float: 等待时间（秒）
+        """
+        now = time.time() if now is None else now
+        window = self.expiry_window()
+        if window is None or self.last_online_at is None or self.last_login_at is None:
+            return self.interval
+
+        age = now - self.last_login_at
+        start, end = window
+        if age < start:
+            # 距预计掉线时段还早，稀疏检查，但不越过时段起点
+            return max(self.min_interval, min(self.max_interval, start - age))
+        if age <= end:
+            # 每个会话的检查次数不超过按默认间隔检查的次数：扣除时段前的稀疏检查后，剩余次数均匀分布在时段内
+            budget = percentile(self.lifetimes, 50) / self.interval - math.ceil(start / self.max_interval)
+            return min(self.interval, max(self.min_interval, (end - start) / max(budget, 1)))
+        # 会话已超出通常的时长，回到默认间隔
+        return self.interval
+
+    def report(self, now=None):
+        """
+        Returns:
+            dict: 包含每天门户请求数（requests_per_day）、平均掉线时长（avg_offline_seconds）
+                  与会话时长中位数（median_lifetime）的统计
+        """
+        now = time.time() if now is None else now
+        days = max(now - self.stats["started_at"], 1.0) / 86400
+        events = self.stats["offline_events"]
+        return {
+            "requests_per_day": round(self.stats["requests"] / days, 1),
+            "avg_offline_seconds": round(self.stats["offline_seconds"] / events, 1) if events else 0.0,
+            "median_lifetime": percentile(self.lifetimes, 50) if self.lifetimes else None
+        }
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+import uuid
+
+from metrics import LOGIN_TRIGGERS
+from util import atomic_write_json
+
+
+def pid_alive(pid):
+    """
+    检查进程是否仍在运行
+
+    Args:
+        pid: 进程号
+
+    Returns:
+        bool: 进程存在（或无权检查）时返回True
+    """
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            # 拒绝访问说明进程存在但属于其他用户
+            return kernel32.GetLastError() == 5
+        try:
+            code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            # STILL_ACTIVE
+            return code.value == 259
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class FileLock:
+    """基于独占创建锁文件的跨进程锁，锁文件中记录持有者的PID，持有者退出或超时后视为失效"""
+
+    def __init__(self, lock_file, stale_after=60, poll_interval=0.05):
+        """
+        初始化锁
+
+        Args:
+            lock_file: 锁文件路径
+            stale_after: 锁被持有超过该时长（秒）后视为失效，可被其他进程接管
+            poll_interval: 等待锁释放时的检查间隔（秒）
+        """
+        self.lock_file = lock_file
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self.token = None
+
+    def try_acquire(self, **info):
+        """
+        尝试获取锁，不等待
+
+        Args:
+            **info: 写入锁文件的附加信息
+
+        Returns:
+            bool: 是否获取成功
+        """
+        token = uuid.uuid4().hex
+        try:
+            fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        except FileExistsError:
+            return False
+        owner = {"pid": os.getpid(), "token": token, "acquired_at": time.time()}
+        owner.update(info)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(owner, f)
+        self.token = token
+        return True
+
+    def owner(self):
+        """
+        Returns:
+            dict: 当前持有者写入的信息，锁未被持有或正在写入时返回None
+        """
+        try:
+            with open(self.lock_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_stale(self, owner):
+        """
+        Returns:
+            bool: 持有者进程已退出或持有时间超过stale_after
+        """
+        return not pid_alive(owner["pid"]) or time.time() - owner["acquired_at"] > self.stale_after
+
+    def break_unreadable(self):
+        """
+        锁文件存在但内容为空或损坏时（持有者在写入信息前崩溃或断电），按锁文件的修改时间判断是否失效，
+        失效时删除锁文件
+
+        Returns:
+            bool: 锁文件不存在或已被删除时返回True，锁文件仍可能正在写入时返回False
+        """
+        try:
+            stat = os.stat(self.lock_file)
+        except FileNotFoundError:
+            return True
+        if time.time() - stat.st_mtime <= self.stale_after or self.owner() is not None:
+            return False
+        try:
+            # 删除前确认锁文件未被其他进程替换为新的锁
+            current = os.stat(self.lock_file)
+            if (current.st_ino, current.st_mtime_ns) == (stat.st_ino, stat.st_mtime_ns):
+                os.remove(self.lock_file)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def break_stale(self, owner):
+        """删除失效的锁文件，删除前确认锁仍由该持有者持有"""
+        current = self.owner()
+        if current is not None and current.get("token") == owner.get("token"):
+            try:
+                os.remove(self.lock_file)
+            except FileNotFoundError:
+                pass
+
+    def wait_released(self, owner, timeout=None):
+        """
+        等待当前持有者释放锁
+
+        Args:
+            owner: owner()返回的持有者信息
+            timeout: 最长等待时间（秒），为None时直到锁释放或失效
+
+        Returns:
+            bool: 锁已释放或失效时返回True，超时返回False
+        """
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self.owner()
+            if current is None or current.get("token") != owner.get("token"):
+                return True
+            if self.is_stale(current):
+                self.break_stale(current)
+                return True
+            if expires_at is not None and time.monotonic() >= expires_at:
+                return False
+            time.sleep(self.poll_interval)
+
+    def acquire(self, timeout=None, **info):
+        """
+        获取锁，已被持有时等待释放
+
+        Returns:
+            bool: 是否在超时前获取成功
+        """
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire(**info):
+            owner = self.owner()
+            remaining = None if expires_at is None else expires_at - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            if owner is None:
+                if not self.break_unreadable():
+                    time.sleep(self.poll_interval)
+            else:
+                self.wait_released(owner, remaining)
+        return True
+
+    def release(self):
+        """释放锁"""
+        if self.token is None:
+            return
+        current = self.owner()
+        # 锁已被判定为失效并由其他进程接管时不能删除
+        if current is not None and current.get("token") == self.token:
+            try:
+                os.remove(self.lock_file)
+            except FileNotFoundError:
+                pass
+        self.token = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class SingleFlight:
+    """跨进程单飞模块，同一时间只有一个进程执行登录，其间触发的其他进程等待并复用其结果"""
+
+    def __init__(self, state_dir, stale_after=60, poll_interval=0.05):
+        """
+        初始化单飞实例
+
+        Args:
+            state_dir: 锁文件、结果文件与统计文件所在目录
+            stale_after: 登录进程持有锁超过该时长（秒）后视为失效，应大于单次登录的总时限
+            poll_interval: 等待其他进程完成登录时的检查间隔（秒）
+        """
+        self.lock = FileLock(os.path.join(state_dir, "login.lock"), stale_after, poll_interval)
+        self.result_file = os.path.join(state_dir, "login_result.json")
+        self.stats_file = os.path.join(state_dir, "singleflight.json")
+        self.stats_lock = FileLock(f"{self.stats_file}.lock", 5, 0.01)
+
+    def run(self, key, fn):
+        """
+        执行fn，若其他进程正在为同一key执行，则等待其完成并返回其结果
+
+        Args:
+            key: 结果可以共享的范围，如学号；正在进行的登录key不同时等待其完成后自行执行
+            fn: 执行登录的函数，返回可JSON序列化的结果
+
+        Returns:
+            object: fn或其他进程的返回值
+            bool: 结果是否复用自其他进程
+        """
+        while True:
+            if self.lock.try_acquire(key=key):
+                try:
+                    result = fn()
+                    self.write_result(key, result)
+                finally:
+                    self.lock.release()
+                self.count("flights")
+                return result, False
+
+            owner = self.lock.owner()
+            if owner is None:
+                # 锁刚被释放或持有者尚未写完锁文件，锁文件长时间为空或损坏时视为失效
+                if not self.lock.break_unreadable():
+                    time.sleep(self.lock.poll_interval)
+                continue
+            self.lock.wait_released(owner)
+            shared = self.read_result()
+            if owner.get("key") == key and shared is not None and shared.get("token") == owner.get("token"):
+                self.count("coalesced")
+                return shared["result"], True
+            # 持有者异常退出未写入结果，或登录的是其他账号，重新竞争执行
+
+    def write_result(self, key, result):
+        """在释放锁之前写入本次执行的结果，供等待的进程读取"""
+        try:
+            atomic_write_json(self.result_file, {"token": self.lock.token, "key": key, "finished_at": time.time(),
+                                                 "result": result}, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存登录结果失败: {e}")
+
+    def read_result(self):
+        """
+        Returns:
+            dict: 最近一次执行写入的结果，文件不存在或损坏时返回None
+        """
+        try:
+            with open(self.result_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def stats(self):
+        """
+        Returns:
+            dict: 实际执行的次数（flights）与复用其他进程结果的次数（coalesced）
+        """
+        try:
+            with open(self.stats_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"flights": 0, "coalesced": 0}
+
+    def count(self, name):
+        """在统计文件中将name计数加一，多个进程同时更新时由统计锁保证不丢失计数"""
+        LOGIN_TRIGGERS.inc(name)
+        try:
+            if not self.stats_lock.acquire(timeout=2):
+                return
+            try:
+                stats = self.stats()
+                stats[name] = stats.get(name, 0) + 1
+                atomic_write_json(self.stats_file, stats)
+            finally:
+                self.stats_lock.release()
+        except Exception as e:
+            print(f"保存单飞统计失败: {e}")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from util import atomic_write_json
+
+# 企业微信文本消息内容的最大字节数
+MAX_MESSAGE_BYTES = 2048
+MESSAGE_SEPARATOR = "\n\n----------\n\n"
+
+
+class NotificationSpool:
+    """通知暂存模块，无法立即发送的通知保存在磁盘上，联网后合并发送"""
+
+    def __init__(self, spool_file="notify_spool.json", window=3600, max_items=500):
+        """
+        初始化通知暂存实例
+
+        Args:
+            spool_file: 暂存文件路径
+            window: 合并窗口（秒），窗口内重复的相同事件合并为一条汇总消息
+            max_items: 最多暂存的通知数，超出时丢弃最早的通知
+        """
+        self.spool_file = spool_file
+        self.window = window
+        self.max_items = max_items
+        self.pending = []
+        self.last_sent = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """从磁盘加载暂存的通知"""
+        if not os.path.exists(self.spool_file):
+            return
+        try:
+            with open(self.spool_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.pending = data.get("pending", [])
+            self.last_sent = data.get("last_sent", {})
+            self._next_id = max((item["id"] for item in self.pending), default=-1) + 1
+        except Exception as e:
+            print(f"加载通知暂存文件失败: {e}")
+
+    def save(self):
+        """将暂存的通知写回磁盘"""
+        try:
+            atomic_write_json(self.spool_file, {"pending": self.pending, "last_sent": self.last_sent}, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存通知暂存文件失败: {e}")
+
+    def enqueue(self, key, title, content):
+        """
+        暂存一条通知
+
+        Args:
+            key: 事件标识，标识相同的通知视为重复事件
+            title: 通知标题，合并为汇总消息时使用
+            content: 通知内容
+        """
+        with self._lock:
+            self.pending.append({
+                "id": self._next_id,
+                "key": key,
+                "title": title,
+                "content": content,
+                "time": time.time()
+            })
+            self._next_id += 1
+            if len(self.pending) > self.max_items:
+                del self.pending[:len(self.pending) - self.max_items]
+            self.save()
+
+    def _collect(self, now):
+        """
+        按事件标识分组，选出本次可以发送的消息
+
+        Returns:
+            list: 待发送的消息内容
+            list: 对应的通知ID
+            list: 对应的事件标识
+        """
+        groups = {}
+        for item in self.pending:
+            groups.setdefault(item["key"], []).append(item)
+
+        messages, ids, keys = [], [], []
+        for key, items in groups.items():
+            # 窗口内已经发送过相同事件时继续暂存，窗口结束后再合并为一条汇总消息
+            last_sent = self.last_sent.get(key)
+            if last_sent is not None and now - last_sent < self.window:
+                continue
+
+            if len(items) == 1:
+                messages.append(items[0]["content"])
+            else:
+                first = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(items[0]["time"]))
+                last = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(items[-1]["time"]))
+                messages.append(f"{items[-1]['title']}（汇总）\n\n"
+                                f"{first} 至 {last} 期间共发生{len(items)}次，最近一次:\n\n"
+                                f"{items[-1]['content']}")
+            ids.append([item["id"] for item in items])
+            keys.append(key)
+        return messages, ids, keys
+
+    @staticmethod
+    def _batch(messages):
+        """
+        将多条消息拼接为尽量少的批次，每批不超过企业微信的消息长度限制
+
+        Returns:
+            list: 每个批次包含的消息下标列表
+        """
+        batches = []
+        current, size = [], 0
+        separator_size = len(MESSAGE_SEPARATOR.encode("utf-8"))
+        for index, message in enumerate(messages):
+            message_size = len(message.encode("utf-8"))
+            if current and size + separator_size + message_size > MAX_MESSAGE_BYTES:
+                batches.append(current)
+                current, size = [], 0
+            size += message_size + (separator_size if current else 0)
+            current.append(index)
+        if current:
+            batches.append(current)
+        return batches
+
+    def flush(self, notifier):
+        """
+        发送暂存的通知，发送成功的通知从暂存中移除
+
+        Args:
+            notifier: Notifier实例
+
+        Returns:
+            int: 成功发送的消息批次数
+        """
+        now = time.time()
+        with self._lock:
+            messages, ids, keys = self._collect(now)
+        if not messages:
+            return 0
+
+        sent_ids = set()
+        sent_keys = []
+        sent_batches = 0
+        for batch in self._batch(messages):
+            content = MESSAGE_SEPARATOR.join(messages[index] for index in batch)
+            if not notifier.send_text(content):
+                continue
+            sent_batches += 1
+            for index in batch:
+                sent_ids.update(ids[index])
+                sent_keys.append(keys[index])
+
+        if sent_ids:
+            with self._lock:
+                self.pending = [item for item in self.pending if item["id"] not in sent_ids]
+                for key in sent_keys:
+                    self.last_sent[key] = now
+                # 超出合并窗口的发送记录已无作用，及时清理
+                self.last_sent = {key: sent_at for key, sent_at in self.last_sent.items()
+                                  if now - sent_at < self.window}
+                self.save()
+        return sent_batches
+
+    def __len__(self):
+        return len(self.pending)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from singleflight import FileLock, SingleFlight  # noqa: E402
+
+
+class UnreadableLockTest(unittest.TestCase):
+    """持有者在写入锁信息前崩溃，留下空的或损坏的锁文件"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.lock_file = os.path.join(self.tmp.name, "login.lock")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def leave_lock(self, content, age):
+        with open(self.lock_file, "w", encoding="utf-8") as f:
+            f.write(content)
+        mtime = time.time() - age
+        os.utime(self.lock_file, (mtime, mtime))
+
+    def test_run_breaks_empty_lock(self):
+        self.leave_lock("", age=120)
+        result, shared = SingleFlight(self.tmp.name).run("a", lambda: "ok")
+        self.assertEqual((result, shared), ("ok", False))
+        self.assertFalse(os.path.exists(self.lock_file))
+
+    def test_run_breaks_truncated_lock(self):
+        self.leave_lock('{"pid": 12', age=120)
+        result, shared = SingleFlight(self.tmp.name).run("a", lambda: "ok")
+        self.assertEqual((result, shared), ("ok", False))
+
+    def test_acquire_breaks_corrupt_lock(self):
+        self.leave_lock("\0\0\0", age=120)
+        lock = FileLock(self.lock_file, stale_after=60)
+        self.assertTrue(lock.acquire(timeout=1))
+        self.assertIsNotNone(lock.owner())
+        lock.release()
+
+    def test_recent_empty_lock_is_kept(self):
+        # 持有者可能刚创建锁文件、尚未写入信息，不能立即删除
+        self.leave_lock("", age=0)
+        lock = FileLock(self.lock_file, stale_after=60, poll_interval=0.01)
+        self.assertFalse(lock.acquire(timeout=0.1))
+        self.assertTrue(os.path.exists(self.lock_file))
+
+
+if __name__ == "__main__":
+    unittest.main()
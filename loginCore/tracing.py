@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+
+class DeadlineExceeded(Exception):
+    """登录流程超出总时限"""
+
+
+class Deadline:
+    """登录流程的总时限，各阶段按份额分配剩余时间"""
+
+    def __init__(self, seconds=None):
+        """
+        初始化总时限
+
+        Args:
+            seconds: 总时限（秒），为None时不限时
+        """
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        """
+        Returns:
+            float: 剩余时间（秒），不限时时返回None
+        """
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def timeout(self, share, default):
+        """
+        计算某个阶段可用的超时时间
+
+        Args:
+            share: 该阶段可使用剩余时间的比例（0~1）
+            default: 该阶段的默认超时时间（秒）
+
+        Returns:
+            float: 该阶段的超时时间（秒）
+
+        Raises:
+            DeadlineExceeded: 已没有剩余时间
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if remaining <= 0:
+            raise DeadlineExceeded(f"超出总时限{self.seconds}秒")
+        return min(default, max(remaining * share, 0.05))
+
+
+class Tracer:
+    """阶段耗时追踪模块，记录每个阶段的耗时，可选以JSON行的形式输出"""
+
+    def __init__(self, emit=False, stream=None):
+        """
+        初始化追踪实例
+
+        Args:
+            emit: 是否在每个阶段结束时输出结构化记录
+            stream: 输出流，默认为标准错误
+        """
+        self.emit = emit
+        self.stream = stream or sys.stderr
+        self.origin = time.perf_counter()
+        self.spans = []
+
+    @contextmanager
+    def span(self, name, histogram=None, **attrs):
+        """
+        记录一个阶段的耗时
+
+        Args:
+            name: 阶段名称
+            histogram: 可选的metrics.Histogram，阶段结束时记录耗时（秒）
+            **attrs: 附加到记录中的属性
+        """
+        start = time.perf_counter()
+        record = {"span": name, "start_ms": round((start - self.origin) * 1000, 3)}
+        record.update(attrs)
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = str(e) or type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            record["duration_ms"] = round(elapsed * 1000, 3)
+            if histogram is not None:
+                histogram.observe(elapsed)
+            self.spans.append(record)
+            if self.emit:
+                self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self.stream.flush()
+
+    def durations(self):
+        """
+        Returns:
+            dict: 阶段名称到耗时（毫秒）的映射，同名阶段耗时累加
+        """
+        result = {}
+        for record in self.spans:
+            result[record["span"]] = result.get(record["span"], 0) + record["duration_ms"]
+        return result
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import http.client
+import threading
+from urllib.parse import urlsplit, urlencode
+
+
+class StdlibResponse:
+    """标准库HTTP响应，提供与requests.Response相同的常用属性"""
+
+    def __init__(self, status_code, content, encoding="utf-8"):
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+
+class StdlibSession:
+    """仅依赖标准库的HTTP会话，接口与ePortal用到的requests.Session子集一致，按主机保持长连接"""
+
+    def __init__(self, source_address=None, proxies=None):
+        """
+        Args:
+            source_address: 发起连接使用的本机地址，网关模式下用于以客户端地址查询认证状态
+            proxies: 按协议指定的代理地址，格式与urllib.request.getproxies()相同，如{"https": "http://proxy:3128"}，
+                "no"为不使用代理的主机列表（逗号分隔）
+        """
+        self.headers = {}
+        self.source_address = (source_address, 0) if source_address else None
+        self.proxies = proxies or {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.num_connections = 0
+        self.num_requests = 0
+
+    def _get_connection(self, scheme, netloc, timeout):
+        """
+        获取当前线程到指定主机的长连接，不存在时新建
+
+        Returns:
+            http.client.HTTPConnection: 连接实例
+        """
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        key = (scheme, netloc)
+        conn = connections.get(key)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            proxy = self.get_proxy(scheme, netloc)
+            if proxy is None:
+                conn = conn_class(netloc, timeout=timeout, source_address=self.source_address)
+            else:
+                # HTTPS经代理的CONNECT隧道访问，HTTP直接向代理发送完整URL
+                proxy_parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+                proxy_headers = {}
+                if proxy_parts.username:
+                    from base64 import b64encode
+                    from urllib.parse import unquote
+                    credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+                    proxy_headers["Proxy-Authorization"] = f"Basic {b64encode(credentials.encode()).decode()}"
+                proxy_netloc = proxy_parts.netloc.rpartition("@")[2]
+                if scheme == "https":
+                    conn = conn_class(proxy_netloc, timeout=timeout, source_address=self.source_address)
+                    conn.set_tunnel(netloc, headers=proxy_headers)
+                else:
+                    conn = conn_class(proxy_netloc, timeout=timeout, source_address=self.source_address)
+                    conn.proxy_headers = proxy_headers
+            connections[key] = conn
+            with self._lock:
+                self.num_connections += 1
+        else:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        return conn
+
+    def get_proxy(self, scheme, netloc):
+        """
+        Returns:
+            str: 访问该主机使用的代理地址，不使用代理时返回None
+        """
+        proxy = self.proxies.get(scheme)
+        if not proxy:
+            return None
+        from urllib.request import proxy_bypass, proxy_bypass_environment
+
+        host = netloc.rpartition("@")[2]
+        # 代理来自环境变量时按其中的no列表判断，否则按系统设置（如Windows注册表的例外列表）判断
+        bypass = proxy_bypass_environment(host, self.proxies) if "no" in self.proxies else proxy_bypass(host)
+        return None if bypass else proxy
+
+    def _drop_connection(self, scheme, netloc):
+        """关闭并丢弃当前线程到指定主机的连接"""
+        connections = getattr(self._local, "connections", {})
+        conn = connections.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None):
+        """
+        发送HTTP请求，服务器关闭了空闲长连接时自动重连一次
+
+        Args:
+            method: 请求方法
+            url: 请求地址
+            params: 附加到URL上的查询参数
+            data: 请求体（str或bytes）
+            headers: 额外的请求头
+            timeout: 超时时间（秒）
+
+        Returns:
+            StdlibResponse: 响应对象
+        """
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        query = parts.query
+        if params:
+            query = f"{query}&{urlencode(params)}" if query else urlencode(params)
+        if query:
+            path = f"{path}?{query}"
+
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        for attempt in range(2):
+            conn = self._get_connection(parts.scheme, parts.netloc, timeout)
+            reused = conn.sock is not None
+            proxy_headers = getattr(conn, "proxy_headers", None)
+            try:
+                if proxy_headers is not None:
+                    conn.request(method, f"{parts.scheme}://{parts.netloc}{path}", body=data,
+                                 headers={"Host": parts.netloc, **request_headers, **proxy_headers})
+                else:
+                    conn.request(method, path, body=data, headers=request_headers)
+                response = conn.getresponse()
+                content = response.read()
+            except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError):
+                self._drop_connection(parts.scheme, parts.netloc)
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                self._drop_connection(parts.scheme, parts.netloc)
+                raise
+
+            with self._lock:
+                self.num_requests += 1
+            if response.will_close:
+                self._drop_connection(parts.scheme, parts.netloc)
+            encoding = response.headers.get_content_charset() or "utf-8"
+            return StdlibResponse(response.status, content, encoding)
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """发送GET请求"""
+        return self.request("GET", url, params=params, headers=headers, timeout=timeout)
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        """发送POST请求"""
+        return self.request("POST", url, data=data, headers=headers, timeout=timeout)
+
+    def connection_stats(self):
+        """
+        Returns:
+            dict: 包含connections（新建连接数）、requests（请求数）和reused（复用连接的请求数）
+        """
+        return {
+            "connections": self.num_connections,
+            "requests": self.num_requests,
+            "reused": max(0, self.num_requests - self.num_connections)
+        }
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+
+def atomic_write(path, text):
+    """
+    先写临时文件再替换目标文件，其他进程同时读取时不会读到写了一半的文件
+
+    临时文件名包含进程号，多个进程同时写入同一文件时互不干扰；写入失败时删除临时文件并抛出异常
+
+    Args:
+        path: 目标文件路径
+        text: 要写入的文本
+    """
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path, data, ensure_ascii=True):
+    """
+    以JSON格式原子地写入文件，见atomic_write
+
+    Args:
+        path: 目标文件路径
+        data: 要写入的数据
+        ensure_ascii: 是否将非ASCII字符转义
+    """
+    atomic_write(path, json.dumps(data, ensure_ascii=ensure_ascii))
+
+
+def percentile(samples, q):
+    """
+    计算分位数（最近秩法）
+
+    Args:
+        samples: 样本列表
+        q: 分位（0~100）
+
+    Returns:
+        float: 分位数，样本为空时返回0
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import select
+import socket
+import sys
+import time
+from netinfo import (DEFAULT_CAMPUS_SUBNETS, RTMGRP_IPV4_IFADDR, RTMGRP_LINK, RTM_NEWADDR,
+                     ip_in_subnets, parse_netlink_messages, parse_subnet)
+
+
+class NetworkWatcher:
+    """网络变化监听模块，订阅内核netlink地址/链路事件，校园网地址出现时立即触发登录（仅Linux）"""
+
+    def __init__(self, campus_subnets=None, debounce=0.05, max_delay=1.0):
+        """
+        初始化网络变化监听实例
+
+        Args:
+            campus_subnets: 校园网地址段列表（CIDR格式）
+            debounce: 事件防抖时间（秒），连续事件在静默该时间后才触发
+            max_delay: 从首个校园网地址事件到触发的最长等待时间（秒）
+        """
+        self.campus_subnets = [parse_subnet(subnet) for subnet in (campus_subnets or DEFAULT_CAMPUS_SUBNETS)]
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        self._sock.bind((0, RTMGRP_IPV4_IFADDR | RTMGRP_LINK))
+        self._sock.setblocking(False)
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+
+    @classmethod
+    def create(cls, campus_subnets=None):
+        """
+        创建监听实例，当前系统不支持netlink时返回None
+
+        Returns:
+            NetworkWatcher: 监听实例或None
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            return cls(campus_subnets)
+        except OSError as e:
+            print(f"订阅网络变化事件失败: {e}")
+            return None
+
+    def _read_events(self):
+        """
+        读取所有已到达的事件
+
+        Returns:
+            list: parse_netlink_messages解析出的事件，缓冲区溢出时返回None
+        """
+        events = []
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return events
+            except OSError:
+                # 事件过多导致缓冲区溢出，无法确定变化内容
+                return None
+            if not data:
+                return events
+            events.extend(parse_netlink_messages(data))
+
+    def wait(self, timeout):
+        """
+        等待校园网地址出现，期间的连续事件经防抖后合并为一次触发
+
+        Args:
+            timeout: 最长等待时间（秒），超时后返回以便执行兜底检查
+
+        Returns:
+            float: 触发本次登录的首个校园网地址事件的时间戳（time.time()），超时或被唤醒时返回None
+        """
+        deadline = time.monotonic() + timeout
+        first_event = None
+        triggered_at = None
+        settle = None
+
+        while True:
+            now = time.monotonic()
+            limit = deadline if settle is None else settle
+            if now >= limit:
+                return first_event if settle is not None else None
+
+            readable, _, _ = select.select([self._sock, self._wakeup_r], [], [], limit - now)
+            if self._wakeup_r in readable:
+                self._wakeup_r.recv(64)
+                return None
+            if self._sock not in readable:
+                continue
+
+            events = self._read_events()
+            if events is None:
+                relevant = True
+            else:
+                relevant = any(msg_type == RTM_NEWADDR and ip and ip_in_subnets(ip, self.campus_subnets)
+                               for msg_type, _, ip, _ in events)
+            if relevant and triggered_at is None:
+                # 只从校园网地址出现的事件开始计时，其他网卡的地址变化不计入
+                triggered_at = time.monotonic()
+                first_event = time.time()
+            if triggered_at is not None:
+                settle = min(time.monotonic() + self.debounce, triggered_at + self.max_delay)
+
+    def wakeup(self):
+        """唤醒正在等待的wait()调用"""
+        try:
+            self._wakeup_w.send(b"\0")
+        except OSError:
+            pass
+
+    def close(self):
+        """关闭监听套接字"""
+        self._sock.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()